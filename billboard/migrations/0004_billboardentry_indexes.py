@@ -0,0 +1,22 @@
+# Generated by Django 5.2 on 2026-10-17 03:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billboard', '0003_billboardentry_scheduled_date'),
+        ('courts', '0010_courtqueueentry'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='billboardentry',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['created_at'], name='billboard_active_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='billboardentry',
+            index=models.Index(fields=['codename', 'action_type', 'created_at'], name='billboard_daily_count_idx'),
+        ),
+    ]
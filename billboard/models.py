@@ -44,6 +44,12 @@ class BillboardEntry(models.Model):
         ordering = ['-created_at']
         verbose_name = "Billboard Entry"
         verbose_name_plural = "Billboard Entries"
+        indexes = [
+            # Active entries of the last 24 hours
+            models.Index(fields=['created_at'], condition=models.Q(is_active=True), name='billboard_active_recent_idx'),
+            # Daily entry limit per player and action
+            models.Index(fields=['codename', 'action_type', 'created_at'], name='billboard_daily_count_idx'),
+        ]
     
     def __str__(self):
         return f"{self.get_player_name()} - {self.get_action_type_display()} at {self.court_complex.name}"
@@ -79,11 +85,13 @@ class BillboardEntry(models.Model):
     @classmethod
     def get_daily_count(cls, codename, action_type):
         """Get count of entries for a codename and action type today"""
-        today = timezone.now().date()
+        # A range on created_at (rather than created_at__date) can use billboard_daily_count_idx
+        today = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
         return cls.objects.filter(
             codename=codename,
             action_type=action_type,
-            created_at__date=today,
+            created_at__gte=today,
+            created_at__lt=today + timedelta(days=1),
             is_active=True
         ).count()
     
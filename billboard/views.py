@@ -13,6 +13,7 @@ import json
 from .models import BillboardEntry, BillboardResponse, BillboardSettings
 from .forms import BillboardEntryForm, BillboardResponseForm, QuickResponseForm
 from teams.models import Team
+from pfc_core.cache_registry import get_or_build
 
 
 def team_search_api(request):
@@ -136,15 +137,19 @@ class BillboardListView(ListView):
     
     def get_queryset(self):
         # Get active entries from the last 24 hours
-        cutoff_time = timezone.now() - timedelta(hours=24)
-        return BillboardEntry.objects.filter(
-            is_active=True,
-            created_at__gte=cutoff_time
-        ).select_related('court_complex').prefetch_related('responses')
+        def build():
+            cutoff_time = timezone.now() - timedelta(hours=24)
+            return list(BillboardEntry.objects.filter(
+                is_active=True,
+                created_at__gte=cutoff_time
+            ).select_related('court_complex').prefetch_related('responses'))
+        
+        # Rebuilt after entries, responses or complexes change (and when the region times out)
+        return get_or_build('billboard', build)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['settings'] = BillboardSettings.get_settings()
+        context['settings'] = get_or_build('billboard', BillboardSettings.get_settings, 'settings')
         
         # Group entries by action type for better display
         entries = context['entries']
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Court, CourtComplex, CourtComplexRating, CourtComplexPhoto
+from .models import Court, CourtComplex, CourtComplexRating, CourtComplexPhoto, CourtQueueEntry
 
 @admin.register(Court)
 class CourtAdmin(admin.ModelAdmin):
@@ -59,6 +59,11 @@ class CourtComplexAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        # Rating average and count for the changelist come from one annotated query
+        from .directory import with_rating_summary
+        return with_rating_summary(super().get_queryset(request))
+    
     def get_court_count(self, obj):
         return obj.get_court_count()
     get_court_count.short_description = "Courts Count"
@@ -83,3 +88,10 @@ class CourtComplexPhotoAdmin(admin.ModelAdmin):
     list_filter = ('uploaded_at',)
     search_fields = ('court_complex__name', 'caption')
 
+
+@admin.register(CourtQueueEntry)
+class CourtQueueEntryAdmin(admin.ModelAdmin):
+    list_display = ('match', 'tournament', 'priority', 'status', 'enqueued_at', 'assigned_at', 'court')
+    list_filter = ('status', 'priority', 'tournament')
+    list_select_related = ('match__team1', 'match__team2', 'match__tournament', 'tournament', 'court')
+    raw_id_fields = ('match', 'court')
@@ -0,0 +1,178 @@
+"""
+Court allocation service.
+
+Single entry point for giving courts to matches and taking them back. A court
+is claimed with a conditional UPDATE (``is_available=True`` -> ``False``) so two
+teams activating at the same moment can never be given the same court; on
+databases with ``SKIP LOCKED`` support (PostgreSQL) candidate rows are also
+locked so concurrent claims pick different courts instead of contending for the
+first free one. SQLite has no row locks and falls back to the conditional
+update alone, which is still safe because SQLite serialises writers.
+
+Freed courts are handed to the head of the court queue (courts.court_queue) in
+the same transaction, so a court is never briefly "available" between two
+matches.
+"""
+
+import logging
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Subquery, Case, When, Value, IntegerField
+from django.utils import timezone
+from .models import Court, CourtComplex, CourtQueueEntry
+from pfc_core.cache_registry import invalidate_models
+from pfc_core.live_events import publish_court
+
+logger = logging.getLogger(__name__)
+
+# How many free courts to try before giving up on a contended claim
+CLAIM_ATTEMPTS = 5
+
+
+def court_pool(tournament):
+    """
+    Courts a tournament may play on: its TournamentCourt assignments, or every
+    court when the tournament has none (the general pool).
+    """
+    from tournaments.models import TournamentCourt
+
+    courts = Court.objects.all()
+    if tournament is not None and TournamentCourt.objects.filter(tournament=tournament).exists():
+        courts = courts.filter(
+            Exists(TournamentCourt.objects.filter(tournament=tournament, court_id=OuterRef("pk")))
+        )
+    return courts
+
+
+def free_courts(tournament, preferred_court=None):
+    """
+    Available courts for a tournament, in allocation order.
+
+    Courts in the same CourtComplex as ``preferred_court`` come first, then
+    courts are grouped by complex so a tournament fills one site before
+    spilling over to the next.
+    """
+    from matches.models import Match
+
+    complex_id = Subquery(
+        CourtComplex.courts.through.objects.filter(court_id=OuterRef("pk")).order_by("courtcomplex_id").values("courtcomplex_id")[:1]
+    )
+    courts = court_pool(tournament).filter(is_available=True).exclude(
+        # Guard against stale flags: never hand out a court an active match still holds
+        Exists(Match.objects.filter(status="active", court_id=OuterRef("pk")))
+    ).annotate(complex_id=complex_id)
+
+    ordering = ["complex_id", "number"]
+    if preferred_court is not None:
+        preferred_complex = CourtComplex.courts.through.objects.filter(court_id=preferred_court.id).order_by("courtcomplex_id").values_list("courtcomplex_id", flat=True).first()
+        preferences = [When(pk=preferred_court.id, then=Value(0))]
+        if preferred_complex:
+            preferences.append(When(complex_id=preferred_complex, then=Value(1)))
+        courts = courts.annotate(preference=Case(*preferences, default=Value(2), output_field=IntegerField()))
+        ordering.insert(0, "preference")
+    return courts.order_by(*ordering)
+
+
+def take_court(court_id):
+    """Flip a court from available to occupied; False if someone else got it first."""
+    return Court.objects.filter(id=court_id, is_available=True).update(is_available=False) == 1
+
+
+def claim_court(match, preferred_court=None):
+    """
+    Atomically assign a free court to a match.
+
+    Args:
+        match: Match to assign (its tournament's court pool is respected)
+        preferred_court: optional Court to try first (defaults to match.proposed_court)
+
+    Returns:
+        Court object if a court was assigned (or the match already had one), None otherwise
+    """
+    if match.court_id:
+        return match.court
+    if preferred_court is None and match.proposed_court_id:
+        preferred_court = match.proposed_court
+
+    with transaction.atomic():
+        candidates = free_courts(match.tournament, preferred_court)
+        if connection.features.has_select_for_update_skip_locked:
+            # Lock the candidate rows so concurrent claims skip each other's courts
+            candidates = candidates.select_for_update(skip_locked=True, of=("self",))
+
+        court = None
+        for candidate in candidates[:CLAIM_ATTEMPTS]:
+            if take_court(candidate.id):
+                court = candidate
+                break
+
+        if court is None:
+            logger.info(f"No available courts for match {match.id}")
+            return None
+
+        return _assign_taken_court(match, court)
+
+
+def claim_specific_court(match, court):
+    """
+    Assign one particular court to a match (staff assignment).
+
+    Returns:
+        bool: True if the court was free and is now the match's court
+    """
+    with transaction.atomic():
+        if not take_court(court.id):
+            return False
+        return _assign_taken_court(match, court) == court
+
+
+def _assign_taken_court(match, court):
+    """Point a match at a court already flipped to occupied by this transaction."""
+    from matches.models import Match
+
+    # Only assign if no other request gave this match a court meanwhile
+    assigned = Match.objects.filter(id=match.id, court__isnull=True).update(court=court, updated_at=timezone.now())
+    if not assigned:
+        Court.objects.filter(id=court.id).update(is_available=True)
+        match.refresh_from_db(fields=["court"])
+        return match.court
+
+    # A queued match that got a court directly no longer needs its place in line
+    CourtQueueEntry.objects.filter(match_id=match.id, status="waiting").update(status="cancelled")
+
+    court.is_available = False
+    match.court = court
+    # Queryset updates send no post_save; refresh cached pages showing courts and matches
+    invalidate_models(Court, Match)
+    publish_court(court.id, False)
+    logger.info(f"Assigned court {court.id} to match {match.id} and marked as in use")
+    return court
+
+
+def release_court(court):
+    """
+    Free a court after its match ends, handing it straight to the next match
+    in the court queue when there is one.
+
+    Returns:
+        Match that received the court and was activated, or None if the court
+        was marked available
+    """
+    from .court_queue import give_court_to_next_match
+
+    if court is None:
+        return None
+
+    with transaction.atomic():
+        # The court is still flagged occupied by the finished match, so it can be handed over directly
+        match = give_court_to_next_match(court)
+        if match is not None:
+            Court.objects.filter(id=court.id).update(is_available=False)
+            court.is_available = False
+            return match
+
+        Court.objects.filter(id=court.id).update(is_available=True)
+        court.is_available = True
+        invalidate_models(Court)
+        publish_court(court.id, True)
+        logger.info(f"Court {court} marked as available - no matches waiting")
+        return None
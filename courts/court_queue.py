@@ -0,0 +1,186 @@
+"""
+Court waiting queue.
+
+Validated matches that find no free court are enqueued here instead of being
+flagged and rediscovered by scanning Match. When a court frees up, the next
+match is the head of the queue among the tournaments allowed to use that court
+(highest priority, then earliest enqueued) - an indexed lookup per freed court
+rather than a scan over every waiting match.
+"""
+
+import logging
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Q, F, Avg, Max, Min, Count, DurationField, ExpressionWrapper
+from django.utils import timezone
+from .models import Court, CourtQueueEntry
+from pfc_core.cache_registry import invalidate_models
+from pfc_core.live_events import publish_match
+
+logger = logging.getLogger(__name__)
+
+
+def queue_priority(match):
+    """Knockout matches are served before pool play, and finals before everything."""
+    tournament = match.tournament
+    is_knockout = tournament.format == "knockout" or (match.stage_id and match.stage.format == "knockout")
+    if not is_knockout:
+        return CourtQueueEntry.PRIORITY_NORMAL
+    if match.round_id and match.round.matches.count() == 1:
+        return CourtQueueEntry.PRIORITY_FINAL
+    return CourtQueueEntry.PRIORITY_KNOCKOUT
+
+
+def enqueue_match(match):
+    """
+    Put a validated match in the court queue (or refresh its place if re-queued).
+
+    Returns:
+        CourtQueueEntry
+    """
+    from matches.models import Match
+    from tournaments.models import TournamentCourt
+
+    with transaction.atomic():
+        entry, created = CourtQueueEntry.objects.update_or_create(
+            match=match,
+            defaults={
+                "tournament_id": match.tournament_id,
+                "uses_general_pool": not TournamentCourt.objects.filter(tournament_id=match.tournament_id).exists(),
+                "priority": queue_priority(match),
+                "status": "waiting",
+                "enqueued_at": timezone.now(),
+                "assigned_at": None,
+                "court": None,
+            },
+        )
+        Match.objects.filter(id=match.id).update(waiting_for_court=True)
+        invalidate_models(Match)
+    match.waiting_for_court = True
+    logger.info(f"Match {match.id} queued for a court (priority {entry.priority})")
+    return entry
+
+
+def queue_head_for_court(court):
+    """Waiting entries that may use ``court``, in service order."""
+    from tournaments.models import TournamentCourt
+
+    tournament_ids = TournamentCourt.objects.filter(court=court).values_list("tournament_id", flat=True)
+    return CourtQueueEntry.objects.filter(status="waiting").filter(
+        Q(uses_general_pool=True) | Q(tournament_id__in=tournament_ids)
+    ).order_by("-priority", "enqueued_at", "id")
+
+
+def give_court_to_next_match(court, attempts=5):
+    """
+    Hand an already-occupied court to the head of the queue.
+
+    The caller must own the court (it is flagged unavailable). Entries whose
+    match is no longer waiting are cancelled and skipped.
+
+    Returns:
+        Match that was activated on the court, or None if nobody is waiting
+    """
+    from matches.models import Match
+
+    now = timezone.now()
+    for entry in queue_head_for_court(court)[:attempts]:
+        with transaction.atomic():
+            if not CourtQueueEntry.objects.filter(id=entry.id, status="waiting").update(
+                status="assigned", assigned_at=now, court=court
+            ):
+                continue  # Another scheduler served this entry first
+            handed_off = Match.objects.filter(
+                id=entry.match_id, status="pending_verification", court__isnull=True
+            ).update(
+                court=court,
+                waiting_for_court=False,
+                status="active",
+                start_time=now,
+                updated_at=now,
+            )
+            if not handed_off:
+                # The match moved on (cancelled, reassigned by staff); drop it from the queue
+                CourtQueueEntry.objects.filter(id=entry.id).update(status="cancelled", court=None)
+                continue
+        invalidate_models(Court, Match)
+        logger.info(f"Court {court} assigned to queued match {entry.match_id} after {now - entry.enqueued_at}")
+        match = Match.objects.get(id=entry.match_id)
+        publish_match(match)
+        return match
+    return None
+
+
+def assign_free_courts():
+    """
+    One scheduler pass: give every free court to the next queued match.
+
+    Returns:
+        list: matches that were activated
+    """
+    from .allocation import take_court
+
+    if not CourtQueueEntry.objects.filter(status="waiting").exists():
+        return []
+
+    activated = []
+    for court in Court.objects.filter(is_available=True).order_by("number"):
+        if not take_court(court.id):
+            continue
+        match = give_court_to_next_match(court)
+        if match is None:
+            Court.objects.filter(id=court.id).update(is_available=True)
+            continue
+        activated.append(match)
+    return activated
+
+
+def cancel_queue_entry(match):
+    """Remove a match from the queue (e.g. it got a court some other way)."""
+    CourtQueueEntry.objects.filter(match=match, status="waiting").update(status="cancelled")
+
+
+def wait_time_metrics(tournament=None):
+    """
+    Queue statistics per tournament.
+
+    Returns:
+        list of dicts: tournament_id, tournament name, served, average_wait,
+        longest_wait, waiting (currently queued) and oldest_waiting_since
+    """
+    entries = CourtQueueEntry.objects.all()
+    if tournament is not None:
+        entries = entries.filter(tournament=tournament)
+
+    wait = ExpressionWrapper(F("assigned_at") - F("enqueued_at"), output_field=DurationField())
+    served = entries.filter(status="assigned", assigned_at__isnull=False).order_by().values(
+        "tournament_id", "tournament__name"
+    ).annotate(served=Count("id"), average_wait=Avg(wait), longest_wait=Max(wait))
+    waiting = entries.filter(status="waiting").order_by().values("tournament_id", "tournament__name").annotate(
+        waiting=Count("id"), oldest_waiting_since=Min("enqueued_at"),
+    )
+
+    metrics = {}
+    for row in served:
+        metrics[row["tournament_id"]] = {
+            "tournament_id": row["tournament_id"],
+            "tournament": row["tournament__name"],
+            "served": row["served"],
+            "average_wait": row["average_wait"] or timedelta(0),
+            "longest_wait": row["longest_wait"] or timedelta(0),
+            "waiting": 0,
+            "oldest_waiting_since": None,
+        }
+    for row in waiting:
+        stats = metrics.setdefault(row["tournament_id"], {
+            "tournament_id": row["tournament_id"],
+            "tournament": row["tournament__name"],
+            "served": 0,
+            "average_wait": timedelta(0),
+            "longest_wait": timedelta(0),
+            "waiting": 0,
+            "oldest_waiting_since": None,
+        })
+        stats["waiting"] = row["waiting"]
+        stats["oldest_waiting_since"] = row["oldest_waiting_since"]
+    return sorted(metrics.values(), key=lambda stats: stats["tournament"])
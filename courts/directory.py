@@ -0,0 +1,57 @@
+"""
+Court directory: every court with its complex, occupancy and current match.
+
+The directory is built from three queries whatever the number of courts:
+the courts with their complexes prefetched (rating average and count
+annotated on each complex), and the unfinished matches that hold a court.
+with_rating_summary annotates the same rating summary on any CourtComplex
+queryset; CourtComplex.average_rating and rating_count use it when present.
+"""
+
+from django.db.models import Avg, Count, Prefetch
+from .models import Court, CourtComplex
+
+
+def with_rating_summary(complexes):
+    """Annotate average_stars and ratings_total on a CourtComplex queryset."""
+    return complexes.annotate(average_stars=Avg('ratings__stars'), ratings_total=Count('ratings'))
+
+
+def current_matches():
+    """Unfinished matches holding a court, by court id (the latest one if several claim it)."""
+    from matches.models import Match
+
+    matches = Match.objects.filter(court__isnull=False).exclude(status='completed').select_related(
+        'tournament', 'team1', 'team2',
+    ).order_by('updated_at', 'id')
+    return {match.court_id: match for match in matches}
+
+
+def court_directory(courts=None):
+    """
+    Courts with their complex, occupancy and current match.
+
+    Args:
+        courts: Court queryset to list; all courts by default
+
+    Returns:
+        list: dicts with court, complex (or None, with average_stars and
+        ratings_total annotated), current_match (or None) and occupied
+    """
+    if courts is None:
+        courts = Court.objects.all()
+    courts = courts.prefetch_related(
+        Prefetch('courtcomplex_set', queryset=with_rating_summary(CourtComplex.objects.all()), to_attr='complexes'),
+    )
+    matches = current_matches()
+
+    directory = []
+    for court in courts:
+        directory.append({
+            'court': court,
+            # A court belongs to at most one complex in practice; the first one wins, as in get_court_complex_for_court
+            'complex': court.complexes[0] if court.complexes else None,
+            'current_match': matches.get(court.id),
+            'occupied': not court.is_available,
+        })
+    return directory
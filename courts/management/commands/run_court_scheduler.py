@@ -0,0 +1,63 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from courts.court_queue import assign_free_courts, wait_time_metrics
+
+
+class Command(BaseCommand):
+    help = 'Run the court queue scheduler: hand free courts to queued matches in priority/FIFO order'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run a single scheduling pass and exit',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconds between scheduling passes (default: 5)',
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Print court queue wait time metrics per tournament and exit',
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.print_stats()
+            return
+
+        total = 0
+        try:
+            while True:
+                close_old_connections()
+                for match in assign_free_courts():
+                    total += 1
+                    self.stdout.write(f'Court {match.court_id} assigned to queued match {match.id}')
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping court scheduler')
+
+        self.stdout.write(self.style.SUCCESS(f'Assigned courts to {total} queued matches.'))
+
+    def print_stats(self):
+        metrics = wait_time_metrics()
+        if not metrics:
+            self.stdout.write('The court queue has not been used yet.')
+            return
+
+        self.stdout.write(f"{'tournament':<30} {'served':>7} {'avg wait':>10} {'max wait':>10} {'waiting':>8}")
+        for row in metrics:
+            self.stdout.write(
+                f"{row['tournament'][:30]:<30} {row['served']:>7} "
+                f"{self.format_wait(row['average_wait']):>10} {self.format_wait(row['longest_wait']):>10} {row['waiting']:>8}"
+            )
+
+    def format_wait(self, duration):
+        minutes, seconds = divmod(int(duration.total_seconds()), 60)
+        return f'{minutes}m{seconds:02d}s'
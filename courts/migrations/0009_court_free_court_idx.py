@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-17 02:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courts', '0008_rename_is_active_to_is_available'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='court',
+            index=models.Index(fields=['is_available', 'number'], name='courts_free_court_idx'),
+        ),
+    ]
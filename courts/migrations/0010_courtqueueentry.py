@@ -0,0 +1,56 @@
+# Generated by Django 5.2 on 2026-10-17 02:38
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def queue_waiting_matches(apps, schema_editor):
+    """Put matches already flagged as waiting for a court into the queue, oldest first."""
+    Match = apps.get_model('matches', 'Match')
+    TournamentCourt = apps.get_model('tournaments', 'TournamentCourt')
+    CourtQueueEntry = apps.get_model('courts', 'CourtQueueEntry')
+
+    tournaments_with_courts = set(TournamentCourt.objects.values_list('tournament_id', flat=True).distinct())
+    waiting = Match.objects.filter(status='pending_verification', waiting_for_court=True, court__isnull=True)
+    CourtQueueEntry.objects.bulk_create([
+        CourtQueueEntry(
+            match_id=match.id,
+            tournament_id=match.tournament_id,
+            uses_general_pool=match.tournament_id not in tournaments_with_courts,
+            enqueued_at=match.updated_at or match.created_at,
+        )
+        for match in waiting.order_by('updated_at', 'id')
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courts', '0009_court_free_court_idx'),
+        ('matches', '0009_alter_matchplayer_role'),
+        ('tournaments', '0007_automationjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourtQueueEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uses_general_pool', models.BooleanField(default=False, help_text='True if the tournament has no assigned courts and may use any court')),
+                ('priority', models.PositiveSmallIntegerField(default=0, help_text='Higher priority entries are served first (knockout rounds, finals)')),
+                ('status', models.CharField(choices=[('waiting', 'Waiting'), ('assigned', 'Assigned'), ('cancelled', 'Cancelled')], default='waiting', max_length=20)),
+                ('enqueued_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('assigned_at', models.DateTimeField(blank=True, null=True)),
+                ('court', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='queue_assignments', to='courts.court')),
+                ('match', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='court_queue_entry', to='matches.match')),
+                ('tournament', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='court_queue_entries', to='tournaments.tournament')),
+            ],
+            options={
+                'verbose_name_plural': 'Court queue entries',
+                'ordering': ['-priority', 'enqueued_at', 'id'],
+                'indexes': [models.Index(fields=['status', '-priority', 'enqueued_at'], name='courts_queue_head_idx'), models.Index(fields=['tournament', 'status'], name='courts_queue_tournament_idx')],
+            },
+        ),
+        migrations.RunPython(queue_waiting_matches, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 class Court(models.Model):
     number = models.IntegerField(unique=True)
@@ -12,6 +13,10 @@ class Court(models.Model):
 
     class Meta:
         ordering = ['number'] # Corrected syntax
+        indexes = [
+            # Free-court lookups used by courts.allocation
+            models.Index(fields=['is_available', 'number'], name='courts_free_court_idx'),
+        ]
 
 
 
@@ -67,14 +72,15 @@ class CourtComplex(models.Model):
         return self.name
     
     def average_rating(self):
-        """Calculate average user rating"""
-        ratings = self.ratings.all()
-        if not ratings:
-            return 0
-        return sum(rating.stars for rating in ratings) / len(ratings)
+        """Average user rating (0 when unrated), from courts.directory.with_rating_summary when annotated"""
+        if hasattr(self, 'average_stars'):
+            return self.average_stars or 0
+        return self.ratings.aggregate(average=models.Avg('stars'))['average'] or 0
     
     def rating_count(self):
         """Get total number of ratings"""
+        if hasattr(self, 'ratings_total'):
+            return self.ratings_total
         return self.ratings.count()
     
     def get_court_numbers(self):
@@ -150,3 +156,68 @@ class CourtComplexPhoto(models.Model):
     class Meta:
         ordering = ['-is_cover', 'uploaded_at']
 
+
+
+class CourtQueueEntry(models.Model):
+    """
+    A validated match waiting for a free court.
+
+    Entries are served highest priority first, then first come first served.
+    The tournament and whether it uses the general court pool are stored on
+    the entry so the next match for a freed court is a single indexed lookup.
+    """
+    PRIORITY_NORMAL = 0
+    PRIORITY_KNOCKOUT = 1
+    PRIORITY_FINAL = 2
+
+    STATUS_CHOICES = [
+        ('waiting', 'Waiting'),
+        ('assigned', 'Assigned'),
+        ('cancelled', 'Cancelled'),
+    ]
+
+    match = models.OneToOneField(
+        'matches.Match',
+        on_delete=models.CASCADE,
+        related_name='court_queue_entry'
+    )
+    tournament = models.ForeignKey(
+        'tournaments.Tournament',
+        on_delete=models.CASCADE,
+        related_name='court_queue_entries'
+    )
+    uses_general_pool = models.BooleanField(
+        default=False,
+        help_text="True if the tournament has no assigned courts and may use any court"
+    )
+    priority = models.PositiveSmallIntegerField(
+        default=PRIORITY_NORMAL,
+        help_text="Higher priority entries are served first (knockout rounds, finals)"
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='waiting')
+    enqueued_at = models.DateTimeField(default=timezone.now)
+    assigned_at = models.DateTimeField(null=True, blank=True)
+    court = models.ForeignKey(
+        Court,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='queue_assignments'
+    )
+
+    def __str__(self):
+        return f"Match {self.match_id} waiting since {self.enqueued_at:%H:%M} ({self.status})"
+
+    @property
+    def wait_time(self):
+        """How long the match waited (or has been waiting) for a court."""
+        end = self.assigned_at or timezone.now()
+        return end - self.enqueued_at
+
+    class Meta:
+        ordering = ['-priority', 'enqueued_at', 'id']
+        verbose_name_plural = "Court queue entries"
+        indexes = [
+            models.Index(fields=['status', '-priority', 'enqueued_at'], name='courts_queue_head_idx'),
+            models.Index(fields=['tournament', 'status'], name='courts_queue_tournament_idx'),
+        ]
@@ -0,0 +1,129 @@
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+from django.db import connection, OperationalError
+from django.db.models import Count
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from matches.models import Match
+from teams.models import Team
+from tournaments.models import Tournament, TournamentCourt
+from .allocation import claim_court, release_court
+from .court_queue import enqueue_match
+from .models import Court
+
+
+def make_tournament(courts, matches):
+    now = timezone.now()
+    tournament = Tournament.objects.create(
+        name='Court stress', format='round_robin', play_format='triplets', has_triplets=True,
+        start_date=now, end_date=now + timedelta(days=1),
+    )
+    Court.objects.bulk_create([Court(number=i + 1) for i in range(courts)])
+    TournamentCourt.objects.bulk_create([
+        TournamentCourt(tournament=tournament, court=court) for court in Court.objects.all()
+    ])
+    Team.objects.bulk_create([Team(name=f'Team {i + 1}', pin=f'{100000 + i}') for i in range(matches * 2)])
+    teams = list(Team.objects.order_by('id'))
+    Match.objects.bulk_create([
+        Match(tournament=tournament, team1=teams[2 * i], team2=teams[2 * i + 1], status='pending_verification')
+        for i in range(matches)
+    ])
+    return tournament
+
+
+class CourtClaimTests(TestCase):
+
+    def test_claim_skips_a_court_taken_after_the_read(self):
+        """A court taken by someone else between listing and claiming is never given out twice."""
+        make_tournament(courts=2, matches=2)
+        first, second = Match.objects.select_related('tournament').order_by('id')
+        stale = Court.objects.order_by('number')
+        self.assertEqual(claim_court(first), stale[0])
+
+        # The second claim still sees the first court as free, as a concurrent reader would
+        with mock.patch('courts.allocation.free_courts', return_value=stale):
+            self.assertEqual(claim_court(second), stale[1])
+
+
+class ConcurrentCourtAllocationTests(TransactionTestCase):
+    """
+    Threads claiming and releasing courts at the same moment never share a court.
+
+    SQLite serialises the competing transactions; the race is really exercised
+    when the tests run against PostgreSQL (DATABASE_URL).
+    """
+
+    courts = 6
+    matches = 24
+    threads = 8
+
+    def setUp(self):
+        self.tournament = make_tournament(self.courts, self.matches)
+
+    def run_threads(self, match_ids, action):
+        """Run action(match_id) for every match across threads released by one barrier; count successes."""
+        barrier = threading.Barrier(self.threads)
+        results = {'success': 0, 'errors': 0}
+        lock = threading.Lock()
+
+        def worker(chunk):
+            try:
+                barrier.wait()
+                for match_id in chunk:
+                    for attempt in range(10):
+                        try:
+                            success = action(match_id)
+                            break
+                        except OperationalError:
+                            # SQLite reports lock contention instead of waiting
+                            time.sleep(0.02 * (attempt + 1))
+                    else:
+                        success = None
+                    with lock:
+                        if success is None:
+                            results['errors'] += 1
+                        elif success:
+                            results['success'] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(match_ids[i::self.threads],)) for i in range(self.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results['errors'], 0)
+        return results['success']
+
+    def claim(self, match_id):
+        return claim_court(Match.objects.select_related('tournament').get(id=match_id)) is not None
+
+    def finish(self, match_id):
+        match = Match.objects.select_related('court').get(id=match_id)
+        Match.objects.filter(id=match_id).update(status='completed')
+        return release_court(match.court) is not None
+
+    def assertNoSharedCourts(self):
+        live = Match.objects.filter(tournament=self.tournament, court__isnull=False).exclude(status='completed')
+        shared = list(live.values('court_id').annotate(total=Count('id')).filter(total__gt=1))
+        self.assertEqual(shared, [], 'a court is assigned to several live matches')
+        held = set(live.values_list('court_id', flat=True))
+        self.assertFalse(Court.objects.filter(id__in=held, is_available=True).exists(), 'a held court is marked available')
+
+    def test_concurrent_claims_and_releases(self):
+        match_ids = list(Match.objects.values_list('id', flat=True))
+
+        # Every match tries to claim a court at the same moment
+        self.assertEqual(self.run_threads(match_ids, self.claim), self.courts)
+        self.assertNoSharedCourts()
+
+        # The others queue; the winners finish together and hand their courts over
+        for match in Match.objects.filter(court__isnull=True).select_related('tournament'):
+            enqueue_match(match)
+        active_ids = list(Match.objects.filter(court__isnull=False).values_list('id', flat=True))
+        Match.objects.filter(id__in=active_ids).update(status='active')
+        self.assertEqual(self.run_threads(active_ids, self.finish), self.courts)
+        self.assertNoSharedCourts()
+        self.assertEqual(Match.objects.filter(court__isnull=False).exclude(status='completed').count(), self.courts)
@@ -3,26 +3,22 @@ from django.contrib import messages
 from django.contrib.auth.decorators import user_passes_test
 from .models import Court, CourtComplex
 from .utils import get_court_complex_for_court
+from .directory import court_directory, with_rating_summary
+from .allocation import claim_court, claim_specific_court, free_courts
+from pfc_core.cache_registry import get_or_build
 from matches.models import Match
 
 def is_staff(user):
     return user.is_staff
 
 def court_list(request):
-    courts = Court.objects.all()
-    # Add complex information for each court
-    courts_with_complex = []
-    for court in courts:
-        complex_info = get_court_complex_for_court(court)
-        courts_with_complex.append({
-            'court': court,
-            'complex': complex_info
-        })
+    def build():
+        # Complex, occupancy and current match of every court in a constant number of queries
+        courts_with_complex = court_directory()
+        return {'courts': [entry['court'] for entry in courts_with_complex], 'courts_with_complex': courts_with_complex}
     
-    return render(request, 'courts/court_list.html', {
-        'courts': courts,
-        'courts_with_complex': courts_with_complex
-    })
+    # Rebuilt only after a court, complex or match changes
+    return render(request, 'courts/court_list.html', get_or_build('court_list', build))
 
 def court_detail(request, court_id):
     court = get_object_or_404(Court, id=court_id)
@@ -36,19 +32,9 @@ def court_detail(request, court_id):
 def find_available_courts(tournament=None):
     """
     Finds available courts (not currently in use).
-    Optionally prioritizes courts assigned to a specific tournament (if implemented).
+    Restricted to the tournament's assigned courts when it has any.
     """
-    # Find courts that are available (is_available=True means available/empty)
-    available_courts = Court.objects.filter(is_available=True)
-
-    # TODO: Implement court-tournament assignment and uncomment/adjust filtering logic
-    # If tournament is specified, prioritize courts assigned to this tournament
-    # if tournament:
-    #     tournament_courts = available_courts.filter(tournaments=tournament)
-    #     if tournament_courts.exists():
-    #         return tournament_courts
-
-    return available_courts
+    return free_courts(tournament)
 
 @user_passes_test(is_staff)
 def assign_court(request, match_id):
@@ -63,16 +49,10 @@ def assign_court(request, match_id):
         if court_id:
             try:
                 court = get_object_or_404(Court, id=court_id)
-                # Double-check if the selected court is still available
-                if not court.is_available:
+                # Claim atomically so a simultaneous auto-assignment can't take it too
+                if not claim_specific_court(match, court):
                     messages.error(request, f"Court {court.number} ({court}) is currently in use. Please select another court.")
                 else:
-                    # Assign court to the match
-                    match.court = court
-                    match.save()
-                    # Note: Marking the court as active (is_active=True) should likely happen
-                    # when the match status becomes 'active', not just upon assignment.
-                    # This logic might need adjustment in the match status update process.
                     messages.success(request, f"Match {match.id} assigned to Court {court.number} ({court}).")
                     # Redirect to match detail or tournament dashboard, adjust as needed
                     return redirect('admin:matches_match_changelist') # Redirecting to admin match list for now
@@ -92,30 +72,7 @@ def auto_assign_court(match):
     Automatically assign an available court to a match, prioritizing tournament courts if applicable.
     Returns the assigned Court object or None if no court could be assigned.
     """
-    # Check if match already has a court
-    if match.court:
-        print(f"Match {match.id} already has court {match.court.number}")
-        return match.court # Return existing court if already assigned
-
-    # Find available courts (is_available=True means empty/available)
-    tournament = match.tournament if hasattr(match, 'tournament') else None
-    available_courts = find_available_courts(tournament)
-
-    if available_courts.exists():
-        # Assign the first available court found
-        court_to_assign = available_courts.first()
-        match.court = court_to_assign
-        
-        # IMPORTANT: Mark the court as occupied
-        court_to_assign.is_available = False
-        court_to_assign.save()
-        
-        match.save()
-        print(f"Auto-assigned Court {court_to_assign.number} to Match {match.id} and marked as in use")
-        return court_to_assign
-    else:
-        print(f"No available courts found for Match {match.id}")
-        return None
+    return claim_court(match)
 
 
 
@@ -128,14 +85,14 @@ import json
 
 def court_complex_list(request):
     """List all court complexes"""
-    complexes = CourtComplex.objects.all()
+    complexes = with_rating_summary(CourtComplex.objects.all())
     return render(request, 'courts/court_complex_list.html', {
         'complexes': complexes
     })
 
 def court_complex_detail(request, complex_id):
     """Detailed view of a court complex"""
-    complex_obj = get_object_or_404(CourtComplex, id=complex_id)
+    complex_obj = get_object_or_404(with_rating_summary(CourtComplex.objects.all()), id=complex_id)
     ratings = complex_obj.ratings.all()
     photos = complex_obj.photos.all()[:4]  # Limit to 4 photos
     courts = complex_obj.courts.all()
@@ -0,0 +1,129 @@
+"""
+Friendly games rankings: leaderboard rows and trophies.
+
+All rankings come from one grouped query over verified participations in
+fully validated games (games played, won and lost per player and position),
+combined in Python into the overall leaderboard, the per-position
+leaderboards and every trophy category. The result is cached under the
+current watermark of validated games (how many there are and the latest
+one), so it is only recomputed after another game reaches FULLY_VALIDATED.
+"""
+
+import logging
+from django.core.cache import cache
+from django.db.models import Count, Max, Sum, Case, When, F, IntegerField
+from .models import FriendlyGame, FriendlyGamePlayer
+
+logger = logging.getLogger(__name__)
+
+RANKINGS_CACHE_KEY = 'friendly_games:rankings:{watermark}'
+
+# Rankings are keyed by the watermark; the timeout only bounds memory use
+RANKINGS_CACHE_TIMEOUT = 60 * 60 * 24
+
+TROPHY_SIZE = 3
+
+
+def _by_activity(row):
+    return (-row['games_played'], -row['win_rate'], row['player__name'])
+
+
+def _by_win_rate(row):
+    return (-row['win_rate'], -row['games_played'], row['player__name'])
+
+
+# Trophy categories: position (None for all positions), minimum games and ranking order.
+# A new trophy is a new entry here; the template shows trophies.<key>.
+TROPHY_CATEGORIES = {
+    'most_active': {'position': None, 'min_games': 1, 'order': _by_activity},
+    'best_shooters': {'position': 'TIRER', 'min_games': 3, 'order': _by_win_rate},
+    'best_pointers': {'position': 'POINTEUR', 'min_games': 3, 'order': _by_win_rate},
+}
+
+
+def validated_games():
+    """Completed friendly games that count for the rankings."""
+    return FriendlyGame.objects.filter(validation_status='FULLY_VALIDATED', status='COMPLETED')
+
+
+def validation_watermark():
+    """Identifies the current set of validated games: count, newest id and completion time."""
+    marks = validated_games().aggregate(games=Count('id'), last_id=Max('id'), last_completed=Max('completed_at'))
+    last_completed = marks['last_completed'].timestamp() if marks['last_completed'] else 0
+    return f"{marks['games']}-{marks['last_id'] or 0}-{last_completed:.0f}"
+
+
+def get_friendly_rankings():
+    """
+    Leaderboard rows and trophies, from the cache while no new game was validated.
+
+    Returns:
+        dict: 'overall' (leaderboard rows), 'positions' (position -> rows) and
+        'trophies' (category -> top rows); rows are dicts with player__id,
+        player__name, games_played, games_won, games_lost and win_rate
+    """
+    key = RANKINGS_CACHE_KEY.format(watermark=validation_watermark())
+    rankings = cache.get(key)
+    if rankings is None:
+        rankings = calculate_friendly_rankings()
+        cache.set(key, rankings, RANKINGS_CACHE_TIMEOUT)
+    return rankings
+
+
+def _row(player_id, name):
+    return {'player__id': player_id, 'player__name': name, 'games_played': 0, 'games_won': 0, 'games_lost': 0, 'win_rate': 0.0}
+
+
+def _finish(rows):
+    for row in rows:
+        row['win_rate'] = row['games_won'] * 100.0 / row['games_played'] if row['games_played'] else 0.0
+    return sorted(rows, key=_by_activity)
+
+
+def calculate_friendly_rankings():
+    """Compute every leaderboard and trophy category from one grouped query."""
+    totals = FriendlyGamePlayer.objects.filter(
+        game__validation_status='FULLY_VALIDATED',
+        game__status='COMPLETED',
+        codename_verified=True,
+    ).values('player_id', 'player__name', 'position').annotate(
+        games_played=Count('id'),
+        games_won=Sum(Case(
+            When(team='BLACK', game__black_team_score__gt=F('game__white_team_score'), then=1),
+            When(team='WHITE', game__white_team_score__gt=F('game__black_team_score'), then=1),
+            default=0,
+            output_field=IntegerField(),
+        )),
+        games_lost=Sum(Case(
+            When(team='BLACK', game__black_team_score__lt=F('game__white_team_score'), then=1),
+            When(team='WHITE', game__white_team_score__lt=F('game__black_team_score'), then=1),
+            default=0,
+            output_field=IntegerField(),
+        )),
+    ).order_by()
+
+    overall = {}
+    positions = {}
+    for total in totals:
+        player_id, name = total['player_id'], total['player__name']
+        for row in (
+            overall.setdefault(player_id, _row(player_id, name)),
+            positions.setdefault(total['position'], {}).setdefault(player_id, _row(player_id, name)),
+        ):
+            row['games_played'] += total['games_played']
+            row['games_won'] += total['games_won'] or 0
+            row['games_lost'] += total['games_lost'] or 0
+
+    rankings = {
+        'overall': _finish(overall.values()),
+        'positions': {position: _finish(rows.values()) for position, rows in positions.items()},
+    }
+
+    rankings['trophies'] = {}
+    for category, trophy in TROPHY_CATEGORIES.items():
+        rows = rankings['overall'] if trophy['position'] is None else rankings['positions'].get(trophy['position'], [])
+        eligible = [row for row in rows if row['games_played'] >= trophy['min_games']]
+        rankings['trophies'][category] = sorted(eligible, key=trophy['order'])[:TROPHY_SIZE]
+
+    logger.info(f"Calculated friendly game rankings for {len(overall)} players")
+    return rankings
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from friendly_games.statistics_service import rebuild_friendly_statistics
+
+
+class Command(BaseCommand):
+    help = 'Rebuild FriendlyGameStatistics counters from verified participations in completed friendly games'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--player',
+            type=int,
+            action='append',
+            dest='player_ids',
+            help='Only rebuild statistics for this player ID (can be repeated)',
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_friendly_statistics(options['player_ids'])
+        self.stdout.write(self.style.SUCCESS(f'Successfully wrote {written} friendly game statistics rows.'))
@@ -0,0 +1,40 @@
+from django.db import migrations
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+
+
+def rebuild_counters(apps, schema_editor):
+    """Counters are now maintained incrementally; start from correct values (pointer games were never counted)."""
+    FriendlyGamePlayer = apps.get_model('friendly_games', 'FriendlyGamePlayer')
+    FriendlyGameStatistics = apps.get_model('friendly_games', 'FriendlyGameStatistics')
+
+    rows = FriendlyGamePlayer.objects.filter(
+        codename_verified=True, game__status='COMPLETED',
+    ).values('player_id').annotate(
+        total_games=Count('id'),
+        total_wins=Coalesce(Sum('games_won'), 0),
+        total_losses=Coalesce(Sum('games_lost'), 0),
+        total_points=Coalesce(Sum('points_scored'), 0),
+        pointer_games=Count('id', filter=Q(position='POINTEUR')),
+        milieu_games=Count('id', filter=Q(position='MILIEU')),
+        tirer_games=Count('id', filter=Q(position='TIRER')),
+    ).order_by()
+
+    FriendlyGameStatistics.objects.update(
+        total_games=0, total_wins=0, total_losses=0, total_points=0,
+        pointer_games=0, milieu_games=0, tirer_games=0, flex_games=0,
+    )
+    for row in rows:
+        player_id = row.pop('player_id')
+        FriendlyGameStatistics.objects.update_or_create(player_id=player_id, defaults=row)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('friendly_games', '0005_friendlygameresult'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2 on 2026-10-17 03:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('friendly_games', '0006_rebuild_friendly_statistics'),
+        ('teams', '0008_ratingevent'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='friendlygame',
+            index=models.Index(fields=['validation_status', 'status', 'completed_at'], name='friendly_game_validated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='friendlygameplayer',
+            index=models.Index(condition=models.Q(('codename_verified', True)), fields=['player'], name='friendly_player_verified_idx'),
+        ),
+    ]
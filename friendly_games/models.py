@@ -132,6 +132,10 @@ class FriendlyGame(models.Model):
     class Meta:
         verbose_name = "Friendly Game"
         verbose_name_plural = "Friendly Games"
+        indexes = [
+            # Validated games for rankings, the rankings watermark and the rating replay
+            models.Index(fields=['validation_status', 'status', 'completed_at'], name='friendly_game_validated_idx'),
+        ]
         
     def __str__(self):
         if self.match_number:
@@ -235,6 +239,10 @@ class FriendlyGamePlayer(models.Model):
         verbose_name = "Friendly Game Player"
         verbose_name_plural = "Friendly Game Players"
         unique_together = ['game', 'player']
+        indexes = [
+            # A player's verified participations (statistics, rankings, profile)
+            models.Index(fields=['player'], condition=models.Q(codename_verified=True), name='friendly_player_verified_idx'),
+        ]
         
     def __str__(self):
         verified_status = "✓" if self.codename_verified else "✗"
@@ -292,30 +300,9 @@ class FriendlyGameStatistics(models.Model):
     
     def update_statistics(self):
         """Recalculate statistics from all verified game participations"""
-        verified_participations = FriendlyGamePlayer.objects.filter(
-            player=self.player,
-            codename_verified=True,
-            game__status='COMPLETED'
-        )
-        
-        self.total_games = verified_participations.count()
-        self.total_wins = verified_participations.aggregate(
-            total=models.Sum('games_won')
-        )['total'] or 0
-        self.total_losses = verified_participations.aggregate(
-            total=models.Sum('games_lost')
-        )['total'] or 0
-        self.total_points = verified_participations.aggregate(
-            total=models.Sum('points_scored')
-        )['total'] or 0
-        
-        # Position-specific counts
-        self.pointer_games = verified_participations.filter(position='POINTER').count()
-        self.milieu_games = verified_participations.filter(position='MILIEU').count()
-        self.tirer_games = verified_participations.filter(position='TIRER').count()
-        self.flex_games = verified_participations.filter(position='FLEX').count()
-        
-        self.save()
+        from .statistics_service import rebuild_friendly_statistics
+        rebuild_friendly_statistics([self.player_id])
+        self.refresh_from_db()
 
 
 
@@ -449,6 +436,7 @@ class FriendlyGameResult(models.Model):
         
         # Update game status based on validation action
         if action == 'agree':
+            already_completed = self.game.status == 'COMPLETED'
             self.game.status = 'COMPLETED'
             self.game.completed_at = timezone.now()
             self.game.save()
@@ -456,8 +444,9 @@ class FriendlyGameResult(models.Model):
             # Update game validation status based on THREE-TIER system
             self._update_three_tier_validation_status()
             
-            # CRITICAL FIX: Update player win/loss statistics
-            self._update_player_win_loss_statistics()
+            # CRITICAL FIX: Update player win/loss statistics (counted once per game)
+            if not already_completed:
+                self._update_player_win_loss_statistics()
             
             # ===== RATING SYSTEM INTEGRATION =====
             # Update player ratings after successful friendly game completion
@@ -506,51 +495,12 @@ class FriendlyGameResult(models.Model):
     def _update_player_win_loss_statistics(self):
         """
         Update player win/loss statistics based on the final game score.
-        This is the CRITICAL FIX for the win/loss logic issue.
+        Participations are marked won/lost and the verified players' counters
+        are incremented in place (see friendly_games.statistics_service).
         """
-        # Determine which team won based on scores
-        black_score = self.game.black_team_score
-        white_score = self.game.white_team_score
-        
-        if black_score > white_score:
-            winning_team = 'BLACK'
-            losing_team = 'WHITE'
-        elif white_score > black_score:
-            winning_team = 'WHITE'
-            losing_team = 'BLACK'
-        else:
-            # Tie game - no wins or losses recorded
-            return
-        
-        # Update winning team players
-        winning_players = FriendlyGamePlayer.objects.filter(
-            game=self.game,
-            team=winning_team
-        )
-        for player in winning_players:
-            player.games_won = 1
-            player.games_lost = 0
-            player.save()
-        
-        # Update losing team players
-        losing_players = FriendlyGamePlayer.objects.filter(
-            game=self.game,
-            team=losing_team
-        )
-        for player in losing_players:
-            player.games_won = 0
-            player.games_lost = 1
-            player.save()
-        
-        # Update aggregated statistics for all players in this game
-        all_players = FriendlyGamePlayer.objects.filter(game=self.game)
-        for game_player in all_players:
-            try:
-                stats, created = FriendlyGameStatistics.objects.get_or_create(
-                    player=game_player.player
-                )
-                stats.update_statistics()
-            except Exception:
-                # Continue if there's an error with one player's stats
-                continue
-
+        from .statistics_service import record_game_result
+        try:
+            record_game_result(self.game)
+        except Exception as e:
+            # Log error but don't break the game completion
+            logger.exception(f"Error recording friendly game statistics for game {self.game.id}: {e}")
@@ -0,0 +1,164 @@
+"""
+Friendly Game Statistics Service
+
+Keeps FriendlyGameStatistics counters up to date. When a game is completed
+the counters of its verified players are incremented in the database with
+F() expressions (one UPDATE per group of players with the same outcome and
+position), so completing a game never rescans a player's history and read
+paths never write. rebuild_friendly_statistics recomputes the counters from
+scratch with one grouped query, for the management command and repairs.
+"""
+
+import logging
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import F, Q, Count, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import FriendlyGamePlayer, FriendlyGameStatistics
+
+logger = logging.getLogger(__name__)
+
+# FriendlyGamePlayer.position -> FriendlyGameStatistics counter
+POSITION_COUNTERS = {
+    'POINTEUR': 'pointer_games',
+    'MILIEU': 'milieu_games',
+    'TIRER': 'tirer_games',
+}
+
+STAT_FIELDS = [
+    'total_games', 'total_wins', 'total_losses', 'total_points',
+    'pointer_games', 'milieu_games', 'tirer_games', 'flex_games',
+]
+
+# Players are processed in chunks to keep IN (...) clauses bounded
+CHUNK_SIZE = 500
+
+
+def record_game_result(game):
+    """
+    Record a newly completed friendly game.
+
+    Marks every participation as won or lost from the final score, then adds
+    the game to the counters of the verified players. Must be called once per
+    game, when it becomes COMPLETED.
+
+    Args:
+        game: the completed FriendlyGame
+
+    Returns:
+        int: number of players whose counters were updated
+    """
+    black_score, white_score = game.black_team_score, game.white_team_score
+
+    with transaction.atomic():
+        if black_score != white_score:
+            winning_team = 'BLACK' if black_score > white_score else 'WHITE'
+            game.players.filter(team=winning_team).update(games_won=1, games_lost=0)
+            game.players.exclude(team=winning_team).update(games_won=0, games_lost=1)
+
+        participations = list(game.players.filter(codename_verified=True).values_list(
+            'player_id', 'position', 'games_won', 'games_lost', 'points_scored',
+        ))
+        if not participations:
+            return 0
+
+        FriendlyGameStatistics.objects.bulk_create(
+            [FriendlyGameStatistics(player_id=player_id) for player_id, *rest in participations],
+            ignore_conflicts=True,
+        )
+
+        groups = defaultdict(list)
+        for player_id, position, won, lost, points in participations:
+            groups[(position, won, lost, points)].append(player_id)
+
+        now = timezone.now()
+        for (position, won, lost, points), player_ids in groups.items():
+            increments = {
+                'total_games': F('total_games') + 1,
+                'total_wins': F('total_wins') + won,
+                'total_losses': F('total_losses') + lost,
+                'total_points': F('total_points') + points,
+            }
+            counter = POSITION_COUNTERS.get(position)
+            if counter:
+                increments[counter] = F(counter) + 1
+            FriendlyGameStatistics.objects.filter(player_id__in=player_ids).update(last_updated=now, **increments)
+
+    logger.info(f"Recorded friendly game {game.id} for {len(participations)} verified players")
+    return len(participations)
+
+
+def _participation_totals(player_ids=None):
+    """
+    Counter values per player from verified participations in completed games.
+
+    Returns:
+        dict: {player_id: {field: value}} for players with at least one game
+    """
+    participations = FriendlyGamePlayer.objects.filter(codename_verified=True, game__status='COMPLETED')
+    if player_ids is not None:
+        participations = participations.filter(player_id__in=player_ids)
+
+    rows = participations.values('player_id').annotate(
+        total_games=Count('id'),
+        total_wins=Coalesce(Sum('games_won'), 0),
+        total_losses=Coalesce(Sum('games_lost'), 0),
+        total_points=Coalesce(Sum('points_scored'), 0),
+        **{
+            counter: Count('id', filter=Q(position=position))
+            for position, counter in POSITION_COUNTERS.items()
+        },
+    ).order_by()
+    return {row.pop('player_id'): row for row in rows}
+
+
+def _rebuild_chunk(player_ids):
+    totals = _participation_totals(player_ids)
+    existing = {}
+    statistics = FriendlyGameStatistics.objects.all()
+    if player_ids is not None:
+        statistics = statistics.filter(player_id__in=player_ids)
+    for stats in statistics:
+        existing[stats.player_id] = stats
+
+    now = timezone.now()
+    changed, created = [], []
+    for player_id in set(existing) | set(totals):
+        values = dict.fromkeys(STAT_FIELDS, 0)
+        values.update(totals.get(player_id, {}))
+        stats = existing.get(player_id)
+        if stats is None:
+            created.append(FriendlyGameStatistics(player_id=player_id, last_updated=now, **values))
+        elif any(getattr(stats, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(stats, field, value)
+            stats.last_updated = now
+            changed.append(stats)
+
+    with transaction.atomic():
+        FriendlyGameStatistics.objects.bulk_create(created, ignore_conflicts=True)
+        FriendlyGameStatistics.objects.bulk_update(changed, STAT_FIELDS + ['last_updated'])
+    return len(created) + len(changed)
+
+
+def rebuild_friendly_statistics(player_ids=None):
+    """
+    Recompute friendly game counters from the stored participations.
+
+    Args:
+        player_ids: players to rebuild; None rebuilds everybody
+
+    Returns:
+        int: number of statistics rows created or corrected
+    """
+    if player_ids is None:
+        written = _rebuild_chunk(None)
+    else:
+        player_ids = list(player_ids)
+        written = sum(
+            _rebuild_chunk(player_ids[start:start + CHUNK_SIZE])
+            for start in range(0, len(player_ids), CHUNK_SIZE)
+        )
+    logger.info(f"Rebuilt friendly game statistics: {written} rows written")
+    return written
@@ -6,6 +6,7 @@ import json
 import logging
 from teams.models import Player, Team
 from .models import FriendlyGame, FriendlyGamePlayer, PlayerCodename, FriendlyGameStatistics
+from .statistics_service import record_game_result
 from pfc_core.session_utils import CodenameSessionManager
 
 logger = logging.getLogger(__name__)
@@ -132,11 +133,9 @@ def create_game(request):
     # Auto-detect logged-in player and add to black team
     auto_selected_player = None
     if session_codename:
-        try:
-            # Find player by codename
-            player_codename = PlayerCodename.objects.get(codename=session_codename)
-            auto_selected_player = player_codename.player
-        except PlayerCodename.DoesNotExist:
+        # Player behind the codename, resolved once per request by SessionIdentityMiddleware
+        auto_selected_player = request.pfc_player or None
+        if auto_selected_player is None:
             # If no exact codename match, try to find by name similarity
             try:
                 auto_selected_player = Player.objects.get(name__iexact=session_codename)
@@ -200,11 +199,19 @@ def submit_score(request, game_id):
             messages.error(request, 'Scores cannot be tied. One team must win.')
             return redirect('friendly_games:submit_score', game_id=game.id)
         
+        already_completed = game.status == 'COMPLETED'
         game.black_team_score = black_score
         game.white_team_score = white_score
         game.status = 'COMPLETED'
         game.save()
         
+        # Win/loss flags and player counters, once per game
+        if not already_completed:
+            try:
+                record_game_result(game)
+            except Exception as e:
+                logger.error(f"Error recording friendly game statistics for game {game.id}: {e}")
+        
         # ===== RATING SYSTEM INTEGRATION =====
         # Update player ratings after successful friendly game completion
         # This is completely separate from game completion and won't affect it if it fails
@@ -338,11 +345,9 @@ def join_game(request):
     # Auto-detect logged-in player for dual binding (like Create Game)
     auto_selected_player = None
     if session_codename:
-        try:
-            # Find player by codename
-            player_codename = PlayerCodename.objects.get(codename=session_codename)
-            auto_selected_player = player_codename.player
-        except PlayerCodename.DoesNotExist:
+        # Player behind the codename, resolved once per request by SessionIdentityMiddleware
+        auto_selected_player = request.pfc_player or None
+        if auto_selected_player is None:
             # If no exact codename match, try to find by name similarity
             try:
                 auto_selected_player = Player.objects.get(name__iexact=session_codename)
@@ -0,0 +1,102 @@
+import random
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from teams.models import Team
+from tournaments.models import Tournament, TournamentTeam
+from matches.models import Match
+from leaderboards.services import rebuild_tournament_leaderboard, rebuild_team_statistics
+
+
+class Command(BaseCommand):
+    help = 'Benchmark leaderboard rebuilds on synthetic round-robin tournaments (all data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[8, 32, 128],
+            help='Team counts to benchmark',
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for match scores')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        rows = []
+
+        with transaction.atomic():
+            used_pins = set(Team.objects.values_list('pin', flat=True))
+            for size in options['sizes']:
+                tournament = self.create_tournament(size, rng, used_pins)
+
+                with CaptureQueriesContext(connection) as leaderboard_queries:
+                    start = time.perf_counter()
+                    rebuild_tournament_leaderboard(tournament)
+                    leaderboard_time = time.perf_counter() - start
+
+                team_ids = list(tournament.teams.values_list('id', flat=True))
+                with CaptureQueriesContext(connection) as statistics_queries:
+                    start = time.perf_counter()
+                    rebuild_team_statistics(team_ids)
+                    statistics_time = time.perf_counter() - start
+
+                rows.append((size, len(leaderboard_queries), leaderboard_time, len(statistics_queries), statistics_time))
+
+            # Never keep the synthetic data
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{'teams':>6} {'lb queries':>11} {'lb ms':>9} {'stats queries':>14} {'stats ms':>9}")
+        for size, lb_queries, lb_time, st_queries, st_time in rows:
+            self.stdout.write(f"{size:>6} {lb_queries:>11} {lb_time * 1000:>9.1f} {st_queries:>14} {st_time * 1000:>9.1f}")
+
+        query_counts = {(row[1], row[3]) for row in rows}
+        if len(query_counts) == 1:
+            self.stdout.write(self.style.SUCCESS('Query count is constant across team counts.'))
+        else:
+            self.stdout.write(self.style.WARNING('Query count varies with team count.'))
+
+    def create_tournament(self, size, rng, used_pins):
+        """Create a tournament with `size` teams and a completed round robin."""
+        now = timezone.now()
+        tournament = Tournament.objects.create(
+            name=f'Benchmark {size} teams',
+            format='round_robin',
+            play_format='triplets',
+            has_triplets=True,
+            start_date=now,
+            end_date=now + timedelta(days=1),
+        )
+
+        teams = []
+        for i in range(size):
+            pin = f'{rng.randrange(1000000):06d}'
+            while pin in used_pins:
+                pin = f'{rng.randrange(1000000):06d}'
+            used_pins.add(pin)
+            teams.append(Team(name=f'Benchmark {size}-{i + 1}', pin=pin))
+        teams = Team.objects.bulk_create(teams)
+        TournamentTeam.objects.bulk_create([TournamentTeam(tournament=tournament, team=team) for team in teams])
+
+        matches = []
+        for i in range(size):
+            for j in range(i + 1, size):
+                winner_score = 13
+                loser_score = rng.randrange(13)
+                if rng.random() < 0.5:
+                    scores = (winner_score, loser_score)
+                else:
+                    scores = (loser_score, winner_score)
+                matches.append(Match(
+                    tournament=tournament,
+                    team1=teams[i],
+                    team2=teams[j],
+                    team1_score=scores[0],
+                    team2_score=scores[1],
+                    status='completed',
+                ))
+        Match.objects.bulk_create(matches, batch_size=500)
+        return tournament
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from tournaments.models import Tournament
+from leaderboards.services import rebuild_tournament_leaderboard, rebuild_team_statistics
+
+
+class Command(BaseCommand):
+    help = 'Fully rebuild tournament leaderboards and team statistics from completed matches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tournament',
+            type=int,
+            action='append',
+            dest='tournament_ids',
+            help='Only rebuild the leaderboard of this tournament ID (can be repeated)',
+        )
+        parser.add_argument(
+            '--skip-team-statistics',
+            action='store_true',
+            help='Do not rebuild the global TeamStatistics rows',
+        )
+
+    def handle(self, *args, **options):
+        tournaments = Tournament.objects.all().order_by('id')
+        if options['tournament_ids']:
+            tournaments = tournaments.filter(id__in=options['tournament_ids'])
+            if not tournaments.exists():
+                raise CommandError('No tournaments found for the given IDs.')
+
+        rebuilt = 0
+        for tournament in tournaments:
+            leaderboard = rebuild_tournament_leaderboard(tournament)
+            rebuilt += 1
+            self.stdout.write(f'Rebuilt leaderboard for {tournament.name} ({leaderboard.entries.count()} entries)')
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully rebuilt {rebuilt} tournament leaderboards.'))
+
+        if not options['skip_team_statistics']:
+            written = rebuild_team_statistics()
+            self.stdout.write(self.style.SUCCESS(f'Successfully rebuilt statistics for {written} teams.'))
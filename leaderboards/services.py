@@ -0,0 +1,333 @@
+"""
+Incremental leaderboard engine.
+
+Tournament standings are maintained event-driven: when a Match transitions to
+``completed`` (or its completed score is corrected, or it is deleted) the two
+affected LeaderboardEntry rows receive a delta and the leaderboard is re-ranked
+with a single bulk update. Read views only read the stored entries.
+
+Full rebuilds (admin actions, the ``rebuild_leaderboards`` command) aggregate
+all completed matches with one grouped query over the team1/team2 sides and
+write the results back with bulk_create/bulk_update.
+"""
+
+import logging
+from django.db import transaction
+from django.db.models import F, Q, Count, Sum, Case, When, IntegerField
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from .models import Leaderboard, LeaderboardEntry, TeamStatistics
+from pfc_core.live_events import publish_standings
+
+logger = logging.getLogger(__name__)
+
+# Fields that determine a match's contribution to the standings
+RESULT_FIELDS = ("status", "tournament_id", "team1_id", "team2_id", "team1_score", "team2_score")
+
+STAT_FIELDS = ("matches_played", "matches_won", "matches_lost", "points_scored", "points_conceded")
+
+RANKING_ORDER = ("-matches_won", "-points_scored", "id")
+
+TEAM_STATISTICS_FIELDS = [
+    "total_matches_played",
+    "total_matches_won",
+    "total_matches_lost",
+    "total_points_scored",
+    "total_points_conceded",
+    "tournaments_participated",
+    "tournaments_won",
+]
+
+
+def match_result_snapshot(match):
+    """Return the result-relevant values of a match as a plain dict."""
+    return {field: getattr(match, field) for field in RESULT_FIELDS}
+
+
+def match_contribution(snapshot):
+    """
+    Compute what a match contributes to each team's leaderboard entry.
+
+    Args:
+        snapshot: dict produced by match_result_snapshot (or None)
+
+    Returns:
+        dict: {team_id: {stat_field: value}} - empty if the match is not completed
+    """
+    if not snapshot or snapshot["status"] != "completed":
+        return {}
+
+    team1_score = snapshot["team1_score"] or 0
+    team2_score = snapshot["team2_score"] or 0
+    # Draws count as played but not won, matching the full recompute
+    team1_won = 1 if team1_score > team2_score else 0
+    team2_won = 1 if team2_score > team1_score else 0
+
+    return {
+        snapshot["team1_id"]: {
+            "matches_played": 1,
+            "matches_won": team1_won,
+            "matches_lost": 1 - team1_won,
+            "points_scored": team1_score,
+            "points_conceded": team2_score,
+        },
+        snapshot["team2_id"]: {
+            "matches_played": 1,
+            "matches_won": team2_won,
+            "matches_lost": 1 - team2_won,
+            "points_scored": team2_score,
+            "points_conceded": team1_score,
+        },
+    }
+
+
+def apply_match_delta(previous, current):
+    """
+    Apply the difference between two states of a match to the leaderboard.
+
+    ``previous`` is the match as it was stored before the save (None for new
+    matches) and ``current`` is the match after the save (None for deletions).
+    Completing a match adds its contribution, a score correction swaps the old
+    contribution for the new one and a deletion/reopening removes it.
+
+    Returns:
+        bool: True if any leaderboard entry was changed
+    """
+    removed = match_contribution(previous)
+    added = match_contribution(current)
+    if removed == added and (not previous or not current or previous["tournament_id"] == current["tournament_id"]):
+        return False
+
+    with transaction.atomic():
+        touched = set()
+        if removed:
+            _apply_contribution(previous["tournament_id"], removed, sign=-1)
+            touched.add(previous["tournament_id"])
+        if added:
+            _apply_contribution(current["tournament_id"], added, sign=1)
+            touched.add(current["tournament_id"])
+
+        for leaderboard in Leaderboard.objects.filter(tournament_id__in=touched):
+            rerank_leaderboard(leaderboard)
+
+    return True
+
+
+def _apply_contribution(tournament_id, contribution, sign):
+    """Add (sign=1) or subtract (sign=-1) per-team stat deltas using F() expressions."""
+    if sign > 0:
+        leaderboard, created = Leaderboard.objects.get_or_create(tournament_id=tournament_id)
+    else:
+        # Nothing to subtract from (e.g. the leaderboard is being cascade-deleted)
+        leaderboard = Leaderboard.objects.filter(tournament_id=tournament_id).first()
+        if leaderboard is None:
+            return
+
+    for team_id, stats in contribution.items():
+        if sign > 0:
+            entry, created = LeaderboardEntry.objects.get_or_create(
+                leaderboard=leaderboard,
+                team_id=team_id,
+                defaults={"position": 0, **stats},
+            )
+            if created:
+                continue
+            updates = {field: F(field) + value for field, value in stats.items()}
+        else:
+            # Never drop below zero if the stored entry predates incremental updates
+            updates = {field: Greatest(F(field) - value, 0) for field, value in stats.items()}
+
+        LeaderboardEntry.objects.filter(leaderboard=leaderboard, team_id=team_id).update(**updates)
+
+
+def rerank_leaderboard(leaderboard):
+    """Recompute positions for a leaderboard and persist them with one bulk update."""
+    entries = list(
+        LeaderboardEntry.objects.filter(leaderboard=leaderboard)
+        .order_by(*RANKING_ORDER)
+        .only("id", "team_id", "position")
+    )
+
+    changed = []
+    for position, entry in enumerate(entries, start=1):
+        if entry.position != position:
+            entry.position = position
+            changed.append(entry)
+
+    if changed:
+        LeaderboardEntry.objects.bulk_update(changed, ["position"])
+
+    # Touch last_updated so readers can see when standings last moved
+    leaderboard.save(update_fields=["last_updated"])
+    publish_standings(leaderboard.tournament_id, {entry.team_id: entry.position for entry in changed})
+    return len(changed)
+
+
+def get_or_build_leaderboard(tournament):
+    """
+    Return the tournament leaderboard for read views.
+
+    Standings are maintained incrementally, so this only builds the leaderboard
+    from scratch the first time it is requested for a tournament.
+    """
+    leaderboard = Leaderboard.objects.filter(tournament=tournament).first()
+    if leaderboard is None:
+        leaderboard = rebuild_tournament_leaderboard(tournament)
+    return leaderboard
+
+
+# ===== FULL REBUILDS =====
+
+def _side_aggregate(matches, side, other):
+    """Grouped per-team totals for one side (team1 or team2) of the given matches."""
+    return matches.order_by().values(team_id=F(f"{side}_id")).annotate(
+        played=Count("id"),
+        won=Sum(
+            Case(
+                When(**{f"{side}_score__gt": F(f"{other}_score")}, then=1),
+                default=0,
+                output_field=IntegerField(),
+            )
+        ),
+        scored=Sum(Coalesce(f"{side}_score", 0)),
+        conceded=Sum(Coalesce(f"{other}_score", 0)),
+    )
+
+
+def aggregate_team_results(matches):
+    """
+    Aggregate played/won/lost/scored/conceded per team for a Match queryset.
+
+    Both sides are grouped in the database and combined with UNION ALL, so the
+    whole aggregation is a single query regardless of the number of teams.
+
+    Returns:
+        dict: {team_id: {stat_field: value}}
+    """
+    rows = _side_aggregate(matches, "team1", "team2").union(
+        _side_aggregate(matches, "team2", "team1"), all=True
+    )
+
+    results = {}
+    for row in rows:
+        stats = results.setdefault(row["team_id"], dict.fromkeys(STAT_FIELDS, 0))
+        stats["matches_played"] += row["played"]
+        stats["matches_won"] += row["won"] or 0
+        stats["points_scored"] += row["scored"] or 0
+        stats["points_conceded"] += row["conceded"] or 0
+
+    for stats in results.values():
+        stats["matches_lost"] = stats["matches_played"] - stats["matches_won"]
+    return results
+
+
+def rebuild_tournament_leaderboard(tournament):
+    """
+    Recompute every entry of a tournament leaderboard from its completed matches.
+
+    Query count is constant in the number of teams: one aggregation, one read of
+    the existing entries, one bulk_create, one bulk_update and the re-rank.
+    """
+    from matches.models import Match
+
+    with transaction.atomic():
+        leaderboard, created = Leaderboard.objects.get_or_create(tournament=tournament)
+
+        team_ids = set(tournament.teams.values_list("id", flat=True))
+        results = aggregate_team_results(
+            Match.objects.filter(tournament=tournament, status="completed")
+        )
+        existing = {entry.team_id: entry for entry in LeaderboardEntry.objects.filter(leaderboard=leaderboard)}
+
+        to_create = []
+        to_update = []
+        for team_id in team_ids | set(existing):
+            stats = results.get(team_id) if team_id in team_ids else None
+            entry = existing.get(team_id)
+            if entry is None:
+                # Teams without completed matches get an entry once they play
+                if stats:
+                    to_create.append(LeaderboardEntry(leaderboard=leaderboard, team_id=team_id, position=0, **stats))
+                continue
+            for field in STAT_FIELDS:
+                setattr(entry, field, stats[field] if stats else 0)
+            to_update.append(entry)
+
+        if to_create:
+            LeaderboardEntry.objects.bulk_create(to_create)
+        if to_update:
+            LeaderboardEntry.objects.bulk_update(to_update, list(STAT_FIELDS))
+
+        rerank_leaderboard(leaderboard)
+
+    logger.info(f"Rebuilt leaderboard for tournament {tournament.id}: {len(to_create)} created, {len(to_update)} updated")
+    return leaderboard
+
+
+def rebuild_team_statistics(teams=None):
+    """
+    Recompute TeamStatistics across all tournaments for the given teams (or all teams).
+
+    Uses one aggregation over completed matches plus one grouped count each for
+    tournament participation and tournament wins, then writes with bulk operations.
+
+    Returns:
+        int: number of TeamStatistics rows written
+    """
+    from matches.models import Match
+    from teams.models import Team
+    from tournaments.models import TournamentTeam
+
+    matches = Match.objects.filter(status="completed")
+    participations = TournamentTeam.objects.all()
+    wins = LeaderboardEntry.objects.filter(position=1)
+    statistics = TeamStatistics.objects.all()
+    if teams is not None:
+        team_ids = {team.id if isinstance(team, Team) else team for team in teams}
+        matches = matches.filter(Q(team1_id__in=team_ids) | Q(team2_id__in=team_ids))
+        participations = participations.filter(team_id__in=team_ids)
+        wins = wins.filter(team_id__in=team_ids)
+        statistics = statistics.filter(team_id__in=team_ids)
+    else:
+        team_ids = None
+
+    results = aggregate_team_results(matches)
+    participated = dict(participations.order_by().values_list("team_id").annotate(total=Count("id")))
+    won = dict(wins.order_by().values_list("team_id").annotate(total=Count("id")))
+
+    with transaction.atomic():
+        existing = {stats.team_id: stats for stats in statistics}
+
+        to_create = []
+        to_update = []
+        for team_id in set(results) | set(existing):
+            if team_ids is not None and team_id not in team_ids:
+                continue
+            stats = results.get(team_id, dict.fromkeys(STAT_FIELDS, 0))
+            values = {
+                "total_matches_played": stats["matches_played"],
+                "total_matches_won": stats["matches_won"],
+                "total_matches_lost": stats["matches_lost"],
+                "total_points_scored": stats["points_scored"],
+                "total_points_conceded": stats["points_conceded"],
+                "tournaments_participated": participated.get(team_id, 0),
+                "tournaments_won": won.get(team_id, 0),
+            }
+            row = existing.get(team_id)
+            if row is None:
+                to_create.append(TeamStatistics(team_id=team_id, **values))
+                continue
+            for field, value in values.items():
+                setattr(row, field, value)
+            to_update.append(row)
+
+        if to_create:
+            TeamStatistics.objects.bulk_create(to_create)
+        if to_update:
+            # bulk_update bypasses auto_now, so stamp last_updated explicitly
+            now = timezone.now()
+            for row in to_update:
+                row.last_updated = now
+            TeamStatistics.objects.bulk_update(to_update, TEAM_STATISTICS_FIELDS + ["last_updated"])
+
+    return len(to_create) + len(to_update)
@@ -0,0 +1,68 @@
+# signals.py for incremental leaderboard updates
+
+import logging
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from matches.models import Match
+from matches.signals import matches_bulk_created
+from .services import RESULT_FIELDS, match_result_snapshot, apply_match_delta
+
+logger = logging.getLogger("leaderboards")
+
+# Model field names behind the snapshot keys (team1_id -> team1, ...)
+_RESULT_MODEL_FIELDS = {field[:-3] if field.endswith("_id") else field for field in RESULT_FIELDS}
+
+
+@receiver(pre_save, sender=Match)
+def capture_previous_match_result(sender, instance, update_fields=None, **kwargs):
+    """Remember the stored result of a match so post_save can compute a delta."""
+    instance._leaderboard_previous = None
+    instance._leaderboard_skip = False
+
+    if instance.pk is None:
+        return
+    if update_fields is not None and not _RESULT_MODEL_FIELDS.intersection(update_fields):
+        # Nothing that affects the standings is being written
+        instance._leaderboard_skip = True
+        return
+
+    instance._leaderboard_previous = Match.objects.filter(pk=instance.pk).values(*RESULT_FIELDS).first()
+
+
+@receiver(post_save, sender=Match)
+def update_leaderboard_on_match_save(sender, instance, created, **kwargs):
+    """Apply the per-match delta when a match is completed or its result corrected."""
+    if getattr(instance, "_leaderboard_skip", False):
+        return
+
+    previous = getattr(instance, "_leaderboard_previous", None)
+    try:
+        if apply_match_delta(previous, match_result_snapshot(instance)):
+            logger.info(f"Leaderboard updated for tournament {instance.tournament_id} after match {instance.id} save.")
+    except Exception as e:
+        # Log error but don't crash the save operation
+        logger.exception(f"Error updating leaderboard for match {instance.id}: {e}")
+
+
+@receiver(post_delete, sender=Match)
+def update_leaderboard_on_match_delete(sender, instance, **kwargs):
+    """Remove a deleted completed match from the standings."""
+    if instance.status != "completed":
+        return
+    try:
+        apply_match_delta(match_result_snapshot(instance), None)
+    except Exception as e:
+        logger.exception(f"Error updating leaderboard after deleting match {instance.id}: {e}")
+
+
+@receiver(matches_bulk_created, sender=Match)
+def update_leaderboard_on_bulk_create(sender, matches, **kwargs):
+    """bulk_create skips post_save; add any completed matches to the standings."""
+    for match in matches:
+        if match.status != "completed":
+            continue
+        try:
+            apply_match_delta(None, match_result_snapshot(match))
+        except Exception as e:
+            logger.exception(f"Error updating leaderboard for bulk created match {match.id}: {e}")
+
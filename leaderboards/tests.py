@@ -1,3 +1,40 @@
+from datetime import timedelta
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from pfc_core.instrumentation import QueryBudgetTestMixin
+from teams.models import Team
+from tournaments.models import Tournament, TournamentTeam
+from .services import rebuild_tournament_leaderboard
 
-# Create your tests here.
+
+class LeaderboardQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    """Leaderboard pages stay within their query budgets whatever the number of teams."""
+
+    query_budgets = {
+        'tournament_leaderboard': 5,
+    }
+
+    def make_tournament(self, name, teams):
+        now = timezone.now()
+        tournament = Tournament.objects.create(name=name, format='round_robin', start_date=now, end_date=now + timedelta(days=1))
+        for i in range(teams):
+            team = Team.objects.create(name=f'{name} {i}', pin=f'{Team.objects.count() + 100000:06d}')
+            TournamentTeam.objects.create(tournament=tournament, team=team)
+        rebuild_tournament_leaderboard(tournament)
+        return tournament
+
+    def setUp(self):
+        # A returning visitor: the session exists (its first visit also creates it)
+        self.client.get(reverse('home'))
+
+    def test_tournament_leaderboard(self):
+        for teams in (4, 16):
+            with self.subTest(teams=teams):
+                tournament = self.make_tournament(f'Budget {teams}', teams)
+                # Measure the page as built, not as served from the cache
+                cache.clear()
+                response = self.client.get(reverse('tournament_leaderboard', args=[tournament.id]))
+                self.assertEqual(response.status_code, 200)
+                self.assertWithinQueryBudget(response)
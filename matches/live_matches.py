@@ -0,0 +1,124 @@
+"""
+Live matches board data for the match list page.
+
+Every match that is not completed is loaded in one query (teams, tournament,
+round and court joined, activations prefetched) and partitioned by status in
+memory; completed matches are paginated in the database. Friendly games come
+from one more query with the per-side player counts annotated. Matches of
+archived tournaments are left out unless a tournament is asked for explicitly.
+"""
+
+from django.core.paginator import Paginator
+from django.db.models import Count, Prefetch, Q
+from friendly_games.models import FriendlyGame
+from .models import Match, MatchActivation
+
+COMPLETED_PAGE_SIZE = 50
+
+# Status -> (ordering field, descending), as the board lists them
+LIVE_STATUS_ORDER = {
+    'active': ('start_time', True),
+    'pending': ('scheduled_time', False),
+    'pending_verification': ('updated_at', False),
+    'waiting_validation': ('updated_at', False),
+}
+
+FRIENDLY_STATUS_ORDER = {
+    'WAITING_FOR_PLAYERS': ('created_at', True),
+    'ACTIVE': ('started_at', True),
+    'COMPLETED': ('completed_at', True),
+}
+
+
+def _partition(rows, status_order):
+    """Split rows by status and sort each group; rows without a value for the ordering field go last."""
+    groups = {status: [] for status in status_order}
+    for row in rows:
+        if row.status in groups:
+            groups[row.status].append(row)
+    for status, (field, descending) in status_order.items():
+        dated = [row for row in groups[status] if getattr(row, field) is not None]
+        undated = [row for row in groups[status] if getattr(row, field) is None]
+        dated.sort(key=lambda row: (getattr(row, field), row.id), reverse=descending)
+        groups[status] = dated + sorted(undated, key=lambda row: row.id)
+    return groups
+
+
+def _board_matches(tournament):
+    matches = Match.objects.select_related('tournament', 'team1', 'team2', 'round', 'court')
+    if tournament is not None:
+        return matches.filter(tournament=tournament)
+    return matches.filter(tournament__is_archived=False)
+
+
+def _completed_paginator(matches):
+    return Paginator(matches.filter(status='completed').order_by('-end_time', '-id'), COMPLETED_PAGE_SIZE)
+
+
+def completed_page_count(tournament=None):
+    """Number of pages of completed matches on the board (at least 1)."""
+    return _completed_paginator(_board_matches(tournament)).num_pages
+
+
+def completed_page_number(value, num_pages):
+    """
+    The completed matches page Paginator.get_page would show for a raw ?page= value:
+    the first page for non-numbers, the last page for numbers out of range.
+    """
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return 1
+    return number if 1 <= number <= num_pages else num_pages
+
+
+def get_live_matches(tournament=None, completed_page=None):
+    """
+    Matches and friendly games for the match list, grouped by status.
+
+    Args:
+        tournament: only this tournament's matches; None for every non-archived tournament
+        completed_page: page number of the completed matches (invalid values give the first or last page)
+
+    Returns:
+        dict: lists of matches per status under the match_list context names,
+        friendly games per status, and completed_pagination (number,
+        num_pages, count, previous and next page numbers)
+    """
+    matches = _board_matches(tournament)
+
+    live = _partition(
+        matches.filter(status__in=LIVE_STATUS_ORDER).prefetch_related(
+            Prefetch('activations', queryset=MatchActivation.objects.select_related('team')),
+        ),
+        LIVE_STATUS_ORDER,
+    )
+
+    paginator = _completed_paginator(matches)
+    page = paginator.get_page(completed_page)
+
+    friendly = _partition(
+        FriendlyGame.objects.filter(status__in=FRIENDLY_STATUS_ORDER).annotate(
+            black_team_count=Count('players', filter=Q(players__team='BLACK')),
+            white_team_count=Count('players', filter=Q(players__team='WHITE')),
+        ),
+        FRIENDLY_STATUS_ORDER,
+    )
+
+    return {
+        'active_matches': live['active'],
+        'pending_matches': live['pending'],
+        'pending_verification_matches': live['pending_verification'],
+        'waiting_validation': live['waiting_validation'],
+        'completed_matches': list(page.object_list),
+        'completed_pagination': {
+            'number': page.number,
+            'num_pages': paginator.num_pages,
+            'count': paginator.count,
+            'previous_page_number': page.previous_page_number() if page.has_previous() else None,
+            'next_page_number': page.next_page_number() if page.has_next() else None,
+        },
+        'friendly_waiting': friendly['WAITING_FOR_PLAYERS'],
+        'friendly_active': friendly['ACTIVE'],
+        'friendly_completed': friendly['COMPLETED'],
+    }
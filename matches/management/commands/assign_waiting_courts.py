@@ -1,61 +1,29 @@
 from django.core.management.base import BaseCommand
-from matches.models import Match
-from courts.views import auto_assign_court
-from django.utils import timezone
+from courts.court_queue import assign_free_courts
 import logging
 
 logger = logging.getLogger(__name__)
 
 class Command(BaseCommand):
-    help = 'Assign courts to matches that are waiting for courts'
+    help = 'Assign free courts to matches in the court queue (one scheduler pass)'
 
     def handle(self, *args, **options):
-        # Find all matches waiting for courts
-        waiting_matches = Match.objects.filter(
-            status="pending_verification",
-            waiting_for_court=True
-        ).order_by("created_at")
+        activated = assign_free_courts()
         
-        if not waiting_matches.exists():
-            self.stdout.write(self.style.SUCCESS('No matches waiting for courts.'))
-            return
-        
-        assigned_count = 0
-        
-        for match in waiting_matches:
-            self.stdout.write(f'Checking match {match.id}: {match.team1} vs {match.team2}')
-            
-            # Try to assign a court
-            court = auto_assign_court(match)
-            
-            if court:
-                # Court assigned - activate the match
-                match.status = "active"
-                match.start_time = timezone.now()
-                match.waiting_for_court = False
-                match.save()
-                
-                assigned_count += 1
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f'✅ Assigned Court {court.number} to match {match.id} and activated it'
-                    )
-                )
-            else:
-                self.stdout.write(
-                    self.style.WARNING(
-                        f'⏳ No available court for match {match.id}'
-                    )
+        for match in activated:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'✅ Assigned Court {match.court.number} to match {match.id} and activated it'
                 )
+            )
         
-        if assigned_count > 0:
+        if activated:
             self.stdout.write(
                 self.style.SUCCESS(
-                    f'Successfully assigned courts to {assigned_count} waiting matches.'
+                    f'Successfully assigned courts to {len(activated)} waiting matches.'
                 )
             )
         else:
             self.stdout.write(
                 self.style.WARNING('No courts could be assigned to waiting matches.')
             )
-
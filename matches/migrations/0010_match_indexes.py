@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-17 03:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courts', '0010_courtqueueentry'),
+        ('matches', '0009_alter_matchplayer_role'),
+        ('teams', '0008_ratingevent'),
+        ('tournaments', '0009_bracket_slots'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['tournament', 'status'], name='matches_tournament_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['round', 'status'], name='matches_round_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['team1', 'status'], name='matches_team1_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['team2', 'status'], name='matches_team2_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(condition=models.Q(('waiting_for_court', True)), fields=['status', 'created_at'], name='matches_court_wait_idx'),
+        ),
+    ]
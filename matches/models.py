@@ -50,6 +50,19 @@ class Match(models.Model):
     team1_player_count = models.PositiveSmallIntegerField(null=True, blank=True, help_text="Number of players from team 1")
     team2_player_count = models.PositiveSmallIntegerField(null=True, blank=True, help_text="Number of players from team 2")
 
+    class Meta:
+        indexes = [
+            # Status tabs, standings and round progress of one tournament
+            models.Index(fields=['tournament', 'status'], name='matches_tournament_status_idx'),
+            models.Index(fields=['round', 'status'], name='matches_round_status_idx'),
+            # A team's matches by status (team dashboards, next opponent)
+            models.Index(fields=['team1', 'status'], name='matches_team1_status_idx'),
+            models.Index(fields=['team2', 'status'], name='matches_team2_status_idx'),
+            # Matches waiting for a court, oldest first (partial: boolean filters compile to a bare
+            # column test, which cannot use an equality on an indexed column)
+            models.Index(fields=['status', 'created_at'], condition=models.Q(waiting_for_court=True), name='matches_court_wait_idx'),
+        ]
+
     def __str__(self):
         round_info = f"R{self.round.number}" if self.round else "" 
         stage_info = f"S{self.stage.stage_number}" if self.stage else ""
@@ -62,7 +75,8 @@ class Match(models.Model):
         self.team2_score = team2_score
         
         # Only update status and timing if not already completed
-        if self.status != "completed":
+        newly_completed = self.status != "completed"
+        if newly_completed:
             self.status = "completed"
             self.end_time = timezone.now()
             if self.start_time:
@@ -80,13 +94,15 @@ class Match(models.Model):
             self.loser = None
             print(f"Warning: Match {self.id} ended in a draw ({team1_score}-{team2_score}). Winner/Loser not set.")
         
-        # Release the court when match is completed
-        if self.court:
-            self.court.is_available = True
-            self.court.save(update_fields=["is_available"])
+        self.save()
+        
+        # Release the court when match is completed (handing it to a waiting match if any);
+        # a re-scored match may no longer own its court
+        if self.court and newly_completed:
+            from courts.allocation import release_court
+            release_court(self.court)
             print(f"Released court {self.court.number} after match {self.id} completion")
             
-        self.save()
         print(f"Match {self.id} completed. Winner: {self.winner}, Loser: {self.loser}")
         
         # Trigger knockout tournament automation if applicable
@@ -101,7 +117,7 @@ class Match(models.Model):
             # Only trigger for knockout tournaments
             if self.tournament.format == "knockout":
                 print(f"Triggering knockout automation check for tournament {self.tournament.name}")
-                advanced, matches_created, tournament_complete = self.tournament.check_and_advance_knockout_round()
+                advanced, matches_created, tournament_complete = self.tournament.check_and_advance_knockout_round(match=self)
                 
                 if tournament_complete:
                     print(f"🏆 Tournament {self.tournament.name} has been completed!")
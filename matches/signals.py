@@ -0,0 +1,7 @@
+# signals.py - custom match signals
+
+from django.dispatch import Signal
+
+# Sent once after a batch of matches is inserted with bulk_create (which skips
+# post_save). Receivers get the created matches as ``matches``.
+matches_bulk_created = Signal()
@@ -1,3 +1,14 @@
+from unittest import skipUnless
+from django.db import connection
 from django.test import TestCase
+from pfc_core.query_plans import check_query_plans
 
-# Create your tests here.
+
+@skipUnless(connection.vendor == 'sqlite', 'Query plans are checked against SQLite')
+class QueryPlanTests(TestCase):
+    """The hot filter paths keep using their composite indexes."""
+
+    def test_hot_queries_use_their_indexes(self):
+        for result in check_query_plans():
+            with self.subTest(query=result['name']):
+                self.assertTrue(result['ok'], f"{result['name']} does not use {result['index']}:\n{result['plan']}")
@@ -1,6 +1,6 @@
 from django.utils.translation import gettext as _
 import logging
-from courts.models import Court
+from courts.allocation import claim_court
 
 logger = logging.getLogger(__name__)
 
@@ -135,51 +135,7 @@ def auto_assign_court(match):
     Returns:
         Court object if assignment successful, None otherwise
     """
-    # First, try to get tournament-specific courts
-    tournament_courts = match.tournament.tournamentcourt_set.all().select_related("court")
-    
-    if tournament_courts.exists():
-        # Get court IDs from tournament courts
-        court_ids = [tc.court.id for tc in tournament_courts]
-        # Filter to only available courts (not in use)
-        available_courts = Court.objects.filter(
-            id__in=court_ids,
-            is_available=True  # Only get courts that are available
-        )
-    else:
-        # Fallback: use any available court if no tournament courts assigned
-        logger.info(f"No courts assigned to tournament {match.tournament.id}, using general court pool")
-        available_courts = Court.objects.filter(is_available=True)
-    
-    # Double-check: exclude courts assigned to other active matches
-    from .models import Match  # Import locally to avoid circular imports
-    busy_court_ids = Match.objects.filter(
-        status="active",
-        court__isnull=False
-    ).exclude(id=match.id).values_list("court_id", flat=True)
-    
-    available_courts = available_courts.exclude(id__in=busy_court_ids)
-    
-    if not available_courts.exists():
-        logger.info(f"No available courts for match {match.id}")
-        return None
-    
-    # Get the first available court
-    available_court = available_courts.first()
-    
-    if available_court:
-        # Assign court to match
-        match.court = available_court
-        match.save(update_fields=["court"])
-        
-        # Mark court as occupied
-        available_court.is_available = False
-        available_court.save(update_fields=["is_available"])
-        
-        logger.info(f"Assigned court {available_court.id} to match {match.id} and marked as in use")
-        return available_court
-    
-    return None
+    return claim_court(match)
 
 def get_court_assignment_status(match):
     """
@@ -9,60 +9,38 @@ from .models import Match, MatchActivation, MatchPlayer, MatchResult, NextOppone
 from teams.models import Team, Player
 from tournaments.models import Tournament, TournamentTeam, TournamentCourt, Round, Stage
 from courts.models import Court
-from friendly_games.models import FriendlyGame  # Import FriendlyGame model
 from .forms import MatchActivationForm, MatchResultForm, MatchValidationForm
 from .utils import auto_assign_court, get_court_assignment_status
+from courts.allocation import release_court
+from courts.court_queue import enqueue_match
 from .utils import detect_match_type, validate_match_type  # Import match type utilities
+from .live_matches import get_live_matches, completed_page_count, completed_page_number
+from pfc_core.cache_registry import get_or_build
 
 logger = logging.getLogger(__name__)
 
 def match_list(request, tournament_id=None):
-    # Tournament matches (existing functionality)
-    active_matches = Match.objects.filter(status="active").order_by("-start_time")
-    pending_matches = Match.objects.filter(status="pending").order_by("scheduled_time")
-    pending_verification_matches = Match.objects.filter(status="pending_verification").order_by("updated_at")
-    waiting_validation = Match.objects.filter(status="waiting_validation").order_by("updated_at")
-    completed_matches = Match.objects.filter(status="completed").order_by("-end_time")
-
     if tournament_id:
         tournament = get_object_or_404(Tournament, id=tournament_id)
-        active_matches = active_matches.filter(tournament=tournament)
-        pending_matches = pending_matches.filter(tournament=tournament)
-        pending_verification_matches = pending_verification_matches.filter(tournament=tournament)
-        waiting_validation = waiting_validation.filter(tournament=tournament)
-        completed_matches = completed_matches.filter(tournament=tournament)
     else:
         tournament = None
 
-    # Friendly games (new functionality)
-    friendly_waiting = FriendlyGame.objects.filter(status="WAITING_FOR_PLAYERS").order_by("-created_at")
-    friendly_active = FriendlyGame.objects.filter(status="ACTIVE").order_by("-started_at")
-    friendly_completed = FriendlyGame.objects.filter(status="COMPLETED").order_by("-completed_at")
-
-    context = {
-        "active_matches": active_matches,
-        "pending_matches": pending_matches,
-        "pending_verification_matches": pending_verification_matches,
-        "waiting_validation": waiting_validation,
-        "completed_matches": completed_matches,
-        "tournament": tournament,
-        # Friendly games data
-        "friendly_waiting": friendly_waiting,
-        "friendly_active": friendly_active,
-        "friendly_completed": friendly_completed,
-    }
+    # Tournament matches and friendly games, partitioned by status (see live_matches).
+    # Only valid page numbers are cached, so arbitrary ?page= values cannot flood the cache.
+    num_pages = get_or_build("match_list", lambda: completed_page_count(tournament), tournament_id, "num_pages")
+    page = completed_page_number(request.GET.get("page"), num_pages)
+    context = get_or_build(
+        "match_list",
+        lambda: get_live_matches(tournament, page),
+        tournament_id, page,
+    )
+    context = dict(context, tournament=tournament)
     return render(request, "matches/match_list.html", context)
 
 
 def match_detail(request, match_id):
     match = get_object_or_404(Match, id=match_id)
-    team_pin = request.session.get("team_pin")
-    team_obj = None
-    if team_pin:
-        try:
-            team_obj = Team.objects.get(pin=team_pin)
-        except Team.DoesNotExist:
-            pass # Team not found for PIN, team_obj remains None
+    team_obj = request.pfc_team or None  # Resolved once per request by SessionIdentityMiddleware
             
     # Get MatchPlayer entries for display
     match_players_team1 = MatchPlayer.objects.filter(match=match, team=match.team1).select_related("player")
@@ -268,9 +246,8 @@ def match_activate(request, match_id, team_id):
                     status_message = get_court_assignment_status(match)
                     messages.success(request, f"Match validated and activated! {status_message}")
                 else:
-                    # No court available - keep match in waiting state
-                    match.waiting_for_court = True
-                    match.save()
+                    # No court available - queue the match; it starts when a court is freed
+                    enqueue_match(match)
                     
                     messages.warning(request, "Match validated, but no courts are currently available. The match will start automatically when a court becomes free.")
                 
@@ -407,7 +384,7 @@ def match_validate_result(request, match_id, team_id):
                         elif tournament_complete:
                             logger.info(f"Tournament {tournament.name} completed")
                     elif tournament.format == "knockout":
-                        advanced, matches_created, tournament_complete = tournament.check_and_advance_knockout_round()
+                        advanced, matches_created, tournament_complete = tournament.check_and_advance_knockout_round(match=match)
                         if advanced:
                             logger.info(f"Tournament {tournament.name} advanced to next round, created {matches_created} matches")
                         elif tournament_complete:
@@ -434,25 +411,8 @@ def match_validate_result(request, match_id, team_id):
                 
                 if match.court:
                     logger.info(f"Match {match.id} completed, freeing court {match.court.name}")
-                    waiting_matches = Match.objects.filter(
-                        tournament=match.tournament,
-                        status="pending_verification",
-                        waiting_for_court=True
-                    ).order_by("created_at")
-                    
-                    if waiting_matches.exists():
-                        next_match_to_assign = waiting_matches.first()
-                        logger.info(f"Court {match.court.name} freed. Assigning to next waiting match {next_match_to_assign.id}")
-                        next_match_to_assign.court = match.court
-                        next_match_to_assign.waiting_for_court = False
-                        next_match_to_assign.status = "active" # Make it active
-                        next_match_to_assign.start_time = timezone.now()
-                        next_match_to_assign.save()
-                    else:
-                        # No matches waiting, mark court as available
-                        match.court.is_available = True
-                        match.court.save(update_fields=["is_available"])
-                        logger.info(f"Court {match.court.name} marked as available - no matches waiting") 
+                    # Hand the court to the oldest waiting match, or mark it available
+                    release_court(match.court)
                 messages.success(request, "Results validated and match completed.")
                 return redirect("match_detail", match_id=match.id)
             
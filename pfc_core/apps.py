@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class PfcCoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'pfc_core'
+
+    def ready(self):
+        from .cache_registry import connect_invalidation_signals
+        from .live_events import connect_live_signals
+        connect_invalidation_signals()  # Invalidate cached pages when their models change
+        connect_live_signals()  # Push match and court changes to live pages
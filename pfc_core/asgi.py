@@ -2,6 +2,8 @@
 ASGI config for pfc_core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+The web service runs it with gunicorn and uvicorn workers (Procfile,
+render.yaml), which the live update stream at /live/events/ needs to push.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -0,0 +1,183 @@
+"""
+Cache layer for read-heavy public pages.
+
+CACHE_REGIONS declares, for every cached view or template fragment, the
+models its content depends on. Each model has a generation number in the
+cache; a region's cache key includes the generations of all its models, so
+saving or deleting any instance (or calling invalidate_models after a bulk
+write, which sends no signals) makes every dependent entry unreachable
+without having to know or delete its keys.
+
+Views cache data with get_or_build; templates cache rendered fragments with
+the {% cacheregion %} tag from the region_cache library. Hits and misses are
+counted per region (see cache_metrics and the cache_stats command).
+
+With the default local-memory backend each process has its own cache, so
+saves in another process (the automation worker, another gunicorn worker)
+are only seen once CACHE_REGION_TIMEOUT expires, except for the match,
+court and leaderboard changes that a process with open live streams reads
+from the live events (see pfc_core.live_events.TOPIC_MODELS). The file-based
+backend (CACHE_BACKEND=file) shares entries and invalidation between
+processes.
+"""
+
+import hashlib
+import logging
+import time
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+
+logger = logging.getLogger(__name__)
+
+# Region -> models (app_label.ModelName) whose changes invalidate it
+CACHE_REGIONS = {
+    'tournament_list': ('tournaments.Tournament', 'tournaments.TournamentTeam'),
+    'match_list': ('matches.Match', 'matches.MatchActivation', 'tournaments.Tournament', 'teams.Team', 'courts.Court',
+                   'friendly_games.FriendlyGame', 'friendly_games.FriendlyGamePlayer'),
+    'court_list': ('courts.Court', 'courts.CourtComplex', 'courts.CourtComplexRating', 'matches.Match', 'teams.Team'),
+    # Team cards show the team value, which follows the players' ratings
+    'team_list': ('teams.Team', 'teams.TeamProfile', 'teams.Player', 'teams.PlayerProfile'),
+    'leaderboard_index': ('tournaments.Tournament', 'leaderboards.Leaderboard', 'leaderboards.LeaderboardEntry', 'teams.Team'),
+    'tournament_leaderboard': ('tournaments.Tournament', 'tournaments.TournamentTeam', 'leaderboards.Leaderboard',
+                               'leaderboards.LeaderboardEntry', 'matches.Match', 'teams.Team'),
+    # Not a cached page: its key is the version stamp of the identities kept in sessions (pfc_core.identity)
+    'session_identity': ('teams.Team', 'teams.Player', 'friendly_games.PlayerCodename'),
+    'billboard': ('billboard.BillboardEntry', 'billboard.BillboardResponse', 'billboard.BillboardSettings', 'courts.CourtComplex'),
+}
+
+GENERATION_KEY = 'pfc:cache:generation:{model}'
+REGION_KEY = 'pfc:cache:region:{region}:{generations}:{variant}'
+METRIC_KEY = 'pfc:cache:metric:{region}:{outcome}'
+
+
+def region_timeout():
+    return getattr(settings, 'CACHE_REGION_TIMEOUT', 60)
+
+
+def _model_label(model):
+    return model if isinstance(model, str) else model._meta.label
+
+
+def _generations(models):
+    """Current generation of each model; a missing generation starts from the clock so evicted keys never repeat."""
+    keys = [GENERATION_KEY.format(model=model) for model in models]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, time.time_ns(), None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def region_key(region, *vary_on):
+    """Cache key for a region's content under the current model generations."""
+    generations = '.'.join(str(generation) for generation in _generations(CACHE_REGIONS[region]))
+    variant = hashlib.md5(repr(vary_on).encode()).hexdigest()
+    return REGION_KEY.format(region=region, generations=generations, variant=variant)
+
+
+def _count(region, outcome):
+    key = METRIC_KEY.format(region=region, outcome=outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def lookup(region, *vary_on):
+    """(key, cached value or None) for a region, counting the hit or miss."""
+    try:
+        key = region_key(region, *vary_on)
+        value = cache.get(key)
+        _count(region, 'miss' if value is None else 'hit')
+        return key, value
+    except Exception as e:
+        # A cache outage degrades to rendering uncached
+        logger.warning(f"Cache lookup failed for region {region}: {e}")
+        return None, None
+
+
+def store(key, value):
+    if key is not None:
+        try:
+            cache.set(key, value, region_timeout())
+        except Exception as e:
+            logger.warning(f"Cache store failed for {key}: {e}")
+
+
+def get_or_build(region, builder, *vary_on):
+    """
+    Cached data for a region, built with builder() on a miss.
+
+    Args:
+        region: name in CACHE_REGIONS
+        builder: callable returning the (picklable) data
+        vary_on: values that select a variant of the region (ids, filters, page)
+    """
+    key, value = lookup(region, *vary_on)
+    if value is None:
+        value = builder()
+        store(key, value)
+    return value
+
+
+def invalidate_models(*models):
+    """Bump the generation of models (classes or labels); for bulk writes that send no signals."""
+    for model in models:
+        key = GENERATION_KEY.format(model=_model_label(model))
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), None)
+        except Exception as e:
+            logger.warning(f"Could not invalidate cache for {model}: {e}")
+
+
+def cache_metrics():
+    """Hits, misses and hit ratio per region."""
+    keys = {
+        (region, outcome): METRIC_KEY.format(region=region, outcome=outcome)
+        for region in CACHE_REGIONS for outcome in ('hit', 'miss')
+    }
+    values = cache.get_many(keys.values())
+    metrics = {}
+    for region in CACHE_REGIONS:
+        hits = values.get(keys[(region, 'hit')], 0)
+        misses = values.get(keys[(region, 'miss')], 0)
+        metrics[region] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / (hits + misses) * 100, 1) if hits + misses else 0,
+        }
+    return metrics
+
+
+def reset_cache_metrics():
+    cache.delete_many([
+        METRIC_KEY.format(region=region, outcome=outcome)
+        for region in CACHE_REGIONS for outcome in ('hit', 'miss')
+    ])
+
+
+def _invalidate_on_change(sender, **kwargs):
+    invalidate_models(sender)
+
+
+def _invalidate_on_bulk_create(sender, matches, **kwargs):
+    invalidate_models(sender)
+
+
+def connect_invalidation_signals():
+    """Invalidate on save/delete of every model used by a region."""
+    for label in sorted({model for models in CACHE_REGIONS.values() for model in models}):
+        model = apps.get_model(label)
+        post_save.connect(_invalidate_on_change, sender=model, dispatch_uid=f'cache_registry_save_{label}')
+        post_delete.connect(_invalidate_on_change, sender=model, dispatch_uid=f'cache_registry_delete_{label}')
+
+    # Generated rounds are written with bulk_create, which sends no post_save
+    from matches.models import Match
+    from matches.signals import matches_bulk_created
+    matches_bulk_created.connect(_invalidate_on_bulk_create, sender=Match, dispatch_uid='cache_registry_bulk_matches')
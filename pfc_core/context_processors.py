@@ -1,13 +1,26 @@
 # Context Processor for Authentication
-from .session_utils import SessionManager
+from .session_utils import CodenameSessionManager, TeamPinSessionManager
 from .team_session_utils import TeamSessionManager
+from .identity import resolve_identity
 
 def auth_context(request):
     """
     Add authentication context to all templates
     """
-    # Get codename session data
-    codename_context = SessionManager.get_session_context(request)
+    # Get codename session data; names come from the session identity, objects are resolved on use
+    identity = resolve_identity(request)
+    codename_context = {
+        'session_codename': CodenameSessionManager.get_logged_in_codename(request),
+        'player_logged_in': CodenameSessionManager.is_logged_in(request),
+        'team_pin': TeamPinSessionManager.get_logged_in_pin(request),
+        'team_logged_in': TeamPinSessionManager.is_team_logged_in(request),
+    }
+    if codename_context['player_logged_in'] and codename_context['session_codename']:
+        codename_context['logged_in_player'] = getattr(request, 'pfc_player', None)
+        codename_context['player_name'] = identity['player_name'] or codename_context['session_codename']
+    if codename_context['team_logged_in']:
+        codename_context['logged_in_team'] = getattr(request, 'pfc_team', None)
+        codename_context['team_name'] = identity['team_name']
     
     # Get team session data
     team_context = TeamSessionManager.get_team_session_data(request)
@@ -17,4 +30,3 @@ def auth_context(request):
         **codename_context,
         'team_session': team_context
     }
-
@@ -0,0 +1,129 @@
+"""
+Session identity: the player and team behind the current session.
+
+SessionIdentityMiddleware sets request.pfc_player (the player of the
+codename login) and request.pfc_team (the team of the PIN login, or else of
+the team management login that stores team_id). Both are resolved lazily,
+on first use, and at most once per request. Falsy when nobody is logged in:
+test them for truth rather than comparing with None.
+
+The ids and names behind the session's codename and PIN are kept in the
+session with a version stamp, so later requests resolve them without the
+codename and PIN lookups. The stamp is the 'session_identity' cache region
+key of pfc_core.cache_registry, which changes whenever a team, player or
+codename is saved or deleted; the names in the header need no query at all.
+
+The stamp is only meaningful when every process reads the same cache. With a
+per-process cache (the default local memory backend) each worker has its own
+generations, so a session moving between workers would fail the check and be
+rewritten on every switch, and saves made in another process would go
+unnoticed; the identity is then resolved once per request and not stored.
+Anonymous sessions never store anything.
+"""
+
+import logging
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.functional import SimpleLazyObject
+from .cache_registry import region_key
+from .session_utils import CodenameSessionManager
+
+logger = logging.getLogger(__name__)
+
+IDENTITY_SESSION_KEY = 'pfc_identity'
+
+
+def _identity_version():
+    """Version stamp of the stored identities; None when it cannot be shared by every process."""
+    if isinstance(caches['default'], (LocMemCache, DummyCache)):
+        return None
+    try:
+        return region_key('session_identity')
+    except Exception as e:
+        # Without the cache every request resolves its identity again
+        logger.warning(f"Could not read the session identity version: {e}")
+        return None
+
+
+def resolve_identity(request):
+    """
+    Ids and names behind the session's codename and team PIN.
+
+    Returns:
+        dict: codename, player_id, player_name, team_pin, team_id and
+        team_name (None when not logged in or not found)
+    """
+    if hasattr(request, '_pfc_identity'):
+        return request._pfc_identity
+
+    from friendly_games.models import PlayerCodename
+    from teams.models import Team
+
+    codename = CodenameSessionManager.get_logged_in_codename(request)
+    team_pin = request.session.get('team_pin')
+    identity = {
+        'version': None,
+        'codename': codename,
+        'player_id': None,
+        'player_name': None,
+        'team_pin': team_pin,
+        'team_id': None,
+        'team_name': None,
+    }
+    if not (codename or team_pin):
+        # Anonymous visitors: nothing to look up, and no session written for an empty identity
+        request._pfc_identity = identity
+        return identity
+
+    version = _identity_version()
+    stored = request.session.get(IDENTITY_SESSION_KEY)
+    if (
+        stored and version is not None and stored.get('version') == version
+        and stored['codename'] == codename and stored['team_pin'] == team_pin
+    ):
+        request._pfc_identity = stored
+        return stored
+
+    identity['version'] = version
+    if codename:
+        player = PlayerCodename.objects.filter(codename=codename.upper()).values_list('player_id', 'player__name').first()
+        if player:
+            identity['player_id'], identity['player_name'] = player
+    if team_pin:
+        team = Team.objects.filter(pin=team_pin.upper()).values_list('id', 'name').first()
+        if team:
+            identity['team_id'], identity['team_name'] = team
+    if version is not None:
+        request.session[IDENTITY_SESSION_KEY] = identity
+
+    request._pfc_identity = identity
+    return identity
+
+
+def session_player(request):
+    """The logged-in player, or None."""
+    from teams.models import Player
+
+    player_id = resolve_identity(request)['player_id']
+    return Player.objects.filter(id=player_id).first() if player_id else None
+
+
+def session_team(request):
+    """The team of the PIN login, or of the team management login; None if neither."""
+    from teams.models import Team
+
+    team_id = resolve_identity(request)['team_id'] or request.session.get('team_id')
+    return Team.objects.filter(id=team_id).first() if team_id else None
+
+
+class SessionIdentityMiddleware:
+    """Expose request.pfc_player and request.pfc_team, resolved on first use."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.pfc_player = SimpleLazyObject(lambda: session_player(request))
+        request.pfc_team = SimpleLazyObject(lambda: session_team(request))
+        return self.get_response(request)
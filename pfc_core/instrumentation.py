@@ -0,0 +1,201 @@
+"""
+Query count and latency instrumentation per view.
+
+QueryInstrumentationMiddleware wraps every database execute of a request
+(connection.execute_wrapper) and records, per view name, the number of
+queries, the time spent in SQL, the total request time and the repeated
+query fingerprints (the same statement with different parameters, the
+signature of an N+1). The numbers of the current request are on
+request.query_stats; the per-view aggregates of the process are returned by
+query_stats and served to staff by pfc_core.views.query_stats_api.
+
+QUERY_BUDGETS (settings) caps the queries of a view: a request over its
+budget is logged, and raises QueryBudgetExceeded when QUERY_BUDGETS_STRICT
+is set. Tests declare their own budgets with QueryBudgetTestMixin.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Distinct repeated fingerprints kept per view
+TOP_DUPLICATES = 10
+
+_IN_LIST = re.compile(r'IN \((?:%s|\?)(?:, (?:%s|\?))*\)')
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r'\s+')
+# Transaction control statements (a test's savepoints among them) are counted apart
+# from the queries the budgets are about
+_TRANSACTION = re.compile(r'\s*(BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE)\b', re.IGNORECASE)
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A view issued more queries than its budget."""
+
+
+def fingerprint(sql):
+    """SQL with literals and IN lists collapsed, so repeats of one statement compare equal."""
+    sql = _SPACES.sub(' ', sql).strip()
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _LITERALS.sub('?', sql)
+
+
+class QueryRecorder:
+    """execute_wrapper that counts and times the queries of one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.transactions = 0
+        self.sql_time = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            if _TRANSACTION.match(sql):
+                self.transactions += 1
+            else:
+                self.count += 1
+                self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self):
+        """Fingerprints run more than once, most repeated first."""
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count > 1]
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match._func_path
+
+
+def _record(view_name, stats):
+    with _stats_lock:
+        view = _stats.setdefault(view_name, {
+            'requests': 0, 'queries': 0, 'max_queries': 0, 'sql_ms': 0.0,
+            'duration_ms': 0.0, 'max_duration_ms': 0.0, 'over_budget': 0, 'duplicates': Counter(),
+        })
+        view['requests'] += 1
+        view['queries'] += stats['queries']
+        view['max_queries'] = max(view['max_queries'], stats['queries'])
+        view['sql_ms'] += stats['sql_ms']
+        view['duration_ms'] += stats['duration_ms']
+        view['max_duration_ms'] = max(view['max_duration_ms'], stats['duration_ms'])
+        view['over_budget'] += stats['over_budget']
+        for sql, count in stats['duplicates']:
+            view['duplicates'][sql] += count
+        if len(view['duplicates']) > TOP_DUPLICATES * 5:
+            view['duplicates'] = Counter(dict(view['duplicates'].most_common(TOP_DUPLICATES)))
+
+
+def query_stats():
+    """
+    Aggregated numbers per view since the process started (or the last reset).
+
+    Returns:
+        list: dicts with view, requests, avg/max queries, avg SQL and total
+        milliseconds, requests over budget and the most repeated fingerprints,
+        heaviest views first
+    """
+    with _stats_lock:
+        rows = [
+            {
+                'view': view_name,
+                'requests': view['requests'],
+                'avg_queries': round(view['queries'] / view['requests'], 1),
+                'max_queries': view['max_queries'],
+                'budget': query_budget(view_name),
+                'over_budget': view['over_budget'],
+                'avg_sql_ms': round(view['sql_ms'] / view['requests'], 2),
+                'avg_duration_ms': round(view['duration_ms'] / view['requests'], 2),
+                'max_duration_ms': round(view['max_duration_ms'], 2),
+                'duplicates': view['duplicates'].most_common(TOP_DUPLICATES),
+            }
+            for view_name, view in _stats.items()
+        ]
+    return sorted(rows, key=lambda row: -row['avg_queries'])
+
+
+def reset_query_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def query_budget(view_name):
+    return getattr(settings, 'QUERY_BUDGETS', {}).get(view_name)
+
+
+class QueryInstrumentationMiddleware:
+    """Record the queries and timing of every request under its view name."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'QUERY_INSTRUMENTATION', True):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all(initialized_only=True) or [connections['default']]:
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        view_name = _view_name(request)
+        budget = query_budget(view_name)
+        stats = {
+            'view': view_name,
+            'queries': recorder.count,
+            'transactions': recorder.transactions,
+            'sql_ms': recorder.sql_time * 1000,
+            'duration_ms': duration * 1000,
+            'duplicates': recorder.duplicates(),
+            'budget': budget,
+            'over_budget': int(budget is not None and recorder.count > budget),
+        }
+        request.query_stats = stats
+        _record(view_name, stats)
+
+        if stats['over_budget']:
+            message = f"{view_name} issued {recorder.count} queries (budget {budget}): {request.path}"
+            if getattr(settings, 'QUERY_BUDGETS_STRICT', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+
+class QueryBudgetTestMixin:
+    """
+    TestCase mixin: query_budgets maps view names to the most queries they may issue.
+
+    assertWithinQueryBudget(response) fails when the request behind a test
+    client response went over its view's budget, listing the repeated queries.
+    """
+
+    query_budgets = {}
+
+    def assertWithinQueryBudget(self, response, budget=None):
+        stats = response.wsgi_request.query_stats
+        if budget is None:
+            budget = self.query_budgets.get(stats['view'], query_budget(stats['view']))
+        if budget is None:
+            self.fail(f"No query budget declared for {stats['view']}")
+        if stats['queries'] > budget:
+            repeated = '\n'.join(f"  {count}x {sql}" for sql, count in stats['duplicates']) or '  (none)'
+            self.fail(f"{stats['view']} issued {stats['queries']} queries, budget {budget}. Repeated queries:\n{repeated}")
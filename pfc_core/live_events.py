@@ -0,0 +1,356 @@
+"""
+Live updates for the match board, court list and leaderboards.
+
+Model signals (and the bulk paths in courts.allocation, courts.court_queue
+and leaderboards.services, which send none) publish compact events on three
+topics: 'match' (status, court or score of a match changed), 'court' (a
+court was taken or freed) and 'leaderboard' (standings of a tournament
+moved).
+
+Events are written to the LiveEvent table after the transaction commits, so
+writes made by any process reach the streams: the web workers, the
+automation worker and the court scheduler. Each web process runs one poller
+thread while it has open Server-Sent Events streams (see live_views); it
+reads the new rows every LIVE_POLL_INTERVAL seconds, one query however many
+streams are open, and hands every event to the streams that subscribed to
+its topic. The row id is the event id, so a reconnecting client resumes from
+its Last-Event-ID on any worker, and is told to reload when the events it
+missed were pruned.
+
+Ids are handed out when a row is inserted, not when it commits: on
+PostgreSQL a writer can commit id 41 after another has committed id 42. So
+the poller does not only read past the last id it saw, it also reads again
+the events of the last LATE_COMMIT_WINDOW seconds, and every stream (and the
+poller's cache invalidation) remembers which of those it already handled
+(EventCursor).
+
+The poller also invalidates the cached regions behind each event's topic
+(TOPIC_MODELS): with the per-process local-memory cache, the process that
+wrote the change only invalidated its own copy, and a page reloaded on this
+worker after the event arrived would otherwise be served stale.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from datetime import timedelta
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection, transaction
+from django.db.models import Max, Min, Q
+from django.db.models.signals import post_save
+from django.utils import timezone
+from .cache_registry import invalidate_models
+
+logger = logging.getLogger(__name__)
+
+TOPICS = ('match', 'court', 'leaderboard')
+
+# Topic -> models (see pfc_core.cache_registry) whose cached regions an event of the topic makes stale
+TOPIC_MODELS = {
+    'match': ('matches.Match', 'courts.Court'),
+    'court': ('courts.Court',),
+    'leaderboard': ('leaderboards.LeaderboardEntry', 'tournaments.TournamentTeam'),
+}
+
+# Seconds between two reads of new events by a process' poller
+LIVE_POLL_INTERVAL = 1.0
+
+# An event committed this long after a higher id is still delivered
+LATE_COMMIT_WINDOW = timedelta(seconds=10)
+
+# Events kept for clients resuming with Last-Event-ID
+LIVE_EVENT_RETENTION = timedelta(minutes=10)
+
+# Old events are pruned every this many published events
+PRUNE_EVERY = 200
+
+# Events buffered per stream before it is closed as too slow (the client reconnects and resumes)
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Match fields whose change is pushed to the board
+MATCH_EVENT_FIELDS = {'status', 'court', 'team1_score', 'team2_score', 'waiting_for_court'}
+
+_subscriptions = set()
+_lock = threading.Lock()
+_poller = None
+
+
+class EventCursor:
+    """The events already handled: every id up to last_id, and the recent ids (id -> created_at) among them."""
+
+    def __init__(self, last_id=0, recent=None):
+        self.last_id = last_id
+        self.recent = dict(recent or {})
+
+    def take(self, events, horizon):
+        """
+        The events not handled yet, which are then marked handled.
+
+        Args:
+            events: events in id order
+            horizon: events created before this are no longer expected to commit late
+        """
+        new = []
+        for event in events:
+            if event['id'] in self.recent or (event['id'] <= self.last_id and event['created_at'] < horizon):
+                continue
+            self.recent[event['id']] = event['created_at']
+            new.append(event)
+        if events:
+            self.last_id = max(self.last_id, events[-1]['id'])
+        self.recent = {event_id: created_at for event_id, created_at in self.recent.items() if created_at >= horizon}
+        return new
+
+
+class Subscription(EventCursor):
+    """One open stream: the topics and tournament it follows, its event queue and the events it was given."""
+
+    def __init__(self, loop, topics, tournament_id=None, last_id=0, recent=None):
+        super().__init__(last_id, recent)
+        self.loop = loop
+        self.topics = set(topics)
+        self.tournament_id = tournament_id
+        self.queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def wants(self, event):
+        return _wants(event, self.topics, self.tournament_id)
+
+    def deliver(self, event):
+        # Runs on the subscriber's event loop
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+def _wants(event, topics, tournament_id):
+    if event['topic'] not in topics:
+        return False
+    return tournament_id is None or event['tournament'] in (None, tournament_id)
+
+
+def _event(row):
+    event_id, topic, tournament_id, data, created_at = row
+    return {'id': event_id, 'topic': topic, 'tournament': tournament_id, 'data': data, 'created_at': created_at}
+
+
+def _events_matching(condition):
+    from .models import LiveEvent
+
+    rows = LiveEvent.objects.filter(condition).order_by('id').values_list(
+        'id', 'topic', 'tournament_id', 'data', 'created_at',
+    )
+    return [_event(row) for row in rows]
+
+
+def _events_after(last_id):
+    return _events_matching(Q(id__gt=last_id))
+
+
+def _events_since(last_id, horizon):
+    """Events after last_id, and those created since horizon, which may have committed after it."""
+    return _events_matching(Q(id__gt=last_id) | Q(created_at__gte=horizon))
+
+
+def subscribe(loop, topics, tournament_id=None, last_event_id=None):
+    """
+    Open a subscription delivered on ``loop`` (synchronous: it reads the database).
+
+    Args:
+        loop: event loop of the stream
+        topics: topics to receive (subset of TOPICS)
+        tournament_id: only events of this tournament (and global ones); None for all
+        last_event_id: id of the last event the client saw, to replay what it missed
+
+    Returns:
+        tuple: (Subscription, missed events, or None when some of them were
+        already pruned or are too many to replay)
+    """
+    from .models import LiveEvent
+
+    global _poller
+    # Read before the newest id: an event committed in between is then delivered, not skipped
+    horizon = timezone.now() - LATE_COMMIT_WINDOW
+    recent = dict(LiveEvent.objects.filter(created_at__gte=horizon).values_list('id', 'created_at'))
+    bounds = LiveEvent.objects.aggregate(oldest=Min('id'), newest=Max('id'))
+    newest = bounds['newest'] or 0
+    missed = []
+    if last_event_id is not None:
+        if bounds['oldest'] is None or not bounds['oldest'] - 1 <= last_event_id <= newest:
+            # The id comes from another database, or what followed it was pruned
+            missed = None
+        else:
+            events = _events_after(last_event_id)
+            newest = events[-1]['id'] if events else last_event_id
+            recent.update((event['id'], event['created_at']) for event in events)
+            missed = [event for event in events if _wants(event, set(topics), tournament_id)]
+            if len(missed) > SUBSCRIBER_QUEUE_SIZE:
+                missed = None
+
+    subscription = Subscription(loop, topics, tournament_id, newest, recent)
+    with _lock:
+        _subscriptions.add(subscription)
+        if _poller is None:
+            _poller = threading.Thread(target=_poll, name='live-events-poller', daemon=True)
+            _poller.start()
+    return subscription, missed
+
+
+def unsubscribe(subscription):
+    with _lock:
+        _subscriptions.discard(subscription)
+
+
+def _poll():
+    """Read new events for this process' streams until the last one closes."""
+    global _poller
+    invalidated = EventCursor()
+    try:
+        while True:
+            time.sleep(LIVE_POLL_INTERVAL)
+            with _lock:
+                subscriptions = list(_subscriptions)
+                if not subscriptions:
+                    _poller = None
+                    return
+            try:
+                _poll_once(subscriptions, invalidated)
+            except Exception as e:
+                # Try again on the next tick; streams only see the events late
+                logger.warning(f"Could not read live events: {e}")
+                connection.close()
+    finally:
+        connection.close()
+
+
+def _poll_once(subscriptions, invalidated):
+    """
+    Hand the new events to the streams and invalidate the cached regions they make stale.
+
+    Args:
+        subscriptions: the open streams
+        invalidated: EventCursor of the events whose regions this process already invalidated
+    """
+    horizon = timezone.now() - LATE_COMMIT_WINDOW
+    events = _events_since(min(subscription.last_id for subscription in subscriptions), horizon)
+    _dispatch(subscriptions, events, horizon)
+    # Recent events are read on every tick; the cursor invalidates each of them once
+    invalidate_cached_regions(invalidated.take(events, horizon))
+
+
+def _dispatch(subscriptions, events, horizon):
+    for subscription in subscriptions:
+        for event in subscription.take(events, horizon):
+            if subscription.wants(event):
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+                except RuntimeError:
+                    # The stream's event loop is gone
+                    unsubscribe(subscription)
+                    break
+
+
+def invalidate_cached_regions(events):
+    """Invalidate this process' cached regions behind the events' topics; a shared cache was invalidated by the writer."""
+    if not events or not isinstance(caches['default'], LocMemCache):
+        return
+    invalidate_models(*sorted({model for event in events for model in TOPIC_MODELS[event['topic']]}))
+
+
+def publish(topic, data, tournament_id=None):
+    """
+    Record an event for the live streams once the current transaction commits.
+
+    Args:
+        topic: one of TOPICS
+        data: JSON-serialisable payload (ids and the changed values only)
+        tournament_id: tournament the event belongs to, for per-tournament streams
+    """
+    transaction.on_commit(lambda: _store(topic, data, tournament_id))
+
+
+def _store(topic, data, tournament_id):
+    from .models import LiveEvent
+
+    try:
+        event = LiveEvent.objects.create(topic=topic, tournament_id=tournament_id, data=data)
+        if event.id % PRUNE_EVERY == 0:
+            prune_live_events()
+    except Exception as e:
+        # Live updates must never break the write that triggered them
+        logger.warning(f"Could not publish {topic} event: {e}")
+
+
+def prune_live_events():
+    """Delete events past LIVE_EVENT_RETENTION; the newest one is kept so resuming clients can be checked."""
+    from .models import LiveEvent
+
+    newest = LiveEvent.objects.aggregate(newest=Max('id'))['newest']
+    if newest is None:
+        return 0
+    deleted, _ = LiveEvent.objects.filter(
+        created_at__lt=timezone.now() - LIVE_EVENT_RETENTION, id__lt=newest,
+    ).delete()
+    return deleted
+
+
+def match_event(match):
+    return {
+        'id': match.id,
+        'status': match.status,
+        'court': match.court_id,
+        'team1_score': match.team1_score,
+        'team2_score': match.team2_score,
+    }
+
+
+def publish_match(match):
+    publish('match', match_event(match), match.tournament_id)
+
+
+def publish_court(court_id, is_available):
+    publish('court', {'id': court_id, 'is_available': is_available})
+
+
+def publish_standings(tournament_id, moved):
+    """Standings of a tournament changed; moved maps team ids to their new positions."""
+    publish('leaderboard', {'moved': {str(team_id): position for team_id, position in moved.items()}}, tournament_id)
+
+
+def _publish_match_save(sender, instance, created, update_fields=None, **kwargs):
+    if created or update_fields is None or MATCH_EVENT_FIELDS.intersection(update_fields):
+        try:
+            publish_match(instance)
+        except Exception as e:
+            # Live updates must never break a save
+            logger.warning(f"Could not publish match {instance.id}: {e}")
+
+
+def _publish_matches_created(sender, matches, **kwargs):
+    tournaments = {}
+    for match in matches:
+        tournaments[match.tournament_id] = tournaments.get(match.tournament_id, 0) + 1
+    for tournament_id, count in tournaments.items():
+        publish('match', {'created': count}, tournament_id)
+
+
+def _publish_court_save(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'is_available' in update_fields:
+        try:
+            publish_court(instance.id, instance.is_available)
+        except Exception as e:
+            logger.warning(f"Could not publish court {instance.id}: {e}")
+
+
+def connect_live_signals():
+    """Publish match and court saves; leaderboard moves are published by leaderboards.services."""
+    from courts.models import Court
+    from matches.models import Match
+    from matches.signals import matches_bulk_created
+
+    post_save.connect(_publish_match_save, sender=Match, dispatch_uid='live_events_match_save')
+    post_save.connect(_publish_court_save, sender=Court, dispatch_uid='live_events_court_save')
+    matches_bulk_created.connect(_publish_matches_created, sender=Match, dispatch_uid='live_events_matches_created')
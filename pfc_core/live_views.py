@@ -0,0 +1,88 @@
+"""
+Server-Sent Events stream of live updates (see pfc_core.live_events).
+
+GET /live/events/?topics=match,court&tournament=<id> keeps one idle
+connection per page: a keep-alive comment every LIVE_HEARTBEAT seconds and
+one "event: <topic>" message per change. Streams end after
+LIVE_STREAM_MAX_AGE seconds and the browser reconnects with Last-Event-ID,
+which bounds connections left behind by sleeping phones.
+
+Pushing needs the ASGI server (pfc_core.asgi, as deployed). Under WSGI (the
+development server) the view answers 204 No Content, which makes the
+browser's EventSource stop reconnecting instead of polling.
+"""
+
+import asyncio
+import json
+import time
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from . import live_events
+
+LIVE_HEARTBEAT = 15
+LIVE_STREAM_MAX_AGE = 300
+
+# Reconnection delay announced to clients, in milliseconds
+LIVE_RETRY = 5000
+
+# The client missed events that are no longer kept and must reload its page
+RESET_EVENT = "event: reset\ndata: {}\n\n"
+
+
+def _format(event):
+    return f"id: {event['id']}\nevent: {event['topic']}\ndata: {json.dumps(event['data'], separators=(',', ':'))}\n\n"
+
+
+def _parse_request(request):
+    topics = [topic for topic in request.GET.get('topics', '').split(',') if topic in live_events.TOPICS]
+    try:
+        tournament_id = int(request.GET['tournament'])
+    except (KeyError, ValueError):
+        tournament_id = None
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID') or request.GET['last_event_id'])
+    except (KeyError, ValueError):
+        last_event_id = None
+    return topics or list(live_events.TOPICS), tournament_id, last_event_id
+
+
+def _event_stream_response(content):
+    response = StreamingHttpResponse(content, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+    return response
+
+
+async def live_stream(request):
+    """Push match, court and leaderboard changes to the page as Server-Sent Events."""
+    if not isinstance(request, ASGIRequest):
+        # Nothing can be pushed from a WSGI worker
+        return HttpResponse(status=204)
+
+    topics, tournament_id, last_event_id = _parse_request(request)
+
+    async def stream():
+        subscription, missed = await sync_to_async(live_events.subscribe)(
+            asyncio.get_running_loop(), topics, tournament_id, last_event_id,
+        )
+        started = time.monotonic()
+        try:
+            yield f"retry: {LIVE_RETRY}\n\n"
+            if missed is None:
+                yield RESET_EVENT
+                return
+            for event in missed:
+                yield _format(event)
+
+            while time.monotonic() - started < LIVE_STREAM_MAX_AGE and not subscription.overflowed:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), LIVE_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _format(event)
+        finally:
+            live_events.unsubscribe(subscription)
+
+    return _event_stream_response(stream())
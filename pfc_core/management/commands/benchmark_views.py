@@ -0,0 +1,150 @@
+import contextlib
+import io
+import statistics
+import time
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from pfc_core.synthetic_season import generate_season
+
+# Season size at scale 1; every count is multiplied by the scale
+BASE_SEASON = {
+    'teams': 24,
+    'tournaments': 2,
+    'matches': 120,
+    'friendly_games': 200,
+    'billboard_entries': 50,
+    'courts': 6,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the key views and automation paths on synthetic seasons of growing size and print a comparison '
+        'table (all data is rolled back)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scales',
+            type=int,
+            nargs='+',
+            default=[1, 4],
+            help='Season sizes to compare, as multiples of the base season (24 teams, 120 matches, 200 friendly games)',
+        )
+        parser.add_argument('--repeat', type=int, default=3, help='Warm requests per view (the median is reported)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed of the synthetic seasons')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('Use at least one repeat.')
+
+        results = {}
+        with transaction.atomic():
+            for scale in options['scales']:
+                season = {key: value * scale for key, value in BASE_SEASON.items()}
+                start = time.perf_counter()
+                generate_season(seed=options['seed'], label=f'Benchmark x{scale}', teams_per_tournament=season['teams'] // 2, **season)
+                self.stdout.write(f"Scale {scale}: season of {season['teams']} teams generated in {time.perf_counter() - start:.1f}s")
+
+                results[scale] = self.benchmark_views(scale, options['repeat'])
+                results[scale].update(self.benchmark_automation(scale))
+
+            # Never keep the synthetic data
+            transaction.set_rollback(True)
+        cache.clear()
+
+        self.print_table(options['scales'], results)
+
+    def urls(self, scale):
+        from teams.models import Player
+        from tournaments.models import Tournament
+
+        tournament = Tournament.objects.filter(name=f'Benchmark x{scale} Tournament 1').first()
+        player = Player.objects.filter(team__name__startswith=f'Benchmark x{scale} Team').order_by('id').first()
+        return {
+            'match_list': reverse('match_list'),
+            'player_leaderboard': reverse('player_leaderboard'),
+            'player_profile': reverse('player_profile', args=[player.id]),
+            'tournament_leaderboard': reverse('tournament_leaderboard', args=[tournament.id]),
+            'friendly_games_leaderboard': reverse('friendly_games_leaderboard'),
+        }
+
+    def benchmark_views(self, scale, repeat):
+        """(queries, cold ms, warm ms) per view; cold requests run with an empty cache."""
+        client = Client()
+        # Create the session first, as for a returning visitor
+        client.get(reverse('home'))
+
+        results = {}
+        for name, url in self.urls(scale).items():
+            cache.clear()
+            response, cold = self.request(client, url)
+            if response.status_code != 200:
+                raise CommandError(f'{name} returned {response.status_code}')
+            # Counted by the query instrumentation middleware, without transaction statements
+            stats = getattr(response.wsgi_request, 'query_stats', None)
+            if stats is None:
+                raise CommandError('Query instrumentation is off; set QUERY_INSTRUMENTATION=True.')
+            queries = stats['queries']
+            warm = statistics.median(self.request(client, url)[1] for _ in range(repeat))
+            results[name] = (queries, cold, warm)
+        return results
+
+    def request(self, client, url):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            response = client.get(url)
+            elapsed = time.perf_counter() - start
+        return response, elapsed
+
+    def benchmark_automation(self, scale):
+        """(queries, ms, None) per automation path."""
+        from friendly_games.statistics_service import rebuild_friendly_statistics
+        from leaderboards.services import rebuild_tournament_leaderboard
+        from teams.rating_replay import replay_ratings
+        from teams.statistics_service import refresh_player_statistics
+        from tournaments.models import Tournament
+        from tournaments.tasks import check_round_completion
+
+        tournament = Tournament.objects.get(name=f'Benchmark x{scale} Tournament 1')
+        paths = {
+            'round completion check': lambda: check_round_completion(tournament.id),
+            'leaderboard rebuild': lambda: rebuild_tournament_leaderboard(tournament),
+            'player statistics refresh': refresh_player_statistics,
+            'friendly statistics rebuild': rebuild_friendly_statistics,
+            'rating replay (dry run)': replay_ratings,
+        }
+
+        results = {}
+        for name, path in paths.items():
+            # The query log is a bounded deque; start empty so large runs are counted correctly
+            connection.queries_log.clear()
+            with CaptureQueriesContext(connection) as queries, contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                path()
+                elapsed = time.perf_counter() - start
+            results[name] = (len(queries), elapsed, None)
+        return results
+
+    def print_table(self, scales, results):
+        header = f"{'path':<28}" + ''.join(f" {'x' + str(scale) + ' queries':>12} {'cold ms':>9} {'warm ms':>9}" for scale in scales)
+        self.stdout.write(header)
+        varying = []
+        for name in results[scales[0]]:
+            row = f'{name:<28}'
+            for scale in scales:
+                queries, cold, warm = results[scale][name]
+                warm = f'{warm * 1000:>9.1f}' if warm is not None else f"{'-':>9}"
+                row += f' {queries:>12} {cold * 1000:>9.1f} {warm}'
+            self.stdout.write(row)
+            if len({results[scale][name][0] for scale in scales}) > 1:
+                varying.append(name)
+
+        if varying:
+            self.stdout.write(self.style.WARNING(f"Query count varies with the season size: {', '.join(varying)}"))
+        else:
+            self.stdout.write(self.style.SUCCESS('Query counts are constant across season sizes.'))
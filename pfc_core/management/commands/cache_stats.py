@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from pfc_core.cache_registry import CACHE_REGIONS, cache_metrics, reset_cache_metrics
+
+
+class Command(BaseCommand):
+    help = 'Show cache hits and misses per cached page region'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after printing them')
+
+    def handle(self, *args, **options):
+        metrics = cache_metrics()
+        self.stdout.write(f"{'region':<24} {'hits':>8} {'misses':>8} {'hit %':>7}  depends on")
+        for region, models in CACHE_REGIONS.items():
+            row = metrics[region]
+            self.stdout.write(
+                f"{region:<24} {row['hits']:>8} {row['misses']:>8} {row['hit_ratio']:>7}  {', '.join(models)}"
+            )
+        if options['reset']:
+            reset_cache_metrics()
+            self.stdout.write(self.style.SUCCESS('Cache counters reset.'))
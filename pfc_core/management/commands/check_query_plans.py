@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from pfc_core.query_plans import check_query_plans
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot queries and check that each one uses its index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--plans', action='store_true', help='Print the full plan of every query')
+
+    def handle(self, *args, **options):
+        failed = []
+        for result in check_query_plans():
+            status = {True: 'ok', False: 'NO INDEX', None: 'not checked'}[result['ok']]
+            self.stdout.write(f"{status:<12} {result['name']:<40} {result['index']}")
+            if options['plans'] or result['ok'] is False:
+                for line in result['plan'].splitlines():
+                    self.stdout.write(f"             {line}")
+            if result['ok'] is False:
+                failed.append(result['name'])
+
+        if failed:
+            raise CommandError(f"{len(failed)} queries do not use their index: {', '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS('All hot queries use their indexes.'))
@@ -0,0 +1,24 @@
+from django.db import models
+
+
+class LiveEvent(models.Model):
+    """
+    One published live update (pfc_core.live_events).
+
+    The table is the channel between processes: the web workers, the
+    automation worker and the court scheduler all append to it, and every web
+    process polls it for its open Server-Sent Events streams. The id is the
+    SSE event id, so a client resumes from Last-Event-ID on any worker. Rows
+    older than LIVE_EVENT_RETENTION are pruned.
+    """
+    topic = models.CharField(max_length=20)
+    tournament_id = models.PositiveIntegerField(null=True, blank=True, help_text="Tournament the event belongs to, if any")
+    data = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Live Event"
+        verbose_name_plural = "Live Events"
+
+    def __str__(self):
+        return f"{self.topic} #{self.id}"
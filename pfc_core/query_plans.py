@@ -0,0 +1,110 @@
+"""
+Query plans of the platform's hot filter paths.
+
+HOT_QUERIES lists the busiest queries (match board, team dashboards, court
+queue, round progress, friendly statistics and rankings, billboard) with the
+index each one is expected to use. check_query_plans runs EXPLAIN on every
+query and reports whether the plan reads through that index, so a dropped
+index or a rewritten filter that can no longer use it shows up in the
+check_query_plans command and in the regression test (matches.tests).
+
+Plans are read from SQLite's EXPLAIN QUERY PLAN output ("... USING INDEX
+<name> ..."); other databases are reported but not judged.
+"""
+
+import re
+from datetime import timedelta
+from django.db import connection
+from django.utils import timezone
+
+# Any index counts for queries served by an index Django names itself (foreign keys)
+ANY_INDEX = None
+
+
+def _match_board():
+    from matches.models import Match
+    return Match.objects.filter(tournament_id=1, status='active')
+
+
+def _team_matches():
+    from matches.models import Match
+    return Match.objects.filter(team1_id=1, status__in=['pending', 'pending_verification'])
+
+
+def _court_wait():
+    from matches.models import Match
+    return Match.objects.filter(status='pending_verification', waiting_for_court=True).order_by('created_at')
+
+
+def _round_progress():
+    from matches.models import Match
+    return Match.objects.filter(round_id=1, status='completed')
+
+
+def _verified_participations():
+    from friendly_games.models import FriendlyGamePlayer
+    return FriendlyGamePlayer.objects.filter(player_id=1, codename_verified=True)
+
+
+def _validated_games():
+    from friendly_games.models import FriendlyGame
+    return FriendlyGame.objects.filter(validation_status='FULLY_VALIDATED', status='COMPLETED').order_by('-completed_at')
+
+
+def _recent_billboard():
+    from billboard.models import BillboardEntry
+    return BillboardEntry.objects.filter(is_active=True, created_at__gte=timezone.now() - timedelta(hours=24))
+
+
+def _billboard_daily_count():
+    from billboard.models import BillboardEntry
+    today = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+    return BillboardEntry.objects.filter(
+        codename='ABC123', action_type='AT_COURTS',
+        created_at__gte=today, created_at__lt=today + timedelta(days=1), is_active=True,
+    )
+
+
+def _player_matches():
+    from matches.models import MatchPlayer
+    return MatchPlayer.objects.filter(player_id=1)
+
+
+# name -> (queryset factory, index the plan must use)
+HOT_QUERIES = {
+    'match board by tournament and status': (_match_board, 'matches_tournament_status_idx'),
+    'team matches by status': (_team_matches, 'matches_team1_status_idx'),
+    'matches waiting for a court': (_court_wait, 'matches_court_wait_idx'),
+    'round progress': (_round_progress, 'matches_round_status_idx'),
+    'verified friendly participations': (_verified_participations, 'friendly_player_verified_idx'),
+    'validated friendly games': (_validated_games, 'friendly_game_validated_idx'),
+    'recent billboard entries': (_recent_billboard, 'billboard_active_recent_idx'),
+    'billboard daily entry limit': (_billboard_daily_count, 'billboard_daily_count_idx'),
+    'matches of a player': (_player_matches, ANY_INDEX),
+}
+
+
+def uses_index(plan, index):
+    """Whether an SQLite plan reads through the index (any index when index is None)."""
+    if index is None:
+        return bool(re.search(r'USING (COVERING )?INDEX ', plan))
+    return bool(re.search(rf'USING (COVERING )?INDEX {re.escape(index)}\b', plan))
+
+
+def check_query_plans():
+    """
+    EXPLAIN every hot query.
+
+    Returns:
+        list: dicts with name, index, plan and ok (None when the database is not SQLite)
+    """
+    results = []
+    for name, (queryset, index) in HOT_QUERIES.items():
+        plan = queryset().explain()
+        results.append({
+            'name': name,
+            'index': index or 'any index',
+            'plan': plan,
+            'ok': uses_index(plan, index) if connection.vendor == 'sqlite' else None,
+        })
+    return results
@@ -85,10 +85,12 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware", # Add whitenoise middleware
+    "pfc_core.instrumentation.QueryInstrumentationMiddleware",  # Query count and timing per view
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "pfc_core.identity.SessionIdentityMiddleware",  # request.pfc_player / request.pfc_team
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -125,6 +127,34 @@ DATABASES = {
     )
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory by default (per process, no setup). CACHE_BACKEND=file stores entries in
+# CACHE_LOCATION so every process on the host shares them, including invalidations.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem').lower()
+if CACHE_BACKEND == 'file':
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ.get('CACHE_LOCATION', str(BASE_DIR / '.cache')),
+            "OPTIONS": {"MAX_ENTRIES": 5000},
+        }
+    }
+elif CACHE_BACKEND == 'dummy':
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "pfc-platform",
+            "OPTIONS": {"MAX_ENTRIES": 5000},
+        }
+    }
+
+# Seconds a cached page region lives; also bounds how long another process' saves can
+# go unseen with the local memory backend (see pfc_core.cache_registry)
+CACHE_REGION_TIMEOUT = int(os.environ.get('CACHE_REGION_TIMEOUT', 60))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -181,6 +211,22 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # Login URL
 LOGIN_URL = "/admin/login/"
 
+# Tournament automation runs in the run_automation_worker process.
+# Set TOURNAMENT_AUTOMATION_INLINE=True to run round checks inside the request (no worker).
+TOURNAMENT_AUTOMATION_INLINE = os.environ.get('TOURNAMENT_AUTOMATION_INLINE', 'False').lower() == 'true'
+
+# Image renditions are rendered by this many background threads of the web process (see
+# teams.image_pipeline); 0 leaves the queued jobs to the run_image_worker command.
+IMAGE_WORKER_THREADS = int(os.environ.get('IMAGE_WORKER_THREADS', 2))
+
+# Query instrumentation (see pfc_core.instrumentation); stats at /instrumentation/queries/ for staff.
+# A view over its query budget is logged, or fails the request with QUERY_BUDGETS_STRICT=True.
+QUERY_INSTRUMENTATION = os.environ.get('QUERY_INSTRUMENTATION', 'True').lower() == 'true'
+QUERY_BUDGETS_STRICT = os.environ.get('QUERY_BUDGETS_STRICT', 'False').lower() == 'true'
+QUERY_BUDGETS = {
+    'tournament_leaderboard': 5,
+}
+
 
 # Logging Configuration
 LOGGING = {
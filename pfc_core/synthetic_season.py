@@ -0,0 +1,301 @@
+"""
+Synthetic club season for load tests and benchmarks.
+
+generate_season writes a realistic season with bulk_create: courts grouped in
+a complex, teams with players, profiles and codenames, round-robin
+tournaments played round by round (earlier rounds completed, the current one
+part completed, part on court, part pending), friendly games with verified
+participants and billboard entries. Everything is drawn from one seeded
+random generator, so a seed always gives the same season.
+
+bulk_create sends no signals, so the derived data (leaderboards, team, player
+and friendly statistics, ratings) is rebuilt once at the end with the same
+services as the rebuild commands, and the cache generations of the written
+models are bumped.
+"""
+
+import random
+import string
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+
+FIRST_NAMES = [
+    'Alex', 'Camille', 'Dominique', 'Eli', 'Francis', 'Gabriel', 'Hugo', 'Ines', 'Jules', 'Lea',
+    'Louis', 'Manon', 'Marius', 'Nina', 'Noah', 'Pascal', 'Rosa', 'Sacha', 'Theo', 'Yannick',
+]
+LAST_NAMES = [
+    'Bernard', 'Blanc', 'Bonnet', 'Durand', 'Faure', 'Fontaine', 'Garnier', 'Girard', 'Lambert', 'Leroy',
+    'Martin', 'Mercier', 'Moreau', 'Petit', 'Richard', 'Roux', 'Simon', 'Vincent',
+]
+ROLES = ['pointer', 'milieu', 'tirer']
+FRIENDLY_POSITIONS = ['POINTEUR', 'MILIEU', 'TIRER']
+
+# Days the season has been running; billboard entries cover the last week of it
+SEASON_DAYS = 90
+BILLBOARD_DAYS = 7
+
+BATCH_SIZE = 500
+
+
+def _unique_codes(rng, count, alphabet, length, taken):
+    codes = []
+    taken = set(taken)
+    while len(codes) < count:
+        code = ''.join(rng.choices(alphabet, k=length))
+        if code not in taken:
+            taken.add(code)
+            codes.append(code)
+    return codes
+
+
+def _score(rng):
+    """A petanque score: the winner reaches 13."""
+    loser = rng.randrange(13)
+    return (13, loser) if rng.random() < 0.5 else (loser, 13)
+
+
+def _round_robin_rounds(teams):
+    """Rounds of the circle method, each a list of (team1, team2) pairs; odd fields get a bye."""
+    teams = list(teams)
+    if len(teams) % 2:
+        teams.append(None)
+    rounds = []
+    for _ in range(len(teams) - 1):
+        pairs = [(teams[i], teams[-1 - i]) for i in range(len(teams) // 2)]
+        rounds.append([(a, b) for a, b in pairs if a is not None and b is not None])
+        teams.insert(1, teams.pop())
+    return rounds
+
+
+@transaction.atomic
+def generate_season(teams=24, players_per_team=3, tournaments=3, teams_per_tournament=12, matches=150,
+                    friendly_games=200, billboard_entries=60, courts=8, seed=42, label='Season'):
+    """
+    Write a synthetic season to the database.
+
+    Args:
+        teams: number of teams
+        players_per_team: players (with profile and codename) per team
+        tournaments: number of round-robin tournaments
+        teams_per_tournament: teams drawn into each tournament (at most teams)
+        matches: tournament matches in total, spread over the tournaments
+            (at most a double round robin each)
+        friendly_games: friendly games, mostly completed and validated
+        billboard_entries: billboard entries of the last week
+        courts: courts added to the club's complex
+        seed: random seed; the same arguments and seed give the same season
+        label: prefix of the generated names
+
+    Returns:
+        dict: number of objects written per kind
+    """
+    from billboard.models import BillboardEntry
+    from courts.models import Court, CourtComplex
+    from friendly_games.models import FriendlyGame, FriendlyGamePlayer, PlayerCodename
+    from leaderboards.services import rebuild_tournament_leaderboard, rebuild_team_statistics
+    from matches.models import Match, MatchPlayer, MatchResult
+    from teams.models import Team, Player, PlayerProfile
+    from teams.rating_replay import replay_ratings
+    from teams.statistics_service import refresh_player_statistics
+    from friendly_games.statistics_service import rebuild_friendly_statistics
+    from tournaments.models import Tournament, TournamentTeam, TournamentCourt, Round
+    from .cache_registry import invalidate_models
+
+    rng = random.Random(seed)
+    now = timezone.now()
+    season_start = now - timedelta(days=SEASON_DAYS)
+
+    # Courts and their complex
+    first_number = (Court.objects.order_by('-number').values_list('number', flat=True).first() or 0) + 1
+    court_objs = Court.objects.bulk_create([
+        Court(number=first_number + i, name=f'{label} Court {i + 1}') for i in range(courts)
+    ])
+    complex_obj = CourtComplex.objects.create(name=f'{label} Boulodrome', description='Synthetic club grounds')
+    complex_obj.courts.add(*court_objs)
+
+    # Teams, players, profiles and codenames
+    pins = _unique_codes(rng, teams, string.digits, 6, Team.objects.values_list('pin', flat=True))
+    team_objs = Team.objects.bulk_create([
+        Team(name=f'{label} Team {i + 1}', pin=pins[i]) for i in range(teams)
+    ], batch_size=BATCH_SIZE)
+    player_objs = Player.objects.bulk_create([
+        Player(
+            name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            team=team,
+            is_captain=(i == 0),
+        )
+        for team in team_objs for i in range(players_per_team)
+    ], batch_size=BATCH_SIZE)
+    PlayerProfile.objects.bulk_create([
+        PlayerProfile(player=player, skill_level=rng.randint(1, 5)) for player in player_objs
+    ], batch_size=BATCH_SIZE)
+    codenames = _unique_codes(
+        rng, len(player_objs), string.ascii_uppercase + string.digits, 6,
+        PlayerCodename.objects.values_list('codename', flat=True),
+    )
+    PlayerCodename.objects.bulk_create([
+        PlayerCodename(player=player, codename=codename) for player, codename in zip(player_objs, codenames)
+    ], batch_size=BATCH_SIZE)
+    roster = {}
+    for player in player_objs:
+        roster.setdefault(player.team_id, []).append(player)
+
+    # Tournaments, played round by round
+    per_tournament = [matches // tournaments + (1 if i < matches % tournaments else 0) for i in range(tournaments)]
+    field_size = min(teams_per_tournament, teams)
+    free_courts = list(court_objs)
+    tournament_objs = []
+    match_objs = []
+    rounds_written = 0
+    for t in range(tournaments):
+        tournament = Tournament.objects.create(
+            name=f'{label} Tournament {t + 1}',
+            format='round_robin',
+            play_format='triplets',
+            has_triplets=True,
+            start_date=season_start + timedelta(days=t * 7),
+            end_date=now + timedelta(days=30),
+        )
+        tournament_objs.append(tournament)
+        field = rng.sample(team_objs, field_size)
+        TournamentTeam.objects.bulk_create([TournamentTeam(tournament=tournament, team=team) for team in field])
+        TournamentCourt.objects.bulk_create([TournamentCourt(tournament=tournament, court=court) for court in court_objs])
+
+        # A double round robin at most, the last round cut to the requested total
+        legs = _round_robin_rounds(field)
+        legs += [[(b, a) for a, b in pairs] for pairs in legs]
+        planned = []
+        remaining = per_tournament[t]
+        for pairs in legs:
+            if remaining <= 0:
+                break
+            planned.append(pairs[:remaining])
+            remaining -= len(planned[-1])
+        planned = [pairs for pairs in planned if pairs]
+        if not planned:
+            continue
+
+        round_objs = Round.objects.bulk_create([
+            Round(tournament=tournament, number=n, number_in_stage=n, name=f'Round {n}', is_complete=n < len(planned))
+            for n in range(1, len(planned) + 1)
+        ])
+        rounds_written += len(round_objs)
+        Tournament.objects.filter(id=tournament.id).update(current_round_number=len(planned))
+
+        days_per_round = (now - tournament.start_date) / (len(planned) + 1)
+        for round_obj, pairs in zip(round_objs, planned):
+            current = not round_obj.is_complete
+            for position, (team1, team2) in enumerate(pairs):
+                match = Match(
+                    tournament=tournament, round=round_obj, team1=team1, team2=team2,
+                    match_type='triplet', team1_player_count=players_per_team, team2_player_count=players_per_team,
+                )
+                # The current round: half played, then the courts in use, then the rest waiting
+                if not current or position < len(pairs) // 2:
+                    match.status = 'completed'
+                    match.team1_score, match.team2_score = _score(rng)
+                    match.winner, match.loser = (team1, team2) if match.team1_score > match.team2_score else (team2, team1)
+                    match.end_time = tournament.start_date + days_per_round * round_obj.number + timedelta(minutes=position * 7)
+                    match.start_time = match.end_time - timedelta(minutes=rng.randint(40, 90))
+                    match.duration = match.end_time - match.start_time
+                elif free_courts:
+                    court = free_courts.pop()
+                    match.status = 'active'
+                    match.court = court
+                    match.start_time = now - timedelta(minutes=rng.randint(5, 60))
+                else:
+                    match.status = 'pending'
+                match_objs.append(match)
+
+    match_objs = Match.objects.bulk_create(match_objs, batch_size=BATCH_SIZE)
+    busy = [match.court_id for match in match_objs if match.court_id]
+    Court.objects.filter(id__in=busy).update(is_available=False)
+
+    MatchPlayer.objects.bulk_create([
+        MatchPlayer(match=match, player=player, team_id=team.id, role=ROLES[i % len(ROLES)], match_format='triplet')
+        for match in match_objs if match.status in ('completed', 'active')
+        for team in (match.team1, match.team2)
+        for i, player in enumerate(roster[team.id])
+    ], batch_size=BATCH_SIZE)
+    completed = [match for match in match_objs if match.status == 'completed']
+    MatchResult.objects.bulk_create([
+        MatchResult(match=match, submitted_by=match.winner, validated_by=match.loser, validated_at=match.end_time)
+        for match in completed
+    ], batch_size=BATCH_SIZE)
+
+    # Friendly games between players of any team
+    codename_of = {player.id: codename for player, codename in zip(player_objs, codenames)}
+    friendly_objs = []
+    for i in range(friendly_games):
+        game = FriendlyGame(name=f'{label} Friendly {i + 1}', target_score=13)
+        if rng.random() < 0.9:
+            game.status = 'COMPLETED'
+            game.validation_status = 'FULLY_VALIDATED'
+            game.black_team_score, game.white_team_score = _score(rng)
+            game.completed_at = season_start + (now - season_start) * (i + 1) / (friendly_games + 1)
+            game.started_at = game.completed_at - timedelta(minutes=rng.randint(30, 75))
+        else:
+            game.status = 'ACTIVE'
+            game.started_at = now - timedelta(minutes=rng.randint(5, 45))
+        friendly_objs.append(game)
+    friendly_objs = FriendlyGame.objects.bulk_create(friendly_objs, batch_size=BATCH_SIZE)
+
+    participants = []
+    for game in friendly_objs:
+        sides = rng.sample(player_objs, min(6, len(player_objs)))
+        for i, player in enumerate(sides):
+            team = 'BLACK' if i % 2 == 0 else 'WHITE'
+            participation = FriendlyGamePlayer(
+                game=game, player=player, team=team, position=FRIENDLY_POSITIONS[(i // 2) % 3],
+                provided_codename=codename_of[player.id],
+                codename_verified=rng.random() < 0.8,
+            )
+            if game.status == 'COMPLETED':
+                won = (game.black_team_score > game.white_team_score) == (team == 'BLACK')
+                participation.points_scored = game.black_team_score if team == 'BLACK' else game.white_team_score
+                participation.games_won, participation.games_lost = (1, 0) if won else (0, 1)
+            participants.append(participation)
+    FriendlyGamePlayer.objects.bulk_create(participants, batch_size=BATCH_SIZE)
+
+    # Billboard entries of the last week; created_at is set on insert, so it is backdated afterwards
+    actions = [choice for choice, label_ in BillboardEntry.ACTION_CHOICES]
+    slots = [choice for choice, label_ in BillboardEntry.TIME_SLOTS]
+    entries = BillboardEntry.objects.bulk_create([
+        BillboardEntry(
+            codename=rng.choice(codenames) if codenames else 'ABC123',
+            action_type=rng.choice(actions),
+            court_complex=complex_obj,
+            scheduled_time=rng.choice(slots),
+            scheduled_date=now.date(),
+        )
+        for _ in range(billboard_entries)
+    ], batch_size=BATCH_SIZE)
+    for i, entry in enumerate(entries):
+        entry.created_at = now - timedelta(days=BILLBOARD_DAYS) * (i + 1) / (billboard_entries + 1)
+    BillboardEntry.objects.bulk_update(entries, ['created_at'], batch_size=BATCH_SIZE)
+
+    # Derived data, as the rebuild commands compute it
+    for tournament in tournament_objs:
+        rebuild_tournament_leaderboard(tournament)
+    rebuild_team_statistics([team.id for team in team_objs])
+    refresh_player_statistics([player.id for player in player_objs])
+    rebuild_friendly_statistics([player.id for player in player_objs])
+    replay_ratings(dry_run=False)
+
+    invalidate_models(
+        Court, CourtComplex, Team, Player, PlayerProfile, PlayerCodename, Tournament, TournamentTeam, Round,
+        Match, MatchPlayer, MatchResult, FriendlyGame, FriendlyGamePlayer, BillboardEntry,
+    )
+
+    return {
+        'courts': len(court_objs),
+        'teams': len(team_objs),
+        'players': len(player_objs),
+        'tournaments': len(tournament_objs),
+        'rounds': rounds_written,
+        'matches': len(match_objs),
+        'friendly_games': len(friendly_objs),
+        'friendly_participations': len(participants),
+        'billboard_entries': len(entries),
+    }
@@ -0,0 +1,46 @@
+from django import template
+from pfc_core.cache_registry import CACHE_REGIONS, lookup, store
+
+register = template.Library()
+
+
+class CacheRegionNode(template.Node):
+    def __init__(self, nodelist, region, vary_on):
+        self.nodelist = nodelist
+        self.region = region
+        self.vary_on = vary_on
+
+    def render(self, context):
+        region = self.region.resolve(context)
+        vary_on = [variable.resolve(context) for variable in self.vary_on]
+        key, content = lookup(region, *vary_on)
+        if content is None:
+            content = self.nodelist.render(context)
+            store(key, content)
+        return content
+
+
+@register.tag('cacheregion')
+def do_cacheregion(parser, token):
+    """
+    Cache the enclosed fragment until a model of the region changes.
+
+    Usage::
+
+        {% load region_cache %}
+        {% cacheregion "match_list" tournament.id user.is_staff %}
+            ...
+        {% endcacheregion %}
+
+    The first argument is a region from pfc_core.cache_registry.CACHE_REGIONS;
+    every other argument is a value the fragment varies on.
+    """
+    nodelist = parser.parse(('endcacheregion',))
+    parser.delete_first_token()
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a region name")
+    region = parser.compile_filter(bits[1])
+    if isinstance(region.var, str) and region.var not in CACHE_REGIONS:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag: unknown region {bits[1]}")
+    return CacheRegionNode(nodelist, region, [parser.compile_filter(bit) for bit in bits[2:]])
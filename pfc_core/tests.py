@@ -0,0 +1,60 @@
+from django.test import TestCase
+from . import live_events
+from .cache_registry import region_key
+from .models import LiveEvent
+
+
+class ImmediateLoop:
+    """Stands in for a stream's event loop: runs delivered callbacks at once."""
+
+    def call_soon_threadsafe(self, callback, *args):
+        callback(*args)
+
+
+def delivered(subscription):
+    ids = []
+    while not subscription.queue.empty():
+        ids.append(subscription.queue.get_nowait()['id'])
+    return ids
+
+
+class LiveEventPollTests(TestCase):
+
+    def test_event_from_another_process_invalidates_cached_regions(self):
+        subscription = live_events.Subscription(ImmediateLoop(), ['match'])
+        invalidated = live_events.EventCursor()
+        keys = {region: region_key(region) for region in ('match_list', 'court_list', 'team_list')}
+
+        # Written straight to the table, as the automation worker would: this process saw no save
+        event = LiveEvent.objects.create(topic='match', data={'id': 1, 'status': 'active'})
+        self.assertEqual(region_key('match_list'), keys['match_list'])
+
+        live_events._poll_once([subscription], invalidated)
+        self.assertEqual(delivered(subscription), [event.id])
+        self.assertNotEqual(region_key('match_list'), keys['match_list'])
+        self.assertNotEqual(region_key('court_list'), keys['court_list'])
+        self.assertEqual(region_key('team_list'), keys['team_list'])
+
+        # Read again on the next ticks and for a stream that just subscribed: not invalidated twice
+        keys['match_list'] = region_key('match_list')
+        late = live_events.Subscription(ImmediateLoop(), ['match'], last_id=event.id, recent={event.id: event.created_at})
+        live_events._poll_once([subscription, late], invalidated)
+        self.assertEqual(region_key('match_list'), keys['match_list'])
+        self.assertEqual(delivered(subscription) + delivered(late), [])
+
+    def test_event_committed_after_a_higher_id_is_delivered_once(self):
+        subscription = live_events.Subscription(ImmediateLoop(), ['court'])
+        invalidated = live_events.EventCursor()
+
+        # Id 8 was handed out first but its writer commits after id 9's
+        LiveEvent.objects.create(id=9, topic='court', data={'id': 2, 'is_available': False})
+        live_events._poll_once([subscription], invalidated)
+        self.assertEqual(delivered(subscription), [9])
+
+        LiveEvent.objects.create(id=8, topic='court', data={'id': 1, 'is_available': False})
+        live_events._poll_once([subscription], invalidated)
+        self.assertEqual(delivered(subscription), [8])
+        self.assertIn(8, invalidated.recent)
+
+        live_events._poll_once([subscription], invalidated)
+        self.assertEqual(delivered(subscription), [])
@@ -4,6 +4,7 @@ from django.conf import settings
 from django.conf.urls.static import static
 from . import views
 from . import auth_views
+from . import live_views
 
 urlpatterns = [
     path('', views.home, name='home'),
@@ -17,6 +18,8 @@ urlpatterns = [
     path('signin/', include('signin.urls')),
     path('friendly-games/', include('friendly_games.urls')),  # New parallel friendly games system
     path('billboard/', include('billboard.urls')),  # Billboard module for player activity declarations
+    path('live/events/', live_views.live_stream, name='live_stream'),  # Server-Sent Events for live pages
+    path('instrumentation/queries/', views.query_stats_api, name='query_stats_api'),  # Query counts per view (staff)
     
     # Authentication URLs
     path('auth/login/', auth_views.codename_login, name='codename_login'),
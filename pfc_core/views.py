@@ -1,5 +1,8 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
+from .instrumentation import query_stats, reset_query_stats
 
 def home(request):
     """View for the home page"""
@@ -9,3 +12,24 @@ def home(request):
 def dashboard(request):
     """View for the user dashboard"""
     return render(request, 'dashboard.html')
+
+@require_http_methods(["GET", "POST"])
+def query_stats_api(request):
+    """
+    API endpoint with the query count and timing of each view since the process started (staff only).
+    POST clears the numbers.
+    """
+    if not (request.user.is_authenticated and request.user.is_staff):
+        return JsonResponse({
+            'success': False,
+            'error': 'Staff access required'
+        }, status=403)
+
+    if request.method == 'POST':
+        reset_query_stats()
+        return JsonResponse({'success': True, 'views': []})
+
+    return JsonResponse({
+        'success': True,
+        'views': query_stats(),
+    })
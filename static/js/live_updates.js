@@ -0,0 +1,56 @@
+// Live page updates over Server-Sent Events
+// Pages opt in with an element carrying data-live-topics (e.g. "match,court") and
+// optionally data-live-tournament. Each change is dispatched as a "pfc:live" event on
+// document (detail: {topic, data}); unless data-live-reload="false", the page reloads
+// itself once changes stop arriving, instead of being refreshed by hand. A server that
+// cannot push (WSGI) answers 204, and EventSource then stops without reconnecting.
+
+(function() {
+    'use strict';
+
+    const RELOAD_DELAY = 3000;  // Wait for bursts (a whole round being scored) to settle
+
+    const config = document.querySelector('[data-live-topics]');
+    if (!config || !window.EventSource) {
+        return;
+    }
+
+    const params = new URLSearchParams({ topics: config.dataset.liveTopics });
+    if (config.dataset.liveTournament) {
+        params.set('tournament', config.dataset.liveTournament);
+    }
+    const autoReload = config.dataset.liveReload !== 'false';
+    let reloadTimer = null;
+
+    function scheduleReload() {
+        if (!autoReload) {
+            return;
+        }
+        clearTimeout(reloadTimer);
+        reloadTimer = setTimeout(function() {
+            if (document.hidden) {
+                // Reload when the page is looked at again rather than in the background
+                document.addEventListener('visibilitychange', scheduleReload, { once: true });
+            } else {
+                location.reload();
+            }
+        }, RELOAD_DELAY);
+    }
+
+    const source = new EventSource('/live/events/?' + params.toString());
+
+    ['match', 'court', 'leaderboard'].forEach(function(topic) {
+        source.addEventListener(topic, function(event) {
+            document.dispatchEvent(new CustomEvent('pfc:live', {
+                detail: { topic: topic, data: JSON.parse(event.data) }
+            }));
+            scheduleReload();
+        });
+    });
+
+    // Changes were missed while disconnected and are no longer available
+    source.addEventListener('reset', function() {
+        source.close();
+        location.reload();
+    });
+})();
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Team, Player, TeamAvailability, PlayerProfile, TeamProfile
+from .models import Team, Player, TeamAvailability, PlayerProfile, TeamProfile, ImageJob
 
 class PlayerInline(admin.TabularInline):
     model = Player
@@ -157,41 +157,33 @@ class PlayerProfileAdmin(admin.ModelAdmin):
     
     def rating_history_display(self, obj):
         """Display rating history in a readable format"""
-        if not obj.rating_history:
+        events = obj.player.rating_events.order_by('-created_at', '-id')
+        recent_history = list(events[:10])  # Most recent first
+        if not recent_history:
             return "No rating history yet"
         
         history_html = '<div style="max-height: 200px; overflow-y: auto;">'
         history_html += '<table style="width: 100%; font-size: 12px;">'
         history_html += '<tr style="background-color: #f8f9fa;"><th>Date</th><th>Change</th><th>New Rating</th><th>Match</th></tr>'
         
-        # Show last 10 entries
-        recent_history = obj.rating_history[-10:] if len(obj.rating_history) > 10 else obj.rating_history
-        
-        for entry in reversed(recent_history):  # Most recent first
-            try:
-                date = entry.get('timestamp', 'Unknown')[:10]  # Just the date part
-                change = entry.get('change', 0)
-                new_value = entry.get('new_value', 0)
-                match_type = entry.get('match_type', 'unknown')
-                match_id = entry.get('match_id', 'N/A')
-                
-                change_color = '#28a745' if change > 0 else '#dc3545' if change < 0 else '#6c757d'
-                
-                history_html += f'''
-                <tr>
-                    <td>{date}</td>
-                    <td style="color: {change_color};">{change:+.1f}</td>
-                    <td>{new_value:.1f}</td>
-                    <td>{match_type} #{match_id}</td>
-                </tr>
-                '''
-            except (KeyError, TypeError):
-                continue
+        for event in recent_history:
+            game_id = event.match_id or event.friendly_game_id or 'N/A'
+            change_color = '#28a745' if event.change > 0 else '#dc3545' if event.change < 0 else '#6c757d'
+            
+            history_html += f'''
+            <tr>
+                <td>{event.created_at:%Y-%m-%d}</td>
+                <td style="color: {change_color};">{event.change:+.1f}</td>
+                <td>{event.new_value:.1f}</td>
+                <td>{event.source} #{game_id}</td>
+            </tr>
+            '''
                 
         history_html += '</table></div>'
         
-        if len(obj.rating_history) > 10:
-            history_html += f'<p style="font-style: italic; margin-top: 10px;">Showing last 10 of {len(obj.rating_history)} entries</p>'
+        total = events.count()
+        if total > 10:
+            history_html += f'<p style="font-style: italic; margin-top: 10px;">Showing last 10 of {total} entries</p>'
             
         return history_html
     rating_history_display.allow_tags = True
@@ -281,40 +273,32 @@ class TeamProfileAdmin(admin.ModelAdmin):
     
     def value_history_display(self, obj):
         """Display team value history in a readable format"""
-        if not obj.value_history:
+        events = obj.team.value_events.order_by('-created_at', '-id')
+        recent_history = list(events[:10])  # Most recent first
+        if not recent_history:
             return "No value history yet"
         
         history_html = '<div style="max-height: 200px; overflow-y: auto;">'
         history_html += '<table style="width: 100%; font-size: 12px;">'
         history_html += '<tr style="background-color: #f8f9fa;"><th>Date</th><th>Change</th><th>New Value</th><th>Reason</th></tr>'
         
-        # Show last 10 entries
-        recent_history = obj.value_history[-10:] if len(obj.value_history) > 10 else obj.value_history
-        
-        for entry in reversed(recent_history):  # Most recent first
-            try:
-                date = entry.get('timestamp', 'Unknown')[:10]  # Just the date part
-                change = entry.get('change', 0)
-                new_value = entry.get('new_value', 0)
-                reason = entry.get('reason', 'unknown')
-                
-                change_color = '#28a745' if change > 0 else '#dc3545' if change < 0 else '#6c757d'
-                
-                history_html += f'''
-                <tr>
-                    <td>{date}</td>
-                    <td style="color: {change_color};">{change:+.1f}</td>
-                    <td>{new_value:.1f}</td>
-                    <td>{reason.replace('_', ' ').title()}</td>
-                </tr>
-                '''
-            except (KeyError, TypeError):
-                continue
+        for event in recent_history:
+            change_color = '#28a745' if event.change > 0 else '#dc3545' if event.change < 0 else '#6c757d'
+            
+            history_html += f'''
+            <tr>
+                <td>{event.created_at:%Y-%m-%d}</td>
+                <td style="color: {change_color};">{event.change:+.1f}</td>
+                <td>{event.new_value:.1f}</td>
+                <td>{event.source.replace('_', ' ').title()}</td>
+            </tr>
+            '''
                 
         history_html += '</table></div>'
         
-        if len(obj.value_history) > 10:
-            history_html += f'<p style="font-style: italic; margin-top: 10px;">Showing last 10 of {len(obj.value_history)} entries</p>'
+        total = events.count()
+        if total > 10:
+            history_html += f'<p style="font-style: italic; margin-top: 10px;">Showing last 10 of {total} entries</p>'
             
         return history_html
     value_history_display.allow_tags = True
@@ -387,3 +371,12 @@ class TeamProfileAdmin(admin.ModelAdmin):
         """Same access control for deletion"""
         return self.has_change_permission(request, obj)
 
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'model', 'object_id', 'field', 'status', 'attempts', 'run_after', 'started_at', 'finished_at')
+    list_filter = ('status', 'model', 'field')
+    search_fields = ('content_hash', 'last_error')
+    readonly_fields = ('content_hash', 'created_at', 'started_at', 'finished_at', 'worker')
+    ordering = ('-created_at',)
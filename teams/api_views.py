@@ -2,6 +2,7 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from teams.models import Player
+from teams.rating_replay import replay_ratings
 import json
 
 @csrf_exempt
@@ -46,3 +47,37 @@ def player_lookup_api(request):
             'error': f'Server error: {str(e)}'
         })
 
+
+
+@require_http_methods(["POST"])
+def rating_replay_api(request):
+    """
+    API endpoint to recompute all player ratings from the game history (staff only).
+    Runs as a dry run unless dry_run=false is posted.
+    """
+    if not (request.user.is_authenticated and request.user.is_staff):
+        return JsonResponse({
+            'success': False,
+            'error': 'Staff access required'
+        }, status=403)
+
+    try:
+        dry_run = request.POST.get('dry_run', 'true').lower() not in ('false', '0', 'no')
+        limit = int(request.POST.get('limit', 100))
+        result = replay_ratings(dry_run=dry_run)
+        return JsonResponse({
+            'success': True,
+            'dry_run': dry_run,
+            'tournament_games': result['tournament_games'],
+            'friendly_games': result['friendly_games'],
+            'players': result['players'],
+            'changed': len(result['changes']),
+            'changes': result['changes'][:limit],
+            'elapsed': round(result['elapsed'], 3),
+        })
+
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': f'Server error: {str(e)}'
+        })
@@ -0,0 +1,446 @@
+"""
+Image pipeline for profile pictures, team logos and team photos.
+
+Saving a model detects, by SHA-256 of the content, whether an image field
+really changed (detect_image_changes): an untouched field costs nothing, and
+re-uploading the same file keeps the stored one. A changed image is stored as
+uploaded and an ImageJob is queued (enqueue_image_jobs); after the commit the
+job is handed to a small thread pool in the process, so the upload request
+returns without resizing. The run_image_worker command processes jobs left
+behind (restarts, retries) and backfills images saved before the pipeline.
+
+A job renders every size of RENDITION_SIZES in WebP and JPEG, stored under a
+content-addressed name (renditions/<hash>-<size>.<ext>, written once however
+often the image is used), and writes the metadata to the <field>_renditions
+JSON field of the owner. The responsive_image template tag turns that
+metadata into <picture>/srcset markup without any query.
+"""
+
+import hashlib
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction, IntegrityError
+from django.db.models import F
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Bounding boxes (width, height) of the renditions of each image field, smallest first
+RENDITION_SIZES = {
+    'profile_picture': {'thumb': (96, 96), 'list': (300, 300), 'full': (600, 600)},
+    'logo_svg': {'thumb': (96, 96), 'list': (200, 200), 'full': (400, 400)},
+    'team_photo_jpg': {'thumb': (320, 240), 'list': (800, 600), 'full': (1600, 1200)},
+}
+
+# (key in the metadata, PIL format, quality)
+RENDITION_FORMATS = [
+    ('webp', 'WEBP', 80),
+    ('jpeg', 'JPEG', 85),
+]
+
+RENDITION_DIR = 'renditions'
+
+# Base delay for retries; doubles with every failed attempt
+RETRY_BASE_DELAY = timedelta(seconds=30)
+
+# Running jobs older than this are assumed to belong to a dead worker
+STALE_JOB_TIMEOUT = timedelta(minutes=10)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def default_worker_name():
+    """Identify this worker process in ImageJob.worker."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def content_hash(file):
+    """SHA-256 hex digest of a file's content; the file is rewound afterwards."""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def _is_svg(name):
+    return name.lower().endswith('.svg')
+
+
+def detect_image_changes(instance, fields, save_kwargs=None):
+    """
+    Update the <field>_hash and <field>_renditions of image fields about to be saved.
+
+    Call before Model.save. A field whose file is already stored is unchanged.
+    A new upload with the hash already recorded is replaced by the stored file,
+    so nothing is written or processed again. A cleared field drops its hash and
+    renditions.
+
+    Args:
+        instance: model instance being saved
+        fields: names of its image fields
+        save_kwargs: keyword arguments of save; update_fields is extended with
+            the hash and renditions fields of the fields it names
+
+    Returns:
+        list: names of the fields holding a new image to process
+    """
+    update_fields = (save_kwargs or {}).get('update_fields')
+    changed = []
+    touched = []
+    for field in fields:
+        if update_fields is not None and field not in update_fields:
+            continue
+        hash_field, renditions_field = f'{field}_hash', f'{field}_renditions'
+        file = getattr(instance, field)
+
+        if not file:
+            if getattr(instance, hash_field) or getattr(instance, renditions_field):
+                setattr(instance, hash_field, '')
+                setattr(instance, renditions_field, {})
+                touched.append(field)
+            continue
+        if file._committed:
+            continue
+
+        digest = content_hash(file)
+        if digest == getattr(instance, hash_field) and instance.pk:
+            stored = type(instance).objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+            if stored:
+                # The same picture again: keep the stored file and its renditions
+                setattr(instance, field, stored)
+                continue
+
+        setattr(instance, hash_field, digest)
+        setattr(instance, renditions_field, {})
+        touched.append(field)
+        if not _is_svg(file.name):
+            changed.append(field)
+
+    if update_fields is not None and touched:
+        save_kwargs['update_fields'] = list(update_fields) + [
+            name for field in touched for name in (f'{field}_hash', f'{field}_renditions')
+        ]
+    return changed
+
+
+def enqueue_image_jobs(instance, fields):
+    """
+    Queue renditions for the changed image fields of a saved instance.
+
+    A pending job for the same field is reused with the new hash. The jobs are
+    handed to the worker threads once the transaction commits.
+
+    Returns:
+        list: the pending ImageJob of each field
+    """
+    from .models import ImageJob
+
+    jobs = []
+    for field in fields:
+        digest = getattr(instance, f'{field}_hash')
+        key = {'model': instance._meta.label_lower, 'object_id': instance.pk, 'field': field}
+        pending = ImageJob.objects.filter(status='pending', **key)
+        with transaction.atomic():
+            if not pending.update(content_hash=digest, run_after=timezone.now()):
+                try:
+                    with transaction.atomic():
+                        ImageJob.objects.create(content_hash=digest, **key)
+                except IntegrityError:
+                    # Another save queued this field between our update and insert
+                    pending.update(content_hash=digest)
+        jobs.append(pending.first())
+
+    if jobs and getattr(settings, 'IMAGE_WORKER_THREADS', 2) > 0:
+        transaction.on_commit(lambda: _submit([job.id for job in jobs if job]))
+    return jobs
+
+
+def _submit(job_ids):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'IMAGE_WORKER_THREADS', 2), thread_name_prefix='image-worker',
+            )
+    for job_id in job_ids:
+        _executor.submit(_run_in_thread, job_id)
+
+
+def _run_in_thread(job_id):
+    """Claim and run one job from a worker thread."""
+    try:
+        job = claim_job(job_id)
+        if job is not None:
+            run_job(job)
+    except Exception as e:
+        # The job stays pending or running; run_image_worker picks it up
+        logger.warning(f"Image job {job_id} could not run in the background: {e}")
+    finally:
+        # Each worker thread has its own database connection
+        connections.close_all()
+
+
+def claim_job(job_id, worker_name=None):
+    """
+    Atomically claim a pending, due job.
+
+    Returns:
+        ImageJob or None
+    """
+    from .models import ImageJob
+
+    now = timezone.now()
+    claimed = ImageJob.objects.filter(id=job_id, status='pending', run_after__lte=now).update(
+        status='running',
+        worker=worker_name or default_worker_name(),
+        started_at=now,
+        attempts=F('attempts') + 1,
+    )
+    return ImageJob.objects.get(id=job_id) if claimed else None
+
+
+def claim_next_jobs(limit=1, worker_name=None):
+    """
+    Claim up to limit due jobs, oldest first.
+
+    Returns:
+        list: claimed ImageJob rows
+    """
+    from .models import ImageJob
+
+    jobs = []
+    candidates = ImageJob.objects.filter(
+        status='pending', run_after__lte=timezone.now(),
+    ).order_by('run_after', 'id').values_list('id', flat=True)[:limit * 2]
+    for job_id in candidates:
+        job = claim_job(job_id, worker_name)
+        if job is not None:
+            jobs.append(job)
+            if len(jobs) >= limit:
+                break
+    return jobs
+
+
+def run_job(job):
+    """
+    Render a claimed job and record the outcome.
+
+    Failures are retried with exponential backoff until max_attempts is reached.
+
+    Returns:
+        bool: True if the job succeeded
+    """
+    from .models import ImageJob
+
+    try:
+        process_image(job.model, job.object_id, job.field, job.content_hash)
+    except Exception as e:
+        logger.exception(f"Image job {job.id} ({job.field} of {job.model} #{job.object_id}) failed: {e}")
+        _record_failure(job, e)
+        return False
+
+    ImageJob.objects.filter(id=job.id).update(status='succeeded', finished_at=timezone.now(), last_error='')
+    return True
+
+
+def _record_failure(job, error):
+    """Schedule a retry for a failed job, or mark it failed when out of attempts."""
+    from .models import ImageJob
+
+    now = timezone.now()
+    if job.attempts < job.max_attempts:
+        try:
+            with transaction.atomic():
+                ImageJob.objects.filter(id=job.id).update(
+                    status='pending',
+                    run_after=now + RETRY_BASE_DELAY * (2 ** (job.attempts - 1)),
+                    last_error=str(error),
+                )
+            return
+        except IntegrityError:
+            # A newer upload is already queued for this field and replaces the retry
+            pass
+    ImageJob.objects.filter(id=job.id).update(status='failed', finished_at=now, last_error=str(error))
+
+
+def requeue_stale_jobs(timeout=STALE_JOB_TIMEOUT):
+    """
+    Recover jobs left "running" by a worker that died mid-job.
+
+    Returns:
+        int: number of jobs recovered
+    """
+    from .models import ImageJob
+
+    cutoff = timezone.now() - timeout
+    recovered = 0
+    for job in ImageJob.objects.filter(status='running', started_at__lt=cutoff):
+        try:
+            with transaction.atomic():
+                recovered += ImageJob.objects.filter(id=job.id, status='running').update(
+                    status='pending', last_error=f"Recovered from stale worker {job.worker}"
+                )
+        except IntegrityError:
+            # A newer upload is pending for the same field; this one is redundant
+            ImageJob.objects.filter(id=job.id).update(
+                status='failed', finished_at=timezone.now(), last_error=f"Abandoned by worker {job.worker}"
+            )
+    if recovered:
+        logger.warning(f"Requeued {recovered} stale image jobs")
+    return recovered
+
+
+def queue_missing_renditions():
+    """
+    Queue every stored image that has no renditions yet (images saved before the pipeline).
+
+    Returns:
+        int: number of images queued
+    """
+    queued = 0
+    for model_label, fields in (('teams.PlayerProfile', ['profile_picture']),
+                                ('teams.TeamProfile', ['logo_svg', 'team_photo_jpg'])):
+        model = apps.get_model(model_label)
+        for field in fields:
+            for instance in model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True}).filter(
+                **{f'{field}_renditions': {}}
+            ).only('id', field, f'{field}_hash'):
+                file = getattr(instance, field)
+                if _is_svg(file.name):
+                    continue
+                try:
+                    with file.open('rb'):
+                        digest = content_hash(file)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Cannot read {file.name} of {model_label} #{instance.pk}: {e}")
+                    continue
+                model.objects.filter(pk=instance.pk).update(**{f'{field}_hash': digest})
+                setattr(instance, f'{field}_hash', digest)
+                enqueue_image_jobs(instance, [field])
+                queued += 1
+    return queued
+
+
+def rendition_name(digest, size, key):
+    extension = 'jpg' if key == 'jpeg' else key
+    return f'{RENDITION_DIR}/{digest[:2]}/{digest}-{size}.{extension}'
+
+
+def render_renditions(file, sizes, digest):
+    """
+    Write the renditions of an image file.
+
+    Sizes are rendered largest first, each from the previous one, and never
+    upscaled; a size that would repeat the previous dimensions is skipped.
+
+    Args:
+        file: open image file
+        sizes: {size name: (max width, max height)}
+        digest: content hash, used for the rendition names
+
+    Returns:
+        dict: width and height of the source and the list of renditions, each
+        with its size name, width, height and the storage name and byte size
+        of every format, smallest first
+    """
+    from .image_utils import encode_image
+
+    with Image.open(file) as source:
+        largest = max(max(box) for box in sizes.values())
+        # Let the JPEG decoder scale down while decoding (to at least twice the largest rendition)
+        source.draft('RGB', (largest * 2, largest * 2))
+        image = ImageOps.exif_transpose(source)
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        # Palette and grayscale images are resampled in colour, keeping transparency
+        transparent = 'A' in image.getbands() or 'transparency' in image.info
+        image = image.convert('RGBA' if transparent else 'RGB')
+    width, height = image.size
+
+    renditions = []
+    for size, box in sorted(sizes.items(), key=lambda item: item[1], reverse=True):
+        image = image.copy()
+        image.thumbnail(box, Image.Resampling.LANCZOS, reducing_gap=3.0)
+        if renditions and image.size == (renditions[-1]['width'], renditions[-1]['height']):
+            continue
+        rendition = {'size': size, 'width': image.width, 'height': image.height}
+        for key, output_format, quality in RENDITION_FORMATS:
+            name = rendition_name(digest, size, key)
+            if default_storage.exists(name):
+                rendition[key] = {'name': name, 'bytes': default_storage.size(name)}
+                continue
+            data = encode_image(image, output_format, quality)
+            rendition[key] = {'name': default_storage.save(name, ContentFile(data)), 'bytes': len(data)}
+        renditions.append(rendition)
+
+    renditions.reverse()
+    return {'width': width, 'height': height, 'renditions': renditions}
+
+
+def process_image(model_label, object_id, field, digest):
+    """
+    Render the renditions of one image field and store their metadata.
+
+    Does nothing when the field no longer holds the image with this hash (a
+    newer upload has its own job).
+
+    Returns:
+        bool: True if renditions were written
+    """
+    from pfc_core.cache_registry import invalidate_models
+
+    model = apps.get_model(model_label)
+    hash_field, renditions_field = f'{field}_hash', f'{field}_renditions'
+    instance = model.objects.filter(pk=object_id, **{hash_field: digest}).only('id', field).first()
+    if instance is None:
+        return False
+
+    file = getattr(instance, field)
+    with file.open('rb'):
+        metadata = render_renditions(file, RENDITION_SIZES[field], digest)
+    metadata['hash'] = digest
+
+    updated = model.objects.filter(pk=object_id, **{hash_field: digest}).update(**{renditions_field: metadata})
+    if updated:
+        # A queryset update sends no post_save for the page caches
+        invalidate_models(model)
+    return bool(updated)
+
+
+def process_jobs(max_jobs=None, threads=1, worker_name=None):
+    """
+    Run due jobs on a thread pool until the queue is empty or max_jobs have been processed.
+
+    Returns:
+        tuple: (jobs processed, jobs failed)
+    """
+    processed = failed = 0
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='image-worker') as pool:
+        while max_jobs is None or processed < max_jobs:
+            limit = threads if max_jobs is None else min(threads, max_jobs - processed)
+            jobs = claim_next_jobs(limit, worker_name)
+            if not jobs:
+                break
+            for succeeded in pool.map(_run_and_close, jobs):
+                processed += 1
+                failed += not succeeded
+    return processed, failed
+
+
+def _run_and_close(job):
+    try:
+        return run_job(job)
+    finally:
+        connections.close_all()
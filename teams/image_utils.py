@@ -153,3 +153,36 @@ def get_image_info(image_file):
     except Exception as e:
         return {'error': str(e)}
 
+
+def flatten_transparency(image, background_color=(255, 255, 255)):
+    """Paste an image with transparency onto a plain background (for JPEG output)."""
+    if image.mode in ('RGBA', 'LA', 'P'):
+        if image.mode != 'RGBA':
+            image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, background_color)
+        background.paste(image, mask=image.split()[-1])
+        return background
+    if image.mode != 'RGB':
+        return image.convert('RGB')
+    return image
+
+def encode_image(image, output_format, quality=85):
+    """
+    Encode an image in memory.
+
+    Args:
+        image: PIL image
+        output_format: 'JPEG' or 'WEBP'
+        quality: encoder quality (1-100)
+
+    Returns:
+        bytes: the encoded image
+    """
+    output_buffer = io.BytesIO()
+    if output_format == 'JPEG':
+        flatten_transparency(image).save(output_buffer, format='JPEG', quality=quality, optimize=True, progressive=True)
+    else:
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        image.save(output_buffer, format=output_format, quality=quality, method=4)
+    return output_buffer.getvalue()
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from teams.statistics_service import refresh_player_statistics
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized PlayerStatistics rows from completed matches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--player',
+            type=int,
+            action='append',
+            dest='player_ids',
+            help='Only rebuild statistics for this player ID (can be repeated)',
+        )
+
+    def handle(self, *args, **options):
+        written = refresh_player_statistics(options['player_ids'])
+        self.stdout.write(self.style.SUCCESS(f'Successfully wrote {written} player statistics rows.'))
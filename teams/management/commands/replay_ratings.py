@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from teams.rating_replay import replay_ratings, REPLAY_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Recompute every player rating by replaying all completed matches and validated friendly games'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show how ratings would change without writing anything',
+        )
+        parser.add_argument('--chunk-size', type=int, default=REPLAY_CHUNK_SIZE, help='Games fetched per query')
+        parser.add_argument('--show', type=int, default=20, help='Number of largest differences to list')
+
+    def handle(self, *args, **options):
+        result = replay_ratings(dry_run=options['dry_run'], chunk_size=options['chunk_size'])
+
+        self.stdout.write(
+            f"Replayed {result['tournament_games']} matches and {result['friendly_games']} friendly games "
+            f"for {result['players']} players in {result['elapsed']:.2f}s"
+        )
+        for change in result['changes'][:options['show']]:
+            self.stdout.write(
+                f"  {change['player']:<30} {change['current']:>8.2f} -> {change['replayed']:>8.2f} "
+                f"({change['difference']:+.2f})"
+            )
+        if len(result['changes']) > options['show']:
+            self.stdout.write(f"  ... and {len(result['changes']) - options['show']} more")
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f"Dry run: {len(result['changes'])} ratings would change."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Successfully updated {len(result['changes'])} ratings."))
@@ -0,0 +1,61 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from teams.image_pipeline import process_jobs, queue_missing_renditions, requeue_stale_jobs, default_worker_name
+
+
+class Command(BaseCommand):
+    help = 'Render queued image renditions (profile pictures, team logos and team photos) on a thread pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process all due jobs and exit instead of polling',
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=4,
+            help='Images rendered in parallel (default: 4)',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5.0,
+            help='Seconds to wait between polls when the queue is empty (default: 5)',
+        )
+        parser.add_argument(
+            '--backfill',
+            action='store_true',
+            help='First queue every stored image that has no renditions yet',
+        )
+
+    def handle(self, *args, **options):
+        if options['threads'] < 1:
+            raise CommandError('Use at least one thread.')
+
+        worker_name = default_worker_name()
+        self.stdout.write(f'Image worker {worker_name} started with {options["threads"]} threads')
+        if options['backfill']:
+            queued = queue_missing_renditions()
+            self.stdout.write(f'Queued {queued} images without renditions')
+
+        processed = failed = 0
+        try:
+            while True:
+                close_old_connections()
+                requeue_stale_jobs()
+                done, errors = process_jobs(threads=options['threads'], worker_name=worker_name)
+                processed += done
+                failed += errors
+                if errors:
+                    self.stdout.write(self.style.WARNING(f'{errors} of {done} image jobs failed (see the log)'))
+                if options['once']:
+                    break
+                if not done:
+                    time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping image worker')
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} image jobs ({failed} failed).'))
@@ -0,0 +1,91 @@
+# Generated by Django 5.2 on 2026-10-17 02:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+
+def _win_rate(played, won):
+    return round((won / played) * 100, 1) if played else 0
+
+
+def backfill_statistics(apps, schema_editor):
+    """Fill the new table with the same aggregation as rebuild_player_statistics, so the leaderboard is populated on deploy."""
+    Player = apps.get_model('teams', 'Player')
+    PlayerStatistics = apps.get_model('teams', 'PlayerStatistics')
+    Match = apps.get_model('matches', 'Match')
+    MatchPlayer = apps.get_model('matches', 'MatchPlayer')
+
+    # Overall figures: completed matches of the player's team
+    completed = Match.objects.filter(status='completed').order_by()
+    team_results = {}
+    for field in ('team1_id', 'team2_id'):
+        rows = completed.values(team_id=F(field)).annotate(
+            played=Count('id'),
+            won=Sum(Case(When(winner_id=F(field), then=1), default=0, output_field=IntegerField())),
+        )
+        for row in rows:
+            played, won = team_results.get(row['team_id'], (0, 0))
+            team_results[row['team_id']] = (played + row['played'], won + (row['won'] or 0))
+
+    # Per role and format: the player's MatchPlayer rows, plus the roll-ups
+    participations = {}
+    rows = MatchPlayer.objects.filter(match__status='completed').annotate(
+        format_key=Coalesce('match_format', 'match__match_type', Value('unknown')),
+    ).values('player_id', 'role', 'format_key').annotate(
+        played=Count('id'),
+        won=Sum(Case(When(match__winner_id=F('team_id'), then=1), default=0, output_field=IntegerField())),
+    ).order_by()
+    for row in rows:
+        role = row['role'] or 'flex'
+        buckets = participations.setdefault(row['player_id'], {})
+        for key in ((role, row['format_key']), (role, 'all'), ('all', row['format_key'])):
+            totals = buckets.setdefault(key, [0, 0])
+            totals[0] += row['played']
+            totals[1] += row['won'] or 0
+
+    statistics = []
+    for player_id, team_id in Player.objects.values_list('id', 'team_id').iterator():
+        played, won = team_results.get(team_id, (0, 0))
+        statistics.append(PlayerStatistics(
+            player_id=player_id, role='all', match_format='all',
+            matches_played=played, matches_won=won, win_rate=_win_rate(played, won),
+        ))
+        for (role, match_format), (played, won) in participations.get(player_id, {}).items():
+            statistics.append(PlayerStatistics(
+                player_id=player_id, role=role, match_format=match_format,
+                matches_played=played, matches_won=won, win_rate=_win_rate(played, won),
+            ))
+    PlayerStatistics.objects.bulk_create(statistics, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0006_subteam_subteamplayerassignment'),
+        ('matches', '0009_alter_matchplayer_role'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(default='all', help_text="MatchPlayer role, or 'all' for every role", max_length=10)),
+                ('match_format', models.CharField(default='all', help_text="Match format, or 'all' for every format", max_length=20)),
+                ('matches_played', models.PositiveIntegerField(default=0)),
+                ('matches_won', models.PositiveIntegerField(default=0)),
+                ('win_rate', models.FloatField(default=0.0, help_text='Win rate percentage, stored for DB-side sorting')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='statistics', to='teams.player')),
+            ],
+            options={
+                'verbose_name': 'Player Statistics',
+                'verbose_name_plural': 'Player Statistics',
+                'indexes': [models.Index(fields=['role', 'match_format', '-win_rate', '-matches_played'], name='teams_pstat_leaderboard_idx')],
+                'unique_together': {('player', 'role', 'match_format')},
+            },
+        ),
+        migrations.RunPython(backfill_statistics, migrations.RunPython.noop),
+    ]
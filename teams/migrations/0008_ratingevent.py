@@ -0,0 +1,110 @@
+# Generated by Django 5.2 on 2026-10-17 02:48
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.utils.dateparse import parse_datetime
+
+
+def _history_time(entry):
+    timestamp = parse_datetime(entry.get('timestamp') or '')
+    if timestamp is None:
+        return django.utils.timezone.now()
+    if django.utils.timezone.is_naive(timestamp):
+        timestamp = django.utils.timezone.make_aware(timestamp)
+    return timestamp
+
+
+def copy_json_history(apps, schema_editor):
+    """Move the rating_history / value_history JSON entries into RatingEvent rows."""
+    PlayerProfile = apps.get_model('teams', 'PlayerProfile')
+    TeamProfile = apps.get_model('teams', 'TeamProfile')
+    RatingEvent = apps.get_model('teams', 'RatingEvent')
+    Match = apps.get_model('matches', 'Match')
+    FriendlyGame = apps.get_model('friendly_games', 'FriendlyGame')
+
+    match_ids = set(Match.objects.values_list('id', flat=True))
+    friendly_ids = set(FriendlyGame.objects.values_list('id', flat=True))
+    events = []
+
+    for profile in PlayerProfile.objects.exclude(rating_history=[]).only('player_id', 'rating_history').iterator():
+        for entry in profile.rating_history if isinstance(profile.rating_history, list) else []:
+            if not isinstance(entry, dict) or 'new_value' not in entry:
+                continue
+            match_id = friendly_game_id = None
+            game = str(entry.get('match_id') or '')
+            if game.startswith('friendly_') and game[len('friendly_'):].isdigit():
+                friendly_game_id = int(game[len('friendly_'):])
+            elif game.isdigit():
+                match_id = int(game)
+            events.append(RatingEvent(
+                player_id=profile.player_id,
+                match_id=match_id if match_id in match_ids else None,
+                friendly_game_id=friendly_game_id if friendly_game_id in friendly_ids else None,
+                source='friendly' if friendly_game_id else entry.get('match_type') or 'tournament',
+                old_value=entry.get('old_value', entry['new_value']),
+                new_value=entry['new_value'],
+                change=entry.get('change', 0.0),
+                opponent_value=entry.get('opponent_value'),
+                own_score=entry.get('own_score'),
+                opponent_score=entry.get('opponent_score'),
+                created_at=_history_time(entry),
+            ))
+
+    for profile in TeamProfile.objects.exclude(value_history=[]).only('team_id', 'value_history').iterator():
+        for entry in profile.value_history if isinstance(profile.value_history, list) else []:
+            if not isinstance(entry, dict) or 'new_value' not in entry:
+                continue
+            events.append(RatingEvent(
+                team_id=profile.team_id,
+                source=entry.get('reason') or 'roster_change',
+                old_value=entry.get('old_value', entry['new_value']),
+                new_value=entry['new_value'],
+                change=entry.get('change', 0.0),
+                created_at=_history_time(entry),
+            ))
+
+    RatingEvent.objects.bulk_create(events, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('friendly_games', '0005_friendlygameresult'),
+        ('matches', '0009_alter_matchplayer_role'),
+        ('teams', '0007_playerstatistics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatingEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('tournament', 'Tournament match'), ('friendly', 'Friendly game'), ('roster_change', 'Roster change'), ('replay', 'Rating replay')], default='tournament', max_length=20)),
+                ('old_value', models.FloatField()),
+                ('new_value', models.FloatField()),
+                ('change', models.FloatField(default=0.0)),
+                ('opponent_value', models.FloatField(blank=True, null=True)),
+                ('own_score', models.PositiveIntegerField(blank=True, null=True)),
+                ('opponent_score', models.PositiveIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('friendly_game', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='rating_events', to='friendly_games.friendlygame')),
+                ('match', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='rating_events', to='matches.match')),
+                ('player', models.ForeignKey(blank=True, help_text='Player whose rating changed (empty for team value changes)', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rating_events', to='teams.player')),
+                ('team', models.ForeignKey(blank=True, help_text='Team whose value changed (empty for player rating changes)', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='value_events', to='teams.team')),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['player', 'created_at'], name='teams_rating_player_idx'), models.Index(fields=['team', 'created_at'], name='teams_rating_team_idx')],
+            },
+        ),
+        migrations.RunPython(copy_json_history, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='playerprofile',
+            name='rating_history',
+        ),
+        migrations.RemoveField(
+            model_name='teamprofile',
+            name='value_history',
+        ),
+    ]
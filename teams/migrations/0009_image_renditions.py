@@ -0,0 +1,68 @@
+# Generated by Django 5.2 on 2026-10-17 03:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0008_ratingevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playerprofile',
+            name='profile_picture_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the picture, so an unchanged upload is not processed again', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='playerprofile',
+            name='profile_picture_renditions',
+            field=models.JSONField(blank=True, default=dict, help_text='Resized WebP and JPEG renditions written by the image worker'),
+        ),
+        migrations.AddField(
+            model_name='teamprofile',
+            name='logo_svg_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the logo file', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='teamprofile',
+            name='logo_svg_renditions',
+            field=models.JSONField(blank=True, default=dict, help_text='Resized renditions of a raster logo written by the image worker (none for SVG)'),
+        ),
+        migrations.AddField(
+            model_name='teamprofile',
+            name='team_photo_jpg_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the team photo', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='teamprofile',
+            name='team_photo_jpg_renditions',
+            field=models.JSONField(blank=True, default=dict, help_text='Resized WebP and JPEG renditions written by the image worker'),
+        ),
+        migrations.CreateModel(
+            name='ImageJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(help_text='Label of the model holding the image (app_label.model)', max_length=100)),
+                ('object_id', models.PositiveIntegerField()),
+                ('field', models.CharField(help_text='Name of the image field', max_length=50)),
+                ('content_hash', models.CharField(help_text='SHA-256 of the image to process', max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('max_attempts', models.PositiveIntegerField(default=3)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, help_text='Earliest time the job may run (used for retry backoff)')),
+                ('last_error', models.TextField(blank=True)),
+                ('worker', models.CharField(blank=True, help_text='Identifier of the worker running the job', max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['run_after', 'id'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='teams_image_job_queue_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('model', 'object_id', 'field'), name='teams_unique_pending_image_job')],
+            },
+        ),
+    ]
@@ -8,12 +8,8 @@ from django.utils import timezone
 from datetime import datetime
 import json
 from django.core.exceptions import ValidationError
-from .image_utils import (
-    optimize_profile_picture, 
-    optimize_team_logo, 
-    optimize_team_photo,
-    validate_image_size
-)
+from .image_utils import validate_image_size
+from .image_pipeline import detect_image_changes, enqueue_image_jobs
 
 def generate_pin():
     """Generate a random 6-digit PIN"""
@@ -163,11 +159,6 @@ class PlayerProfile(models.Model):
         validators=[MinValueValidator(0.0)],
         help_text="Dynamic rating value (starts at 100.0)"
     )
-    rating_history = models.JSONField(
-        default=list,
-        blank=True,
-        help_text="History of rating changes with timestamps and match details"
-    )
     
     # Preferences
     preferred_position = models.CharField(
@@ -188,6 +179,16 @@ class PlayerProfile(models.Model):
         blank=True,
         null=True
     )
+    profile_picture_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="SHA-256 of the picture, so an unchanged upload is not processed again"
+    )
+    profile_picture_renditions = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Resized WebP and JPEG renditions written by the image worker"
+    )
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -200,11 +201,10 @@ class PlayerProfile(models.Model):
                 raise ValidationError("Profile picture must be smaller than 3MB")
     
     def save(self, *args, **kwargs):
-        """Override save to optimize images"""
-        if self.profile_picture:
-            # Optimize profile picture on upload
-            self.profile_picture = optimize_profile_picture(self.profile_picture)
+        """Queue renditions of a new profile picture; resizing happens off the request"""
+        changed = detect_image_changes(self, ['profile_picture'], kwargs)
         super().save(*args, **kwargs)
+        enqueue_image_jobs(self, changed)
     
     def __str__(self):
         return f"Profile for {self.player}"
@@ -365,34 +365,20 @@ class PlayerProfile(models.Model):
     
     def get_accurate_statistics(self):
         """
-        Get accurate statistics by checking if sync is needed and returning current stats.
-        This method ensures statistics are up-to-date without breaking existing functionality.
+        Get accurate statistics from the materialized ('all', 'all') PlayerStatistics row.
+        The row is maintained on match completion, so reading it needs no match count
+        and no sync write; the stored counters are the fallback when it does not exist yet.
         """
-        try:
-            from matches.models import Match
-            
-            # Check if statistics need updating by comparing with actual match count
-            actual_matches = Match.objects.filter(
-                models.Q(team1=self.player.team) | models.Q(team2=self.player.team),
-                status='completed'
-            ).count()
-            
-            # If there's a discrepancy, sync statistics
-            if actual_matches != self.matches_played:
-                self.sync_statistics_from_matches()
-            
-            return {
-                'matches_played': self.matches_played,
-                'matches_won': self.matches_won,
-                'win_rate': self.win_rate()
-            }
-        except Exception:
-            # Fallback to current stored values if anything goes wrong
-            return {
-                'matches_played': self.matches_played,
-                'matches_won': self.matches_won,
-                'win_rate': self.win_rate()
-            }
+        row = PlayerStatistics.objects.filter(
+            player_id=self.player_id, role=PlayerStatistics.ALL, match_format=PlayerStatistics.ALL,
+        ).values('matches_played', 'matches_won', 'win_rate').first()
+        if row is not None:
+            return row
+        return {
+            'matches_played': self.matches_played,
+            'matches_won': self.matches_won,
+            'win_rate': self.win_rate()
+        }
 
     
     # ===== DYNAMIC RATING SYSTEM METHODS =====
@@ -434,27 +420,9 @@ class PlayerProfile(models.Model):
         Returns:
             float: Rating change (positive for improvement, negative for decline)
         """
+        from .rating_engine import rating_change
         try:
-            # Base calculation factors
-            score_difference = own_score - opponent_score
-            rating_ratio = opponent_value / max(self.value, 1.0)  # Avoid division by zero
-            
-            # Determine if this was a win, loss, or draw
-            if score_difference > 0:  # Win
-                # Winning against higher-rated opponent gives more points
-                base_change = abs(score_difference) * rating_ratio * 0.5
-                rating_change = min(base_change, 20.0)  # Cap maximum gain
-            elif score_difference < 0:  # Loss
-                # Losing to lower-rated opponent loses more points
-                base_change = abs(score_difference) * (self.value / max(opponent_value, 1.0)) * 0.5
-                rating_change = -min(base_change, 15.0)  # Cap maximum loss
-            else:  # Draw (rare in petanque, but handle it)
-                # Small adjustment based on rating difference
-                rating_change = (opponent_value - self.value) * 0.1
-                rating_change = max(-2.0, min(2.0, rating_change))  # Small adjustment
-            
-            return round(rating_change, 2)
-            
+            return rating_change(self.value, opponent_value, own_score, opponent_score)
         except Exception as e:
             # If calculation fails, return 0 (no rating change)
             print(f"Rating calculation error for {self.player}: {e}")
@@ -486,33 +454,21 @@ class PlayerProfile(models.Model):
                 # Apply rating change
                 self.value = max(0.0, self.value + rating_change)
                 
-                # Add to rating history
-                history_entry = {
-                    'timestamp': timezone.now().isoformat(),
-                    'old_value': old_value,
-                    'new_value': self.value,
-                    'change': rating_change,
-                    'opponent_value': opponent_value,
-                    'own_score': own_score,
-                    'opponent_score': opponent_score,
-                    'match_type': match_type
-                }
-                
-                if match_id:
-                    history_entry['match_id'] = match_id
-                
-                # Ensure rating_history is a list
-                if not isinstance(self.rating_history, list):
-                    self.rating_history = []
-                
-                self.rating_history.append(history_entry)
-                
-                # Keep only last 50 entries to prevent excessive data growth
-                if len(self.rating_history) > 50:
-                    self.rating_history = self.rating_history[-50:]
+                # Append to the rating history
+                RatingEvent.objects.create(
+                    player_id=self.player_id,
+                    source=match_type,
+                    old_value=old_value,
+                    new_value=self.value,
+                    change=rating_change,
+                    opponent_value=opponent_value,
+                    own_score=own_score,
+                    opponent_score=opponent_score,
+                    **rating_event_game(match_id),
+                )
                 
                 # Save changes
-                self.save()
+                self.save(update_fields=['value', 'updated_at'])
                 
                 return True
                 
@@ -532,11 +488,12 @@ class PlayerProfile(models.Model):
             dict: Trend information with direction and change
         """
         try:
-            if not self.rating_history or len(self.rating_history) < 2:
-                return {'trend': 'stable', 'change': 0.0, 'matches': 0}
-            
-            # Get last N entries
-            recent_history = self.rating_history[-last_n_matches:]
+            # Latest events first from the (player, created_at) index, then back in order
+            recent_history = list(
+                RatingEvent.objects.filter(player_id=self.player_id)
+                .order_by('-created_at', '-id')
+                .values('old_value', 'new_value')[:last_n_matches]
+            )[::-1]
             
             if len(recent_history) < 2:
                 return {'trend': 'stable', 'change': 0.0, 'matches': len(recent_history)}
@@ -563,6 +520,186 @@ class PlayerProfile(models.Model):
         except Exception as e:
             print(f"Rating trend calculation error for {self.player}: {e}")
             return {'trend': 'stable', 'change': 0.0, 'matches': 0}
+    
+    def get_rating_timeline(self, since=None, until=None):
+        """
+        Rating after each game in a time range, oldest first (for charts).
+        
+        Returns:
+            list: (timestamp, rating) tuples
+        """
+        events = RatingEvent.objects.filter(player_id=self.player_id)
+        if since is not None:
+            events = events.filter(created_at__gte=since)
+        if until is not None:
+            events = events.filter(created_at__lt=until)
+        return list(events.order_by('created_at', 'id').values_list('created_at', 'new_value'))
+
+
+
+class PlayerStatistics(models.Model):
+    """
+    Materialized tournament statistics per player, playing role and match format.
+    Rows are maintained on match completion (see teams.statistics_service) so the
+    player leaderboard can filter, sort and paginate in the database.
+
+    The ('all', 'all') row holds the overall team-level figures used by
+    PlayerProfile.get_accurate_statistics; the other rows are built from the
+    player's MatchPlayer participations in completed matches.
+    """
+    ALL = 'all'
+
+    player = models.ForeignKey(
+        Player,
+        on_delete=models.CASCADE,
+        related_name='statistics'
+    )
+    role = models.CharField(
+        max_length=10,
+        default=ALL,
+        help_text="MatchPlayer role, or 'all' for every role"
+    )
+    match_format = models.CharField(
+        max_length=20,
+        default=ALL,
+        help_text="Match format, or 'all' for every format"
+    )
+    matches_played = models.PositiveIntegerField(default=0)
+    matches_won = models.PositiveIntegerField(default=0)
+    win_rate = models.FloatField(default=0.0, help_text="Win rate percentage, stored for DB-side sorting")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Player Statistics"
+        verbose_name_plural = "Player Statistics"
+        unique_together = ('player', 'role', 'match_format')
+        indexes = [
+            models.Index(fields=['role', 'match_format', '-win_rate', '-matches_played'], name='teams_pstat_leaderboard_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.player.name} - {self.role}/{self.match_format}"
+
+
+class RatingEvent(models.Model):
+    """
+    One rating change, appended whenever a player's rating or a team's value moves.
+
+    Rows are never updated, so the full history is kept and a rating trend or
+    chart is an indexed range query on (player, created_at) or (team, created_at).
+    """
+    SOURCE_CHOICES = [
+        ('tournament', 'Tournament match'),
+        ('friendly', 'Friendly game'),
+        ('roster_change', 'Roster change'),
+        ('replay', 'Rating replay'),
+    ]
+
+    player = models.ForeignKey(
+        Player,
+        on_delete=models.CASCADE,
+        related_name='rating_events',
+        null=True,
+        blank=True,
+        help_text="Player whose rating changed (empty for team value changes)"
+    )
+    team = models.ForeignKey(
+        Team,
+        on_delete=models.CASCADE,
+        related_name='value_events',
+        null=True,
+        blank=True,
+        help_text="Team whose value changed (empty for player rating changes)"
+    )
+    match = models.ForeignKey(
+        'matches.Match',
+        on_delete=models.SET_NULL,
+        related_name='rating_events',
+        null=True,
+        blank=True
+    )
+    friendly_game = models.ForeignKey(
+        'friendly_games.FriendlyGame',
+        on_delete=models.SET_NULL,
+        related_name='rating_events',
+        null=True,
+        blank=True
+    )
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, default='tournament')
+    old_value = models.FloatField()
+    new_value = models.FloatField()
+    change = models.FloatField(default=0.0)
+    opponent_value = models.FloatField(null=True, blank=True)
+    own_score = models.PositiveIntegerField(null=True, blank=True)
+    opponent_score = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['player', 'created_at'], name='teams_rating_player_idx'),
+            models.Index(fields=['team', 'created_at'], name='teams_rating_team_idx'),
+        ]
+
+    def __str__(self):
+        subject = self.player or self.team
+        return f"{subject}: {self.old_value:.1f} -> {self.new_value:.1f} ({self.get_source_display()})"
+
+
+def rating_event_game(match_id):
+    """RatingEvent game fields for a history match id: a Match id, or 'friendly_<id>'."""
+    if not match_id:
+        return {}
+    if isinstance(match_id, str) and match_id.startswith('friendly_'):
+        return {'friendly_game_id': int(match_id[len('friendly_'):])}
+    return {'match_id': int(match_id)}
+
+
+class ImageJob(models.Model):
+    """
+    Database-backed queue entry for image renditions.
+
+    Saving a new profile picture, logo or team photo queues a job instead of
+    resizing inside the request; the image worker threads (and the
+    run_image_worker command) write the renditions. At most one pending job
+    exists per image field, so repeated uploads collapse into the latest one.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    model = models.CharField(max_length=100, help_text="Label of the model holding the image (app_label.model)")
+    object_id = models.PositiveIntegerField()
+    field = models.CharField(max_length=50, help_text="Name of the image field")
+    content_hash = models.CharField(max_length=64, help_text="SHA-256 of the image to process")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now, help_text="Earliest time the job may run (used for retry backoff)")
+    last_error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True, help_text="Identifier of the worker running the job")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['run_after', 'id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['model', 'object_id', 'field'],
+                condition=models.Q(status='pending'),
+                name='teams_unique_pending_image_job',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='teams_image_job_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.field} of {self.model} #{self.object_id} ({self.status})"
 
 
 
@@ -599,11 +736,6 @@ class TeamProfile(models.Model):
         validators=[MinValueValidator(0.0)],
         help_text="Dynamic team rating value (starts at 100.0, like player ratings)"
     )
-    value_history = models.JSONField(
-        default=list,
-        blank=True,
-        help_text="History of team value changes with timestamps and match details"
-    )
     
     # ===== BADGES & ACHIEVEMENTS =====
     badges = models.JSONField(
@@ -791,20 +923,13 @@ class TeamProfile(models.Model):
             
             if abs(new_value - old_value) > 0.1:  # Only update if significant change
                 # Record the change in history
-                change_record = {
-                    'timestamp': timezone.now().isoformat(),
-                    'old_value': old_value,
-                    'new_value': new_value,
-                    'reason': 'roster_change',
-                    'change': round(new_value - old_value, 2)
-                }
-                
-                # Add to history (keep last 50 entries)
-                if not self.value_history:
-                    self.value_history = []
-                self.value_history.append(change_record)
-                if len(self.value_history) > 50:
-                    self.value_history = self.value_history[-50:]
+                RatingEvent.objects.create(
+                    team_id=self.team_id,
+                    source='roster_change',
+                    old_value=old_value,
+                    new_value=new_value,
+                    change=round(new_value - old_value, 2),
+                )
                 
                 self.team_value = new_value
                 
@@ -935,6 +1060,18 @@ class TeamProfile(models.Model):
         null=True,
         help_text="Team photo in JPG format (group photo, team picture)"
     )
+    logo_svg_hash = models.CharField(max_length=64, blank=True, help_text="SHA-256 of the logo file")
+    logo_svg_renditions = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Resized renditions of a raster logo written by the image worker (none for SVG)"
+    )
+    team_photo_jpg_hash = models.CharField(max_length=64, blank=True, help_text="SHA-256 of the team photo")
+    team_photo_jpg_renditions = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Resized WebP and JPEG renditions written by the image worker"
+    )
     
     # ===== DYNAMIC VALUES =====
     team_value = models.FloatField(
@@ -942,11 +1079,6 @@ class TeamProfile(models.Model):
         validators=[MinValueValidator(0.0)],
         help_text="Dynamic team rating value (starts at 100.0, like player ratings)"
     )
-    value_history = models.JSONField(
-        default=list,
-        blank=True,
-        help_text="History of team value changes with timestamps and match details"
-    )
     
     # ===== BADGES & ACHIEVEMENTS =====
     badges = models.JSONField(
@@ -1012,6 +1144,12 @@ class TeamProfile(models.Model):
     
     def __str__(self):
         return f"Profile for {self.team.name}"
+
+    def save(self, *args, **kwargs):
+        """Queue renditions of a new logo or team photo; resizing happens off the request"""
+        changed = detect_image_changes(self, ['logo_svg', 'team_photo_jpg'], kwargs)
+        super().save(*args, **kwargs)
+        enqueue_image_jobs(self, changed)
     
     # ===== STATISTICS METHODS =====
     def win_rate(self):
@@ -1137,20 +1275,13 @@ class TeamProfile(models.Model):
             
             if abs(new_value - old_value) > 0.1:  # Only update if significant change
                 # Record the change in history
-                change_record = {
-                    'timestamp': timezone.now().isoformat(),
-                    'old_value': old_value,
-                    'new_value': new_value,
-                    'reason': 'roster_change',
-                    'change': round(new_value - old_value, 2)
-                }
-                
-                # Add to history (keep last 50 entries)
-                if not self.value_history:
-                    self.value_history = []
-                self.value_history.append(change_record)
-                if len(self.value_history) > 50:
-                    self.value_history = self.value_history[-50:]
+                RatingEvent.objects.create(
+                    team_id=self.team_id,
+                    source='roster_change',
+                    old_value=old_value,
+                    new_value=new_value,
+                    change=round(new_value - old_value, 2),
+                )
                 
                 self.team_value = new_value
                 
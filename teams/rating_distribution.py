@@ -0,0 +1,172 @@
+"""
+Player rating distribution for percentiles and the profile bell curve.
+
+A snapshot of the distribution (ratings sorted by the database, histogram
+counts per skill range, total and average) is built once and shared by every
+profile view; looking up a player's percentile is a binary search. Rating
+writes bump a version number in the cache, and each process rebuilds its
+snapshot on the next read after the version changed or after
+DISTRIBUTION_MAX_AGE seconds, so bulk writes from other processes are picked
+up as well.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from django.core.cache import cache
+from .models import PlayerProfile
+
+logger = logging.getLogger(__name__)
+
+DISTRIBUTION_VERSION_KEY = 'teams:rating_distribution:version'
+
+# Upper bound on how stale a process' snapshot can get
+DISTRIBUTION_MAX_AGE = 300
+
+
+def _skill_ranges():
+    """The 40 bell curve ranges: 10 subdivisions each of Novice, Intermediate, Advanced and Pro."""
+    ranges = []
+    for category, start, width, color in (
+        ('Novice', 0, 20, '#28a745'),
+        ('Intermediate', 200, 20, '#ffc107'),
+        ('Advanced', 400, 30, '#fd7e14'),
+        ('Pro', 700, 30, '#dc3545'),
+    ):
+        for i in range(10):
+            ranges.append({
+                'name': f'{category} {i+1}',
+                'min': start + i * width,
+                'max': start + (i + 1) * width - 1,
+                'color': color,
+                'category': category,
+            })
+    return ranges
+
+
+SKILL_RANGES = _skill_ranges()
+
+# A rating belongs to the last range whose minimum it reaches (ratings between
+# one range's max and the next min, e.g. 19.5, count in the lower range)
+_RANGE_STARTS = [skill_range['min'] for skill_range in SKILL_RANGES]
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def skill_range_index(rating):
+    """Index into SKILL_RANGES for a rating, or None when it is outside every range."""
+    if rating < _RANGE_STARTS[0] or rating > SKILL_RANGES[-1]['max']:
+        return None
+    return bisect_right(_RANGE_STARTS, rating) - 1
+
+
+def invalidate_rating_distribution():
+    """Mark every process' snapshot as stale; call after ratings are written."""
+    try:
+        cache.incr(DISTRIBUTION_VERSION_KEY)
+    except ValueError:
+        cache.set(DISTRIBUTION_VERSION_KEY, 1, None)
+    except Exception as e:
+        # A cache outage only delays the refresh until DISTRIBUTION_MAX_AGE
+        logger.warning(f"Could not invalidate rating distribution: {e}")
+
+
+def get_rating_distribution():
+    """
+    Current distribution snapshot, rebuilt only when it is stale.
+
+    Returns:
+        dict: ratings (sorted), counts (per SKILL_RANGES entry), total, average,
+        min_rating, max_rating
+    """
+    global _snapshot
+    try:
+        version = cache.get(DISTRIBUTION_VERSION_KEY, 0)
+    except Exception:
+        version = None
+
+    snapshot = _snapshot
+    if snapshot is not None and snapshot['version'] == version and time.monotonic() - snapshot['built'] < DISTRIBUTION_MAX_AGE:
+        return snapshot
+
+    with _snapshot_lock:
+        if _snapshot is snapshot:
+            _snapshot = _build_distribution(version)
+        return _snapshot
+
+
+def _build_distribution(version):
+    """Load every rating once (sorted by the database) and bin it."""
+    ratings = [
+        float(value) for value in
+        PlayerProfile.objects.exclude(value__isnull=True).exclude(value=0).order_by('value').values_list('value', flat=True)
+    ]
+    counts = [0] * len(SKILL_RANGES)
+    for rating in ratings:
+        i = skill_range_index(rating)
+        if i is not None:
+            counts[i] += 1
+    return {
+        'version': version,
+        'built': time.monotonic(),
+        'ratings': ratings,
+        'counts': counts,
+        'total': len(ratings),
+        'average': sum(ratings) / len(ratings) if ratings else 0.0,
+        'min_rating': ratings[0] if ratings else 0.0,
+        'max_rating': ratings[-1] if ratings else 0.0,
+    }
+
+
+def rating_percentile(rating, distribution=None):
+    """Percentage of rated players with a lower rating than ``rating``."""
+    distribution = distribution or get_rating_distribution()
+    if not distribution['total']:
+        return 0.0
+    return round(bisect_left(distribution['ratings'], rating) / distribution['total'] * 100, 1)
+
+
+def get_bell_curve_data(rating):
+    """
+    Skill comparison data for the player profile page.
+
+    Returns:
+        dict: percentile, average, histogram and the player's position, with
+        has_data False when nobody is rated yet
+    """
+    distribution = get_rating_distribution()
+    total = distribution['total']
+    if not total:
+        return {'has_data': False}
+
+    rating = float(rating)
+    min_rating, max_rating = distribution['min_rating'], distribution['max_rating']
+    if max_rating > min_rating:
+        position = ((rating - min_rating) / (max_rating - min_rating)) * 100
+    else:
+        position = 50  # Middle if all ratings are the same
+
+    return {
+        'current_rating': rating,
+        'percentile': rating_percentile(rating, distribution),
+        'avg_rating': round(distribution['average'], 1),
+        'min_rating': min_rating,
+        'max_rating': max_rating,
+        'total_players': total,
+        'position': round(position, 1),
+        'distribution': [
+            {
+                'name': skill_range['name'],
+                'count': count,
+                'percentage': round(count / total * 100, 1),
+                'color': skill_range['color'],
+                'min': skill_range['min'],
+                'max': skill_range['max'],
+            }
+            for skill_range, count in zip(SKILL_RANGES, distribution['counts'])
+        ],
+        'current_player_range': skill_range_index(rating),
+        'has_data': True,
+    }
@@ -0,0 +1,161 @@
+"""
+Batched player rating updates.
+
+A finished game updates every participating PlayerProfile at once: the
+profiles of both sides are loaded together, every rating change is
+computed in memory from the ratings as they stood before the game, all new
+values are written with a single bulk_update and the history rows are appended
+to RatingEvent with a single bulk_create.
+"""
+
+import logging
+from django.db import transaction
+from django.utils import timezone
+from .models import PlayerProfile, RatingEvent
+from .rating_distribution import invalidate_rating_distribution
+from pfc_core.cache_registry import invalidate_models
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEAM_RATING = 100.0
+
+
+def rating_change(value, opponent_value, own_score, opponent_score):
+    """
+    Rating change for a player rated ``value`` after a game against a side
+    rated ``opponent_value`` (modified Elo adapted for petanque scoring).
+
+    Returns:
+        float: Rating change (positive for improvement, negative for decline)
+    """
+    score_difference = own_score - opponent_score
+    if score_difference > 0:  # Win
+        # Winning against higher-rated opponent gives more points
+        change = min(abs(score_difference) * (opponent_value / max(value, 1.0)) * 0.5, 20.0)
+    elif score_difference < 0:  # Loss
+        # Losing to lower-rated opponent loses more points
+        change = -min(abs(score_difference) * (value / max(opponent_value, 1.0)) * 0.5, 15.0)
+    else:  # Draw (rare in petanque, but handle it)
+        change = max(-2.0, min(2.0, (opponent_value - value) * 0.1))
+    return round(change, 2)
+
+
+def team_rating(profiles):
+    """Average rating of a side; sides without profiles count as a new team."""
+    if not profiles:
+        return DEFAULT_TEAM_RATING
+    return sum(profile.value for profile in profiles) / len(profiles)
+
+
+def team_profiles(team_ids):
+    """
+    PlayerProfiles of the current players of several teams, from one query.
+
+    Returns:
+        dict: team_id -> list of PlayerProfile (with player loaded)
+    """
+    rosters = {team_id: [] for team_id in team_ids}
+    for profile in PlayerProfile.objects.filter(player__team_id__in=team_ids).select_related("player").order_by("player_id"):
+        rosters[profile.player.team_id].append(profile)
+    return rosters
+
+
+def match_profiles(match):
+    """
+    PlayerProfiles of both sides of a tournament match.
+
+    A side is rated for the players recorded for it in MatchPlayer; a side
+    without recorded participants falls back to the team's current roster.
+    rating_replay rates the same players: the recorded ones, or for an
+    unrecorded side the players this update rated (its RatingEvents), so
+    replaying unchanged history gives the live ratings even after a roster
+    changed.
+
+    Returns:
+        dict: team_id -> list of PlayerProfile (with player loaded)
+    """
+    from matches.models import MatchPlayer
+
+    team_ids = [match.team1_id, match.team2_id]
+    sides = {team_id: [] for team_id in team_ids}
+    participants = MatchPlayer.objects.filter(
+        match=match, team_id__in=team_ids, player__profile__isnull=False,
+    ).select_related("player__profile").order_by("player_id")
+    for participant in participants:
+        profile = participant.player.profile
+        # Keep the player reachable from the profile without another query
+        profile.player = participant.player
+        sides[participant.team_id].append(profile)
+
+    unrecorded = [team_id for team_id in team_ids if not sides[team_id]]
+    if unrecorded:
+        sides.update(team_profiles(unrecorded))
+    return sides
+
+
+def apply_game_result(side_a, side_b, score_a, score_b, match=None, friendly_game=None):
+    """
+    Update the ratings of everybody in a finished game.
+
+    Both sides are rated against the other side's average before the game, so
+    the order players are processed in does not matter.
+
+    Args:
+        side_a, side_b: lists of PlayerProfile
+        score_a, score_b: final scores of side A and side B
+        match: the tournament Match, or
+        friendly_game: the FriendlyGame that was played
+
+    Returns:
+        list: one dict per player (player, old_rating, new_rating, change, result)
+    """
+    rating_a, rating_b = team_rating(side_a), team_rating(side_b)
+    source = "friendly" if friendly_game is not None else "tournament"
+    now = timezone.now()
+    updates = []
+    changed = []
+    events = []
+
+    for profiles, opponent_value, own_score, opponent_score in (
+        (side_a, rating_b, score_a, score_b),
+        (side_b, rating_a, score_b, score_a),
+    ):
+        result = "win" if own_score > opponent_score else "loss" if own_score < opponent_score else "draw"
+        for profile in profiles:
+            old_value = profile.value
+            change = rating_change(old_value, opponent_value, own_score, opponent_score)
+            profile.value = max(0.0, old_value + change)
+            profile.updated_at = now
+            changed.append(profile)
+
+            events.append(RatingEvent(
+                player_id=profile.player_id,
+                match=match,
+                friendly_game=friendly_game,
+                source=source,
+                old_value=old_value,
+                new_value=profile.value,
+                change=change,
+                opponent_value=opponent_value,
+                own_score=own_score,
+                opponent_score=opponent_score,
+                created_at=now,
+            ))
+            updates.append({
+                "player": profile.player.name,
+                "old_rating": old_value,
+                "new_rating": profile.value,
+                "change": profile.value - old_value,
+                "result": result,
+            })
+
+    if changed:
+        with transaction.atomic():
+            PlayerProfile.objects.bulk_update(changed, ["value", "updated_at"])
+            RatingEvent.objects.bulk_create(events)
+        # bulk_update sends no post_save, so the distribution and cached pages are refreshed here
+        invalidate_rating_distribution()
+        invalidate_models(PlayerProfile)
+    game = match if match is not None else friendly_game
+    logger.info(f"Rated {len(changed)} players for {source} game {game.id if game else None}")
+    return updates
@@ -0,0 +1,234 @@
+"""
+Full rating replay over the game history.
+
+Recomputes every player's rating from scratch after a scoring fix or a change
+to the rating formula. Completed tournament matches and fully validated
+friendly games are streamed in chronological order (chunked iteration, the
+participants fetched per chunk), ratings are kept in an array indexed by player
+and updated in memory exactly as the live path does, and the final values are
+written back with bulk_update plus one 'replay' RatingEvent per changed player.
+"""
+
+import heapq
+import logging
+import time
+from array import array
+from itertools import islice
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import PlayerProfile, RatingEvent
+from .rating_engine import rating_change, DEFAULT_TEAM_RATING
+from .rating_distribution import invalidate_rating_distribution
+from pfc_core.cache_registry import invalidate_models
+
+logger = logging.getLogger(__name__)
+
+REPLAY_CHUNK_SIZE = 2000
+
+# Differences below this are rounding noise, not a rating change
+REPLAY_TOLERANCE = 1e-6
+
+
+def replay_ratings(dry_run=True, chunk_size=REPLAY_CHUNK_SIZE, change_function=rating_change):
+    """
+    Replay every rated game and recompute all player ratings.
+
+    Every player starts from the default rating. Each side of a tournament
+    match is rated for the players recorded in MatchPlayer, as live
+    (rating_engine.match_profiles). A side without recorded participants was
+    rated live for the roster of that time, so it is replayed for the players
+    of the match's 'tournament' RatingEvents; the current roster is only used
+    for matches rated before events were kept. Draws are skipped, as they are
+    live.
+
+    Args:
+        dry_run: only compute the differences, write nothing
+        chunk_size: games fetched per query
+        change_function: rating function with the signature of rating_change
+
+    Returns:
+        dict: games replayed per source, players rated, the list of changes
+        (player_id, player, current, replayed, difference) sorted by the size
+        of the difference, elapsed seconds and whether anything was written
+    """
+    started = time.perf_counter()
+    initial = PlayerProfile._meta.get_field('value').default
+
+    profiles = list(PlayerProfile.objects.values_list('id', 'player_id', 'player__name', 'player__team_id', 'value'))
+    index = {player_id: i for i, (profile_id, player_id, name, team_id, value) in enumerate(profiles)}
+    ratings = array('d', [initial] * len(profiles))
+
+    rosters = {}
+    for profile_id, player_id, name, team_id, value in profiles:
+        if team_id is not None:
+            rosters.setdefault(team_id, []).append(index[player_id])
+
+    counts = {'tournament': 0, 'friendly': 0}
+    games = heapq.merge(
+        _tournament_games(index, rosters, chunk_size),
+        _friendly_games(index, chunk_size),
+        key=lambda game: game[:3],
+    )
+    for timestamp, source, game_id, side_a, side_b, score_a, score_b in games:
+        if side_a or side_b:
+            _apply_game(ratings, side_a, side_b, score_a, score_b, change_function)
+            counts[source] += 1
+
+    changes = []
+    for i, (profile_id, player_id, name, team_id, value) in enumerate(profiles):
+        if abs(ratings[i] - value) > REPLAY_TOLERANCE:
+            changes.append({
+                'profile_id': profile_id,
+                'player_id': player_id,
+                'player': name,
+                'current': value,
+                'replayed': ratings[i],
+                'difference': ratings[i] - value,
+            })
+    changes.sort(key=lambda change: -abs(change['difference']))
+
+    if not dry_run and changes:
+        _write_replayed_ratings(changes)
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"Rating replay{' (dry run)' if dry_run else ''}: {counts['tournament']} matches, "
+        f"{counts['friendly']} friendly games, {len(changes)} of {len(profiles)} ratings changed in {elapsed:.2f}s"
+    )
+    return {
+        'tournament_games': counts['tournament'],
+        'friendly_games': counts['friendly'],
+        'players': len(profiles),
+        'changes': changes,
+        'elapsed': elapsed,
+        'written': not dry_run and bool(changes),
+    }
+
+
+def _apply_game(ratings, side_a, side_b, score_a, score_b, change_function):
+    """Rate one game in place; both sides play against the other's pre-game average."""
+    rating_a = sum(ratings[i] for i in side_a) / len(side_a) if side_a else DEFAULT_TEAM_RATING
+    rating_b = sum(ratings[i] for i in side_b) / len(side_b) if side_b else DEFAULT_TEAM_RATING
+    for side, opponent_value, own_score, opponent_score in (
+        (side_a, rating_b, score_a, score_b),
+        (side_b, rating_a, score_b, score_a),
+    ):
+        for i in side:
+            ratings[i] = max(0.0, ratings[i] + change_function(ratings[i], opponent_value, own_score, opponent_score))
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _rated_sides(match_ids, index):
+    """
+    Players rated live for each side of the matches, from their RatingEvents.
+
+    The side is told by the scores of the event (own and opponent score).
+
+    Returns:
+        dict: match_id -> {(own_score, opponent_score): [player indexes]}
+    """
+    rated = {}
+    events = RatingEvent.objects.filter(
+        match_id__in=match_ids, source='tournament',
+    ).order_by('id').values_list('match_id', 'player_id', 'own_score', 'opponent_score')
+    for match_id, player_id, own_score, opponent_score in events:
+        if player_id in index:
+            side = rated.setdefault(match_id, {}).setdefault((own_score, opponent_score), [])
+            if index[player_id] not in side:
+                side.append(index[player_id])
+    return rated
+
+
+def _tournament_games(index, rosters, chunk_size):
+    """Completed, decided tournament matches as (time, 'tournament', id, side_a, side_b, score_a, score_b)."""
+    from matches.models import Match, MatchPlayer
+
+    matches = Match.objects.filter(
+        status='completed', winner__isnull=False,
+    ).annotate(
+        finished=Coalesce('end_time', 'updated_at'),
+    ).order_by('finished', 'id').values_list(
+        'finished', 'id', 'team1_id', 'team2_id', 'team1_score', 'team2_score',
+    ).iterator(chunk_size=chunk_size)
+
+    for chunk in _chunks(matches, chunk_size):
+        recorded = {}
+        participants = MatchPlayer.objects.filter(
+            match_id__in=[row[1] for row in chunk],
+        ).values_list('match_id', 'team_id', 'player_id')
+        for match_id, team_id, player_id in participants:
+            if player_id in index:
+                recorded.setdefault((match_id, team_id), []).append(index[player_id])
+
+        rated = _rated_sides([row[1] for row in chunk], index)
+
+        for finished, match_id, team1_id, team2_id, team1_score, team2_score in chunk:
+            score_a, score_b = team1_score or 0, team2_score or 0
+            # Equal scores cannot tell the sides apart
+            sides = rated.get(match_id, {}) if score_a != score_b else {}
+            side_a = recorded.get((match_id, team1_id)) or sides.get((score_a, score_b)) or rosters.get(team1_id, [])
+            side_b = recorded.get((match_id, team2_id)) or sides.get((score_b, score_a)) or rosters.get(team2_id, [])
+            yield finished, 'tournament', match_id, side_a, side_b, score_a, score_b
+
+
+def _friendly_games(index, chunk_size):
+    """Fully validated, decided friendly games as (time, 'friendly', id, black, white, black_score, white_score)."""
+    from friendly_games.models import FriendlyGame, FriendlyGamePlayer
+
+    friendly_games = FriendlyGame.objects.filter(
+        status='COMPLETED', validation_status='FULLY_VALIDATED',
+    ).exclude(
+        black_team_score=F('white_team_score'),
+    ).annotate(
+        finished=Coalesce('completed_at', 'created_at'),
+    ).order_by('finished', 'id').values_list(
+        'finished', 'id', 'black_team_score', 'white_team_score',
+    ).iterator(chunk_size=chunk_size)
+
+    for chunk in _chunks(friendly_games, chunk_size):
+        sides = {}
+        participants = FriendlyGamePlayer.objects.filter(
+            game_id__in=[row[1] for row in chunk], codename_verified=True,
+        ).order_by('id').values_list('game_id', 'team', 'player_id')
+        for game_id, team, player_id in participants:
+            if player_id in index:
+                sides.setdefault((game_id, team), []).append(index[player_id])
+
+        for finished, game_id, black_score, white_score in chunk:
+            yield (
+                finished, 'friendly', game_id,
+                sides.get((game_id, 'BLACK'), []), sides.get((game_id, 'WHITE'), []),
+                black_score, white_score,
+            )
+
+
+def _write_replayed_ratings(changes):
+    """Store replayed values and record each correction as a 'replay' RatingEvent."""
+    now = timezone.now()
+    profiles = [
+        PlayerProfile(id=change['profile_id'], value=change['replayed'], updated_at=now)
+        for change in changes
+    ]
+    events = [
+        RatingEvent(
+            player_id=change['player_id'],
+            source='replay',
+            old_value=change['current'],
+            new_value=change['replayed'],
+            change=change['difference'],
+            created_at=now,
+        )
+        for change in changes
+    ]
+    with transaction.atomic():
+        PlayerProfile.objects.bulk_update(profiles, ['value', 'updated_at'], batch_size=REPLAY_CHUNK_SIZE)
+        RatingEvent.objects.bulk_create(events, batch_size=REPLAY_CHUNK_SIZE)
+    invalidate_rating_distribution()
+    invalidate_models(PlayerProfile)
@@ -0,0 +1,90 @@
+# signals.py for keeping materialized player statistics and the rating distribution up to date
+
+import logging
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from matches.models import Match
+from matches.signals import matches_bulk_created
+from .models import Player, PlayerProfile
+from .rating_distribution import invalidate_rating_distribution
+from .statistics_service import refresh_player_statistics, refresh_statistics_for_match
+
+logger = logging.getLogger("teams")
+
+# Match fields that change who won or who played
+_STATISTICS_FIELDS = ("status", "winner_id", "team1_id", "team2_id")
+
+
+@receiver(pre_save, sender=Match)
+def capture_previous_match_state(sender, instance, update_fields=None, **kwargs):
+    """Remember the stored outcome of a match so post_save can tell if stats changed."""
+    instance._statistics_previous = None
+    if instance.pk is not None:
+        instance._statistics_previous = Match.objects.filter(pk=instance.pk).values(*_STATISTICS_FIELDS).first()
+
+
+@receiver(post_save, sender=Match)
+def refresh_statistics_on_match_save(sender, instance, created, **kwargs):
+    """Refresh player statistics when a match is completed, reopened or its winner changes."""
+    previous = getattr(instance, "_statistics_previous", None)
+    current = {field: getattr(instance, field) for field in _STATISTICS_FIELDS}
+    was_completed = bool(previous) and previous["status"] == "completed"
+    if not was_completed and current["status"] != "completed":
+        return
+    if previous == current:
+        return
+
+    try:
+        refresh_statistics_for_match(instance)
+        if previous and (previous["team1_id"], previous["team2_id"]) != (current["team1_id"], current["team2_id"]):
+            # Teams were swapped on a completed match; the old teams lose the result
+            refresh_player_statistics(
+                Player.objects.filter(team_id__in=[previous["team1_id"], previous["team2_id"]]).values_list("id", flat=True)
+            )
+    except Exception as e:
+        # Log error but don't crash the save operation
+        logger.exception(f"Error refreshing player statistics for match {instance.id}: {e}")
+
+
+@receiver(matches_bulk_created, sender=Match)
+def refresh_statistics_on_bulk_create(sender, matches, **kwargs):
+    """bulk_create skips post_save; refresh players of teams with completed matches."""
+    team_ids = set()
+    for match in matches:
+        if match.status == "completed":
+            team_ids.update((match.team1_id, match.team2_id))
+    if not team_ids:
+        return
+    try:
+        refresh_player_statistics(Player.objects.filter(team_id__in=team_ids).values_list("id", flat=True))
+    except Exception as e:
+        logger.exception(f"Error refreshing player statistics after bulk match creation: {e}")
+
+
+@receiver(pre_save, sender=Player)
+def capture_previous_player_team(sender, instance, **kwargs):
+    """Remember the player's stored team; overall stats follow the team."""
+    instance._statistics_previous_team = None
+    if instance.pk is not None:
+        instance._statistics_previous_team = Player.objects.filter(pk=instance.pk).values_list("team_id", flat=True).first()
+
+
+@receiver(post_save, sender=Player)
+def refresh_statistics_on_player_save(sender, instance, created, **kwargs):
+    """Build statistics for new players and for players who changed team."""
+    if not created and getattr(instance, "_statistics_previous_team", None) == instance.team_id:
+        return
+    try:
+        refresh_player_statistics([instance.id])
+    except Exception as e:
+        logger.exception(f"Error refreshing player statistics for player {instance.id}: {e}")
+
+
+@receiver(post_save, sender=PlayerProfile)
+@receiver(post_delete, sender=PlayerProfile)
+def refresh_rating_distribution(sender, instance, **kwargs):
+    """A profile's rating was written or removed; the shared distribution is stale."""
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and "value" not in update_fields:
+        return
+    invalidate_rating_distribution()
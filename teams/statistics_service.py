@@ -0,0 +1,161 @@
+"""
+Player Statistics Service
+
+Maintains the materialized PlayerStatistics table used by the player
+leaderboard. Statistics are recomputed for the affected players whenever a
+tournament match is completed (or its result changes), so read paths never
+need to scan MatchPlayer rows or sync counters on a GET.
+"""
+
+import logging
+from django.db import transaction
+from django.db.models import F, Q, Count, Sum, Case, When, Value, IntegerField
+from django.db.models.functions import Coalesce
+from teams.models import Player, PlayerProfile, PlayerStatistics
+from pfc_core.cache_registry import invalidate_models
+
+logger = logging.getLogger(__name__)
+
+ALL = PlayerStatistics.ALL
+
+# Players are processed in chunks to keep IN (...) clauses bounded
+CHUNK_SIZE = 500
+
+
+def _win_rate(played, won):
+    """Win rate percentage rounded like PlayerProfile.win_rate()"""
+    if not played:
+        return 0
+    return round((won / played) * 100, 1)
+
+
+def _team_results(team_ids):
+    """
+    Completed-match totals per team, grouped in the database.
+
+    Returns:
+        dict: {team_id: (matches_played, matches_won)}
+    """
+    from matches.models import Match
+
+    completed = Match.objects.filter(status='completed').filter(
+        Q(team1_id__in=team_ids) | Q(team2_id__in=team_ids)
+    ).order_by()
+
+    def side(field):
+        return completed.values(team_id=F(field)).annotate(
+            played=Count('id'),
+            won=Sum(Case(When(winner_id=F(field), then=1), default=0, output_field=IntegerField())),
+        )
+
+    results = {}
+    for row in side('team1_id').union(side('team2_id'), all=True):
+        played, won = results.get(row['team_id'], (0, 0))
+        results[row['team_id']] = (played + row['played'], won + (row['won'] or 0))
+    return results
+
+
+def _participation_results(player_ids):
+    """
+    Completed-match totals per player, role and match format from MatchPlayer rows.
+
+    Returns:
+        dict: {player_id: {(role, match_format): [matches_played, matches_won]}}
+    """
+    from matches.models import MatchPlayer
+
+    rows = MatchPlayer.objects.filter(
+        player_id__in=player_ids,
+        match__status='completed',
+    ).annotate(
+        format_key=Coalesce('match_format', 'match__match_type', Value('unknown')),
+    ).values('player_id', 'role', 'format_key').annotate(
+        played=Count('id'),
+        won=Sum(Case(When(match__winner_id=F('team_id'), then=1), default=0, output_field=IntegerField())),
+    ).order_by()
+
+    results = {}
+    for row in rows:
+        role = row['role'] or 'flex'
+        buckets = results.setdefault(row['player_id'], {})
+        # Exact bucket plus the per-role and per-format roll-ups
+        for key in ((role, row['format_key']), (role, ALL), (ALL, row['format_key'])):
+            totals = buckets.setdefault(key, [0, 0])
+            totals[0] += row['played']
+            totals[1] += row['won'] or 0
+    return results
+
+
+def _refresh_chunk(player_teams):
+    """Recompute and store statistics rows for one chunk of {player_id: team_id}."""
+    player_ids = list(player_teams)
+    team_results = _team_results(set(player_teams.values()))
+    participations = _participation_results(player_ids)
+
+    rows = []
+    for player_id, team_id in player_teams.items():
+        played, won = team_results.get(team_id, (0, 0))
+        rows.append(PlayerStatistics(
+            player_id=player_id, role=ALL, match_format=ALL,
+            matches_played=played, matches_won=won, win_rate=_win_rate(played, won),
+        ))
+        for (role, match_format), (played, won) in participations.get(player_id, {}).items():
+            rows.append(PlayerStatistics(
+                player_id=player_id, role=role, match_format=match_format,
+                matches_played=played, matches_won=won, win_rate=_win_rate(played, won),
+            ))
+
+    with transaction.atomic():
+        PlayerStatistics.objects.filter(player_id__in=player_ids).delete()
+        PlayerStatistics.objects.bulk_create(rows)
+
+        # Keep the profile counters in step with the statistics rows (they are the fallback of get_accurate_statistics)
+        profiles = []
+        for profile in PlayerProfile.objects.filter(player_id__in=player_ids).only('id', 'player_id', 'matches_played', 'matches_won'):
+            played, won = team_results.get(player_teams[profile.player_id], (0, 0))
+            if profile.matches_played != played or profile.matches_won != won:
+                profile.matches_played = played
+                profile.matches_won = won
+                profiles.append(profile)
+        if profiles:
+            PlayerProfile.objects.bulk_update(profiles, ['matches_played', 'matches_won'])
+            invalidate_models(PlayerProfile)
+
+    return len(rows)
+
+
+def refresh_player_statistics(player_ids=None):
+    """
+    Recompute PlayerStatistics for the given players (or every player).
+
+    Args:
+        player_ids: iterable of Player ids, or None to rebuild all players
+
+    Returns:
+        int: number of statistics rows written
+    """
+    players = Player.objects.order_by('id')
+    if player_ids is not None:
+        players = players.filter(id__in=list(player_ids))
+
+    written = 0
+    chunk = {}
+    for player_id, team_id in players.values_list('id', 'team_id').iterator(chunk_size=CHUNK_SIZE):
+        chunk[player_id] = team_id
+        if len(chunk) >= CHUNK_SIZE:
+            written += _refresh_chunk(chunk)
+            chunk = {}
+    if chunk:
+        written += _refresh_chunk(chunk)
+    return written
+
+
+def refresh_statistics_for_match(match):
+    """Recompute statistics for everyone affected by a match result."""
+    from matches.models import MatchPlayer
+
+    player_ids = set(Player.objects.filter(team_id__in=[match.team1_id, match.team2_id]).values_list('id', flat=True))
+    player_ids.update(MatchPlayer.objects.filter(match=match).values_list('player_id', flat=True))
+    if not player_ids:
+        return 0
+    return refresh_player_statistics(player_ids)
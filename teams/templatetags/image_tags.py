@@ -0,0 +1,46 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+
+register = template.Library()
+
+
+def _srcset(renditions, key):
+    return ', '.join(f"{default_storage.url(rendition[key]['name'])} {rendition['width']}w" for rendition in renditions)
+
+
+@register.simple_tag
+def responsive_image(owner, field, sizes='100vw', **attrs):
+    """
+    Render an image field with its WebP and JPEG renditions (teams.image_pipeline).
+
+    Emits a <picture> with a WebP srcset and a JPEG <img> fallback, so the
+    browser downloads the smallest rendition that fills the displayed size;
+    until the renditions exist, a plain <img> of the uploaded file. Extra
+    keyword arguments become attributes of the <img>.
+
+    Usage::
+
+        {% load image_tags %}
+        {% responsive_image player.profile "profile_picture" sizes="40px" alt=player.name class="rounded-circle" width=40 height=40 %}
+    """
+    file = getattr(owner, field, None) if owner else None
+    if not file:
+        return ''
+
+    attrs.setdefault('loading', 'lazy')
+    attrs.setdefault('decoding', 'async')
+    attributes = format_html_join(' ', '{}="{}"', sorted((name.replace('_', '-'), value) for name, value in attrs.items()))
+
+    renditions = (getattr(owner, f'{field}_renditions', None) or {}).get('renditions')
+    if not renditions:
+        return format_html('<img src="{}" {}>', file.url, attributes)
+
+    # The middle size is the fallback for browsers without srcset
+    fallback = renditions[len(renditions) // 2]['jpeg']['name']
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" {}></picture>',
+        _srcset(renditions, 'webp'), sizes,
+        default_storage.url(fallback), _srcset(renditions, 'jpeg'), sizes, attributes,
+    )
@@ -1,3 +1,193 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from matches.models import Match, MatchPlayer
+from matches.rating_integration import update_tournament_match_ratings
+from tournaments.models import Tournament
+from . import image_pipeline
+from .models import ImageJob, Player, PlayerProfile, Team
+from .rating_replay import replay_ratings
 
-# Create your tests here.
+
+class RatingReplayTests(TestCase):
+    """Replaying unchanged history reproduces the ratings written by the live path."""
+
+    def setUp(self):
+        now = timezone.now()
+        self.start = now - timedelta(days=1)
+        self.tournament = Tournament.objects.create(name='Replay', format='round_robin', start_date=self.start, end_date=now)
+        self.teams = {}
+        for i, name in enumerate(['A', 'B', 'C']):
+            team = Team.objects.create(name=name, pin=f'{200000 + i}')
+            players = [Player.objects.create(name=f'{name}{j}', team=team) for j in range(3)]
+            for player in players:
+                PlayerProfile.objects.get_or_create(player=player)
+            self.teams[name] = (team, players)
+
+    def play(self, team1, team2, score1, score2, minutes, participants=()):
+        """Complete a match and rate it as the match views do."""
+        match = Match.objects.create(
+            tournament=self.tournament, team1=team1, team2=team2, status='active',
+            start_time=self.start + timedelta(minutes=minutes),
+        )
+        for player in participants:
+            MatchPlayer.objects.create(match=match, player=player, team=player.team)
+        match.team1_score, match.team2_score = score1, score2
+        match.winner, match.loser = (team1, team2) if score1 > score2 else (team2, team1)
+        match.status = 'completed'
+        match.end_time = self.start + timedelta(minutes=minutes + 30)
+        match.save()
+        self.assertTrue(update_tournament_match_ratings(match)['success'])
+
+    def test_replay_matches_live_ratings(self):
+        team_a, players_a = self.teams['A']
+        team_b, players_b = self.teams['B']
+        team_c, players_c = self.teams['C']
+
+        # Only two of A's players played; B's participants were recorded in full
+        self.play(team_a, team_b, 13, 7, 0, participants=players_a[:2] + players_b)
+        # A player changes team after the recorded match
+        moved = players_b[0]
+        moved.team = team_c
+        moved.save()
+        # No participants recorded: both sides are the current rosters
+        self.play(team_b, team_c, 5, 13, 60)
+        self.play(team_a, team_c, 13, 11, 120, participants=players_a + players_c[1:])
+
+        live = dict(PlayerProfile.objects.values_list('player_id', 'value'))
+        self.assertNotEqual(live[players_a[2].id], live[players_a[0].id])
+
+        result = replay_ratings(dry_run=True)
+        self.assertEqual(result['tournament_games'], 3)
+        self.assertEqual(result['changes'], [])
+
+    def test_replay_ignores_roster_changes_after_an_unrecorded_match(self):
+        team_a, players_a = self.teams['A']
+        team_b, players_b = self.teams['B']
+        team_c, players_c = self.teams['C']
+
+        # No participants recorded: the live update rates the rosters of the time
+        self.play(team_a, team_b, 13, 4, 0)
+        # Then a new player joins A and one of C's players moves to B
+        newcomer = Player.objects.create(name='A new', team=team_a)
+        PlayerProfile.objects.get_or_create(player=newcomer)
+        mover = players_c[0]
+        mover.team = team_b
+        mover.save()
+
+        result = replay_ratings(dry_run=True)
+        self.assertEqual(result['tournament_games'], 1)
+        self.assertEqual(result['changes'], [])
+
+
+def upload(color, size=(640, 480)):
+    """A PNG upload of one colour."""
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PNG')
+    return SimpleUploadedFile('picture.png', buffer.getvalue(), content_type='image/png')
+
+
+class ImagePipelineTests(TestCase):
+    """Profile pictures are only processed when their content changes, off the save, with retries."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        # No worker threads: the tests run the jobs themselves
+        settings = override_settings(MEDIA_ROOT=media_root, IMAGE_WORKER_THREADS=0)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        team = Team.objects.create(name='Images', pin='300000')
+        self.profile, _ = PlayerProfile.objects.get_or_create(player=Player.objects.create(name='Pic', team=team))
+
+    def pending_jobs(self):
+        return ImageJob.objects.filter(status='pending', object_id=self.profile.id, field='profile_picture')
+
+    def run_pending_jobs(self):
+        for job in image_pipeline.claim_next_jobs(limit=10):
+            self.assertTrue(image_pipeline.run_job(job))
+        self.profile.refresh_from_db()
+
+    def test_unchanged_image_queues_no_job(self):
+        self.profile.profile_picture = upload('red')
+        self.profile.save()
+        self.assertEqual(self.pending_jobs().count(), 1)
+        self.run_pending_jobs()
+
+        self.profile.matches_played = 4
+        self.profile.save()
+        PlayerProfile.objects.get(id=self.profile.id).save()
+        self.assertEqual(self.pending_jobs().count(), 0)
+
+    def test_same_image_uploaded_again_is_skipped(self):
+        self.profile.profile_picture = upload('red')
+        self.profile.save()
+        self.run_pending_jobs()
+        name, renditions = self.profile.profile_picture.name, self.profile.profile_picture_renditions
+
+        self.profile.profile_picture = upload('red')
+        self.profile.save()
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.profile_picture.name, name)
+        self.assertEqual(self.profile.profile_picture_renditions, renditions)
+        self.assertEqual(self.pending_jobs().count(), 0)
+
+    def test_repeated_uploads_collapse_into_one_pending_job(self):
+        for color in ('red', 'green', 'blue'):
+            self.profile.profile_picture = upload(color)
+            self.profile.save()
+
+        job = self.pending_jobs().get()
+        self.assertEqual(job.content_hash, self.profile.profile_picture_hash)
+        self.run_pending_jobs()
+        self.assertEqual(self.profile.profile_picture_renditions['hash'], job.content_hash)
+
+    def test_failed_job_is_retried_with_backoff(self):
+        self.profile.profile_picture = upload('red')
+        self.profile.save()
+        job_id = self.pending_jobs().get().id
+
+        delays = []
+        with mock.patch.object(image_pipeline, 'render_renditions', side_effect=OSError('disk full')):
+            for attempt in range(1, 4):
+                ImageJob.objects.filter(id=job_id).update(run_after=timezone.now())
+                job = image_pipeline.claim_job(job_id)
+                with self.assertLogs('teams.image_pipeline', 'ERROR'):
+                    self.assertFalse(image_pipeline.run_job(job))
+                job.refresh_from_db()
+                self.assertEqual(job.attempts, attempt)
+                self.assertEqual(job.last_error, 'disk full')
+                if job.status == 'pending':
+                    delays.append(job.run_after - job.started_at)
+                    # Not due before its backoff has passed
+                    self.assertIsNone(image_pipeline.claim_job(job_id))
+
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual([round(delay.total_seconds()) for delay in delays], [30, 60])
+        self.assertEqual(self.profile.profile_picture_renditions, {})
+
+    def test_renditions_metadata_is_written(self):
+        self.profile.profile_picture = upload('red')
+        self.profile.save()
+        self.run_pending_jobs()
+
+        metadata = self.profile.profile_picture_renditions
+        self.assertEqual(metadata['hash'], self.profile.profile_picture_hash)
+        self.assertEqual((metadata['width'], metadata['height']), (640, 480))
+        self.assertEqual(
+            [(rendition['size'], rendition['width'], rendition['height']) for rendition in metadata['renditions']],
+            [('thumb', 96, 72), ('list', 300, 225), ('full', 600, 450)],
+        )
+        for rendition in metadata['renditions']:
+            for key in ('webp', 'jpeg'):
+                self.assertTrue(default_storage.exists(rendition[key]['name']))
+                self.assertEqual(default_storage.size(rendition[key]['name']), rendition[key]['bytes'])
+        self.assertEqual(ImageJob.objects.get(object_id=self.profile.id).status, 'succeeded')
@@ -16,6 +16,7 @@ urlpatterns = [
     path('players/login/', views.player_login, name='player_login'),
     path('api/search/', views.team_search_api, name='team_search_api'),
     path('api/player-lookup/', api_views.player_lookup_api, name='player_lookup_api'),
+    path('api/rating-replay/', api_views.rating_replay_api, name='rating_replay_api'),
     path('<int:team_id>/pin/', views.show_team_pin, name='show_team_pin'),
 ]
 
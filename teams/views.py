@@ -1,38 +1,48 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q, Count, Prefetch
+from django.core.paginator import Paginator
+from django.db.models import Q, Prefetch, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.http import JsonResponse
-from .models import Team, Player, TeamAvailability, PlayerProfile, TeamProfile
+from django.utils import timezone
+from datetime import timedelta
+from .models import Team, Player, TeamAvailability, PlayerProfile, TeamProfile, PlayerStatistics
+from .rating_distribution import get_bell_curve_data
 from .forms import TeamForm, PlayerForm, TeamAvailabilityForm, PublicPlayerForm
 from matches.models import Match, MatchActivation
 from pfc_core.session_utils import CodenameSessionManager
+from pfc_core.cache_registry import get_or_build
 from friendly_games.models import PlayerCodename
 
 # Enhanced public team views
 def team_list(request):
     """Enhanced team list with profiles, logos, and statistics"""
-    teams = Team.objects.all().order_by('name')
-    
-    # Prepare teams with profile data
-    teams_with_profiles = []
-    for team in teams:
-        try:
-            profile = team.profile
-        except:
-            # Create profile if it doesn't exist
-            profile = TeamProfile.objects.create(team=team)
+    def build():
+        teams = Team.objects.all().order_by('name')
         
-        # Get team statistics
-        team_data = {
-            'team': team,
-            'profile': profile,
-            'player_count': team.players.count(),
-            'badges': profile.get_badge_display()[:3],  # Show first 3 badges
-            'total_badges': len(profile.get_badge_display()),
-        }
-        teams_with_profiles.append(team_data)
+        # Prepare teams with profile data
+        teams_with_profiles = []
+        for team in teams:
+            try:
+                profile = team.profile
+            except:
+                # Create profile if it doesn't exist
+                profile = TeamProfile.objects.create(team=team)
+            
+            # Get team statistics
+            team_data = {
+                'team': team,
+                'profile': profile,
+                'player_count': team.players.count(),
+                'badges': profile.get_badge_display()[:3],  # Show first 3 badges
+                'total_badges': len(profile.get_badge_display()),
+            }
+            teams_with_profiles.append(team_data)
+        return teams_with_profiles
     
+    # Rebuilt only after a team, its profile or its players change
+    teams_with_profiles = get_or_build('team_list', build)
     return render(request, 'teams/team_list.html', {'teams_with_profiles': teams_with_profiles})
 
 def team_detail(request, team_id):
@@ -554,9 +564,17 @@ def player_login(request):
     return redirect('home')  # Redirect back to home page
 
 # New views for player statistics
+PLAYER_LEADERBOARD_PAGE_SIZE = 50
+
+# Window of rating history shown on the player profile chart
+RATING_CHART_DAYS = 365
+
 def player_leaderboard(request):
     """
-    Display a leaderboard of all players with their statistics
+    Display a leaderboard of all players with their statistics.
+
+    Reads the materialized PlayerStatistics rows (maintained on match completion)
+    so filtering, sorting and pagination all happen in the database.
     """
     # Get filter parameters
     team_id = request.GET.get('team')
@@ -564,112 +582,60 @@ def player_leaderboard(request):
     position = request.GET.get('position')
     sort_by = request.GET.get('sort_by', 'win_rate')
     order = request.GET.get('order', 'desc')
+    order_prefix = '-' if order == 'desc' else ''
     
-    # Start with all players that have profiles
-    players = Player.objects.filter(profile__isnull=False).select_related('team', 'profile')
-    
-    # Apply filters
+    # Filters shared by the overall and position leaderboards
+    filters = Q(player__profile__isnull=False)
     if team_id:
-        players = players.filter(team_id=team_id)
-    
+        filters &= Q(player__team_id=team_id)
     if skill_level:
-        players = players.filter(profile__skill_level=skill_level)
-    
+        filters &= Q(player__profile__skill_level=skill_level)
     if position:
-        players = players.filter(profile__preferred_position=position)
+        filters &= Q(player__profile__preferred_position=position)
+    
+    # Best position = role row with the highest win rate
+    best_role = PlayerStatistics.objects.filter(
+        player_id=OuterRef('player_id'),
+        match_format=PlayerStatistics.ALL,
+        matches_played__gt=0,
+    ).exclude(role=PlayerStatistics.ALL).order_by('-win_rate', 'role')
+    
+    stats = PlayerStatistics.objects.filter(
+        filters,
+        role=PlayerStatistics.ALL,
+        match_format=PlayerStatistics.ALL,
+    ).select_related('player__team', 'player__profile').annotate(
+        best_position=Subquery(best_role.values('role')[:1]),
+        best_position_win_rate=Coalesce(Subquery(best_role.values('win_rate')[:1]), Value(0.0)),
+    )
+    
+    # Apply sorting in the database
+    sort_fields = {
+        'win_rate': 'win_rate',
+        'matches_played': 'matches_played',
+        'matches_won': 'matches_won',
+        'best_position_win_rate': 'best_position_win_rate',
+    }
+    if sort_by in sort_fields:
+        sort_field = sort_fields[sort_by]
+    elif sort_by in {field.name for field in PlayerProfile._meta.concrete_fields}:
+        sort_field = f"player__profile__{sort_by}"
+    else:
+        sort_field = 'win_rate'
+    stats = stats.order_by(f"{order_prefix}{sort_field}", 'player__name')
+    
+    paginator = Paginator(stats, PLAYER_LEADERBOARD_PAGE_SIZE)
+    page_obj = paginator.get_page(request.GET.get('page'))
     
-    # Convert to list and add accurate statistics for each player
     players_with_stats = []
-    for player in players:
-        try:
-            # Get accurate overall statistics
-            accurate_stats = player.profile.get_accurate_statistics()
-            player.accurate_matches_played = accurate_stats['matches_played']
-            player.accurate_matches_won = accurate_stats['matches_won']
-            player.accurate_win_rate = accurate_stats['win_rate']
-            
-            # Get position-based statistics
-            position_stats = player.profile.get_position_stats()
-            player.position_stats = position_stats
-            
-            # Calculate best position (position with highest win rate)
-            best_position = None
-            best_win_rate = 0
-            for pos, stats in position_stats.items():
-                if stats['matches_played'] > 0 and stats['win_rate'] > best_win_rate:
-                    best_position = pos
-                    best_win_rate = stats['win_rate']
-            
-            player.best_position = best_position
-            player.best_position_win_rate = best_win_rate
-            
-            players_with_stats.append(player)
-        except Exception:
-            # Fallback to stored values if anything goes wrong
-            player.accurate_matches_played = player.profile.matches_played
-            player.accurate_matches_won = player.profile.matches_won
-            player.accurate_win_rate = player.profile.win_rate()
-            player.position_stats = {}
-            player.best_position = None
-            player.best_position_win_rate = 0
-            players_with_stats.append(player)
-    
-    # Apply sorting with accurate statistics
-    if sort_by == 'win_rate':
-        players_with_stats.sort(
-            key=lambda p: p.accurate_win_rate, 
-            reverse=(order == 'desc')
-        )
-    elif sort_by == 'matches_played':
-        players_with_stats.sort(
-            key=lambda p: p.accurate_matches_played, 
-            reverse=(order == 'desc')
-        )
-    elif sort_by == 'matches_won':
-        players_with_stats.sort(
-            key=lambda p: p.accurate_matches_won, 
-            reverse=(order == 'desc')
-        )
-    elif sort_by == 'best_position_win_rate':
-        players_with_stats.sort(
-            key=lambda p: p.best_position_win_rate, 
-            reverse=(order == 'desc')
-        )
-    else:
-        # For other fields, use the original sorting
-        order_prefix = '-' if order == 'desc' else ''
-        sort_field = f"{order_prefix}profile__{sort_by}"
-        players_with_stats = list(Player.objects.filter(
-            profile__isnull=False
-        ).select_related('team', 'profile').order_by(sort_field))
-        
-        # Still need to add accurate stats for display
-        for player in players_with_stats:
-            try:
-                accurate_stats = player.profile.get_accurate_statistics()
-                player.accurate_matches_played = accurate_stats['matches_played']
-                player.accurate_matches_won = accurate_stats['matches_won']
-                player.accurate_win_rate = accurate_stats['win_rate']
-                
-                position_stats = player.profile.get_position_stats()
-                player.position_stats = position_stats
-                
-                best_position = None
-                best_win_rate = 0
-                for pos, stats in position_stats.items():
-                    if stats['matches_played'] > 0 and stats['win_rate'] > best_win_rate:
-                        best_position = pos
-                        best_win_rate = stats['win_rate']
-                
-                player.best_position = best_position
-                player.best_position_win_rate = best_win_rate
-            except Exception:
-                player.accurate_matches_played = player.profile.matches_played
-                player.accurate_matches_won = player.profile.matches_won
-                player.accurate_win_rate = player.profile.win_rate()
-                player.position_stats = {}
-                player.best_position = None
-                player.best_position_win_rate = 0
+    for row in page_obj:
+        player = row.player
+        player.accurate_matches_played = row.matches_played
+        player.accurate_matches_won = row.matches_won
+        player.accurate_win_rate = row.win_rate
+        player.best_position = row.best_position
+        player.best_position_win_rate = row.best_position_win_rate
+        players_with_stats.append(player)
     
     # Create position-specific leaderboards
     position_leaderboards = {}
@@ -680,34 +646,44 @@ def player_leaderboard(request):
         'tirer': 'Shooter',
         'flex': 'Flex'
     }
-    
     for pos in positions:
-        position_players = []
-        for player in players_with_stats:
-            if pos in player.position_stats and player.position_stats[pos]['matches_played'] > 0:
-                # Create a copy of player with position-specific stats
-                pos_player = type('obj', (object,), {
-                    'id': player.id,
-                    'name': player.name,
-                    'team': player.team,
-                    'profile': player.profile,
-                    'is_captain': getattr(player, 'is_captain', False),
-                    'position': position_display_names[pos],
-                    'matches_played': player.position_stats[pos]['matches_played'],
-                    'matches_won': player.position_stats[pos]['matches_won'],
-                    'win_rate': player.position_stats[pos]['win_rate']
-                })()
-                position_players.append(pos_player)
-        
-        # Sort by win rate for this position
-        position_players.sort(key=lambda p: p.win_rate, reverse=True)
-        position_leaderboards[position_display_names[pos]] = position_players
+        position_leaderboards[position_display_names[pos]] = []
+    
+    position_rows = PlayerStatistics.objects.filter(
+        filters,
+        role__in=positions,
+        match_format=PlayerStatistics.ALL,
+        matches_played__gt=0,
+    ).select_related('player__team', 'player__profile').order_by('role', '-win_rate', 'player__name')
+    
+    for row in position_rows:
+        player = row.player
+        # Create a copy of player with position-specific stats
+        pos_player = type('obj', (object,), {
+            'id': player.id,
+            'name': player.name,
+            'team': player.team,
+            'profile': player.profile,
+            'is_captain': getattr(player, 'is_captain', False),
+            'position': position_display_names[row.role],
+            'matches_played': row.matches_played,
+            'matches_won': row.matches_won,
+            'win_rate': row.win_rate
+        })()
+        position_leaderboards[position_display_names[row.role]].append(pos_player)
     
     # Get all teams for the filter dropdown
     teams = Team.objects.all().order_by('name')
     
+    # Keep the active filters when paging
+    query_params = request.GET.copy()
+    query_params.pop('page', None)
+    
     context = {
         'players': players_with_stats,
+        'page_obj': page_obj,
+        'total_players': paginator.count,
+        'query_string': query_params.urlencode(),
         'position_leaderboards': position_leaderboards,
         'teams': teams,
         'selected_team': int(team_id) if team_id else None,
@@ -797,16 +773,14 @@ def player_profile(request, player_id):
         from friendly_games.models import FriendlyGameStatistics, FriendlyGame, FriendlyGamePlayer
         from django.db import models
         
-        # Get friendly game statistics
-        friendly_stats_obj, created = FriendlyGameStatistics.objects.get_or_create(player=player)
-        if not created:
-            friendly_stats_obj.update_statistics()  # Ensure stats are current
+        # Get friendly game statistics (counters maintained on game completion; read only)
+        friendly_stats_obj = FriendlyGameStatistics.objects.filter(player=player).first()
         
         friendly_stats = {
-            'total_games': friendly_stats_obj.total_games,
-            'total_wins': friendly_stats_obj.total_wins,
-            'total_losses': friendly_stats_obj.total_losses,
-            'win_rate': friendly_stats_obj.win_rate
+            'total_games': friendly_stats_obj.total_games if friendly_stats_obj else 0,
+            'total_wins': friendly_stats_obj.total_wins if friendly_stats_obj else 0,
+            'total_losses': friendly_stats_obj.total_losses if friendly_stats_obj else 0,
+            'win_rate': friendly_stats_obj.win_rate if friendly_stats_obj else 0
         }
         
         # Get friendly game position statistics
@@ -817,12 +791,19 @@ def player_profile(request, player_id):
             game__status='COMPLETED'
         ).select_related('game')
         
-        # Calculate position-specific stats
+        # Games and wins per position from one grouped query
         positions = ['TIRER', 'POINTEUR', 'MILIEU']
+        position_totals = {
+            row['position']: row
+            for row in friendly_game_players.values('position').annotate(
+                total_games=models.Count('id'),
+                total_wins=models.Sum('games_won'),
+            ).order_by()
+        }
         for position in positions:
-            position_games = friendly_game_players.filter(position=position)
-            total_games = position_games.count()
-            total_wins = position_games.aggregate(total=models.Sum('games_won'))['total'] or 0
+            totals = position_totals.get(position, {})
+            total_games = totals.get('total_games', 0)
+            total_wins = totals.get('total_wins') or 0
             
             if total_games > 0:
                 win_rate = round((total_wins / total_games) * 100, 1)
@@ -837,10 +818,10 @@ def player_profile(request, player_id):
         
         # Calculate role distribution for friendly games
         friendly_role_distribution = {}
-        total_friendly_games = friendly_game_players.count()
+        total_friendly_games = sum(stats['matches_played'] for stats in friendly_position_stats.values())
         if total_friendly_games > 0:
             for position in positions:
-                position_count = friendly_game_players.filter(position=position).count()
+                position_count = friendly_position_stats[position]['matches_played']
                 percentage = round((position_count / total_friendly_games) * 100, 1)
                 friendly_role_distribution[position] = {
                     'count': position_count,
@@ -906,124 +887,41 @@ def player_profile(request, player_id):
             'win_rate': accurate_stats.get('win_rate', 0)
         }
     
-    # Calculate bell curve data for skill comparison
-    bell_curve_data = {}
+    # Skill comparison against the shared rating distribution snapshot
+    bell_curve_data = {'has_data': False}
     try:
         if hasattr(player, 'profile') and player.profile:
-            # Get all player profiles with ratings
-            all_profiles = PlayerProfile.objects.exclude(value__isnull=True).exclude(value=0)
-            
-            if all_profiles.count() > 0:
-                # Get current player's rating
-                current_rating = float(player.profile.value)
-                
-                # Get all ratings for distribution calculation
-                all_ratings = [float(p.value) for p in all_profiles]
-                all_ratings.sort()
-                
-                # Calculate percentile (how many players have lower rating)
-                lower_count = sum(1 for rating in all_ratings if rating < current_rating)
-                percentile = round((lower_count / len(all_ratings)) * 100, 1)
-                
-                # Calculate average rating
-                avg_rating = sum(all_ratings) / len(all_ratings)
-                
-                # Create histogram bins for actual distribution
-                # Define skill level ranges with 10 subdivisions per category
-                skill_ranges = []
-                
-                # Novice: 0-199 (10 subdivisions of 20 points each)
-                for i in range(10):
-                    skill_ranges.append({
-                        'name': f'Novice {i+1}',
-                        'min': i * 20,
-                        'max': (i + 1) * 20 - 1,
-                        'color': '#28a745',
-                        'category': 'Novice'
-                    })
-                
-                # Intermediate: 200-399 (10 subdivisions of 20 points each)
-                for i in range(10):
-                    skill_ranges.append({
-                        'name': f'Intermediate {i+1}',
-                        'min': 200 + i * 20,
-                        'max': 200 + (i + 1) * 20 - 1,
-                        'color': '#ffc107',
-                        'category': 'Intermediate'
-                    })
-                
-                # Advanced: 400-699 (10 subdivisions of 30 points each)
-                for i in range(10):
-                    skill_ranges.append({
-                        'name': f'Advanced {i+1}',
-                        'min': 400 + i * 30,
-                        'max': 400 + (i + 1) * 30 - 1,
-                        'color': '#fd7e14',
-                        'category': 'Advanced'
-                    })
-                
-                # Pro: 700-1000 (10 subdivisions of 30 points each)
-                for i in range(10):
-                    skill_ranges.append({
-                        'name': f'Pro {i+1}',
-                        'min': 700 + i * 30,
-                        'max': 700 + (i + 1) * 30 - 1,
-                        'color': '#dc3545',
-                        'category': 'Pro'
-                    })
-                
-                # Count players in each skill range
-                distribution = []
-                for skill_range in skill_ranges:
-                    count = sum(1 for rating in all_ratings 
-                              if skill_range['min'] <= rating <= skill_range['max'])
-                    percentage = (count / len(all_ratings)) * 100 if len(all_ratings) > 0 else 0
-                    distribution.append({
-                        'name': skill_range['name'],
-                        'count': count,
-                        'percentage': round(percentage, 1),
-                        'color': skill_range['color'],
-                        'min': skill_range['min'],
-                        'max': skill_range['max']
-                    })
-                
-                # Find which range the current player is in
-                current_player_range = None
-                for i, skill_range in enumerate(skill_ranges):
-                    if skill_range['min'] <= current_rating <= skill_range['max']:
-                        current_player_range = i
-                        break
-                
-                # Calculate position within the range where players actually exist
-                min_rating = min(all_ratings)
-                max_rating = max(all_ratings)
-                
-                # Calculate player's position relative to actual data range
-                if max_rating > min_rating:
-                    position = ((current_rating - min_rating) / (max_rating - min_rating)) * 100
-                else:
-                    position = 50  # Middle if all ratings are the same
-                
-                bell_curve_data = {
-                    'current_rating': current_rating,
-                    'percentile': percentile,
-                    'avg_rating': round(avg_rating, 1),
-                    'min_rating': min_rating,
-                    'max_rating': max_rating,
-                    'total_players': len(all_ratings),
-                    'position': round(position, 1),
-                    'distribution': distribution,
-                    'current_player_range': current_player_range,
-                    'all_ratings': all_ratings,
-                    'has_data': True
-                }
-            else:
-                bell_curve_data = {'has_data': False}
-        else:
-            bell_curve_data = {'has_data': False}
+            bell_curve_data = get_bell_curve_data(player.profile.value)
     except Exception:
         bell_curve_data = {'has_data': False}
-    
+
+    # Rating over time, from the player's RatingEvent rows (indexed range query)
+    rating_chart_data = {'has_data': False}
+    try:
+        if hasattr(player, 'profile') and player.profile:
+            since = timezone.now() - timedelta(days=RATING_CHART_DAYS)
+            timeline = player.profile.get_rating_timeline(since=since)
+            if len(timeline) >= 2:
+                values = [value for timestamp, value in timeline]
+                low, high = min(values), max(values)
+                spread = (high - low) or 1.0
+                step = 300.0 / (len(values) - 1)
+                rating_chart_data = {
+                    'has_data': True,
+                    'points': ' '.join(
+                        f'{i * step:.1f},{95 - (value - low) / spread * 90:.1f}'
+                        for i, value in enumerate(values)
+                    ),
+                    'min_rating': round(low, 1),
+                    'max_rating': round(high, 1),
+                    'first_date': timeline[0][0],
+                    'last_date': timeline[-1][0],
+                    'games': len(timeline),
+                    'days': RATING_CHART_DAYS,
+                }
+    except Exception:
+        rating_chart_data = {'has_data': False}
+
     context = {
         'player': player,
         'matches': tournament_matches,  # Tournament matches for match history table
@@ -1035,6 +933,7 @@ def player_profile(request, player_id):
         'friendly_position_stats': friendly_position_stats,  # Friendly game position stats
         'friendly_role_distribution': friendly_role_distribution,  # Friendly game role distribution
         'bell_curve_data': bell_curve_data,  # NEW: Bell curve skill comparison data
+        'rating_chart_data': rating_chart_data,  # Rating over time from RatingEvent
     }
     
     return render(request, 'teams/player_profile.html', context)
@@ -1149,83 +1048,28 @@ def friendly_games_leaderboard(request):
     Shows only fully validated games and includes trophy recognition
     """
     from django.shortcuts import render
-    from django.db.models import Count, Sum, Case, When, IntegerField, FloatField, F
-    from django.db.models.functions import Coalesce
     
     try:
-        from friendly_games.models import FriendlyGamePlayer, FriendlyGame
+        from friendly_games.leaderboard import get_friendly_rankings
         
         # Get filter parameters
         position_filter = request.GET.get('position', 'all')
         format_filter = request.GET.get('format', 'all')
         
-        # Base query for fully validated games only
-        base_query = FriendlyGamePlayer.objects.filter(
-            game__validation_status="FULLY_VALIDATED",
-            game__status="COMPLETED",
-            codename_verified=True
-        )
-        
-        # Apply position filter
+        # Leaderboard and trophies, recomputed only after a new game is fully validated
+        rankings = get_friendly_rankings()
         if position_filter != 'all':
-            base_query = base_query.filter(position=position_filter.upper())
-        
-        # Calculate player statistics with dynamic win/loss calculation
-        player_stats = base_query.values('player__id', 'player__name').annotate(
-            games_played=Count('id'),
-            games_won=Sum(
-                Case(
-                    # Player on BLACK team and BLACK team won
-                    When(
-                        team='BLACK',
-                        game__black_team_score__gt=F('game__white_team_score'),
-                        then=1
-                    ),
-                    # Player on WHITE team and WHITE team won
-                    When(
-                        team='WHITE',
-                        game__white_team_score__gt=F('game__black_team_score'),
-                        then=1
-                    ),
-                    default=0,
-                    output_field=IntegerField()
-                )
-            ),
-            games_lost=Sum(
-                Case(
-                    # Player on BLACK team and BLACK team lost
-                    When(
-                        team='BLACK',
-                        game__black_team_score__lt=F('game__white_team_score'),
-                        then=1
-                    ),
-                    # Player on WHITE team and WHITE team lost
-                    When(
-                        team='WHITE',
-                        game__white_team_score__lt=F('game__black_team_score'),
-                        then=1
-                    ),
-                    default=0,
-                    output_field=IntegerField()
-                )
-            ),
-            win_rate=Case(
-                When(games_played=0, then=0),
-                default=F('games_won') * 100.0 / F('games_played'),
-                output_field=FloatField()
-            )
-        ).filter(games_played__gt=0).order_by('-games_played', '-win_rate')
-        
-        # Calculate trophy winners
-        trophies = calculate_friendly_game_trophies()
+            player_stats = rankings['positions'].get(position_filter.upper(), [])
+        else:
+            player_stats = rankings['overall']
         
         # Prepare context
         context = {
             'player_stats': player_stats,
-            'trophies': trophies,
+            'trophies': rankings['trophies'],
             'position_filter': position_filter,
             'format_filter': format_filter,
-            'total_players': player_stats.count(),
+            'total_players': len(player_stats),
             'page_title': 'Friendly Games Leaderboard',
         }
         
@@ -1245,83 +1089,8 @@ def calculate_friendly_game_trophies():
     Calculate trophy winners for friendly games leaderboard
     """
     try:
-        from friendly_games.models import FriendlyGamePlayer
-        from django.db.models import Count, Sum, Case, When, FloatField, F, IntegerField
-        from django.db.models.functions import Coalesce
-        
-        # Base query for fully validated games
-        base_query = FriendlyGamePlayer.objects.filter(
-            game__validation_status="FULLY_VALIDATED",
-            game__status="COMPLETED",
-            codename_verified=True
-        )
-        
-        # Most Active Players (Star Trophies)
-        most_active = base_query.values('player__id', 'player__name').annotate(
-            games_played=Count('id')
-        ).filter(games_played__gt=0).order_by('-games_played')[:3]
-        
-        # Best Shooter Players
-        best_shooters = base_query.filter(position="TIRER").values('player__id', 'player__name').annotate(
-            games_played=Count('id'),
-            games_won=Sum(
-                Case(
-                    # Player on BLACK team and BLACK team won
-                    When(
-                        team='BLACK',
-                        game__black_team_score__gt=F('game__white_team_score'),
-                        then=1
-                    ),
-                    # Player on WHITE team and WHITE team won
-                    When(
-                        team='WHITE',
-                        game__white_team_score__gt=F('game__black_team_score'),
-                        then=1
-                    ),
-                    default=0,
-                    output_field=IntegerField()
-                )
-            ),
-            win_rate=Case(
-                When(games_played=0, then=0),
-                default=F('games_won') * 100.0 / F('games_played'),
-                output_field=FloatField()
-            )
-        ).filter(games_played__gte=3).order_by('-win_rate', '-games_played')[:3]
-        
-        # Best Pointer Players
-        best_pointers = base_query.filter(position="POINTEUR").values('player__id', 'player__name').annotate(
-            games_played=Count('id'),
-            games_won=Sum(
-                Case(
-                    # Player on BLACK team and BLACK team won
-                    When(
-                        team='BLACK',
-                        game__black_team_score__gt=F('game__white_team_score'),
-                        then=1
-                    ),
-                    # Player on WHITE team and WHITE team won
-                    When(
-                        team='WHITE',
-                        game__white_team_score__gt=F('game__black_team_score'),
-                        then=1
-                    ),
-                    default=0,
-                    output_field=IntegerField()
-                )
-            ),
-            win_rate=Case(
-                When(games_played=0, then=0),
-                default=F('games_won') * 100.0 / F('games_played'),
-                output_field=FloatField()
-            )
-        ).filter(games_played__gte=3).order_by('-win_rate', '-games_played')[:3]
-        
-        return {
-            'most_active': list(most_active),
-            'best_shooters': list(best_shooters),
-            'best_pointers': list(best_pointers),
-        }
+        from friendly_games.leaderboard import get_friendly_rankings
+        return get_friendly_rankings()['trophies']
         
     except ImportError:
         return {
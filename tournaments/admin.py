@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib import messages
 from django.utils.html import format_html
-from .models import Tournament, TournamentTeam, Round, Bracket, TournamentCourt, Stage
+from .models import Tournament, TournamentTeam, Round, Bracket, TournamentCourt, Stage, AutomationJob
 
 # --- Inlines --- 
 
@@ -236,3 +236,11 @@ class TournamentTeamAdmin(admin.ModelAdmin):
     search_fields = ("tournament__name", "team__name")
     ordering = ("tournament", "team")
     autocomplete_fields = ["team"]
+
+@admin.register(AutomationJob)
+class AutomationJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "tournament", "job_type", "status", "attempts", "requested_count", "run_after", "started_at", "finished_at")
+    list_filter = ("status", "job_type", "tournament")
+    search_fields = ("tournament__name", "last_error")
+    readonly_fields = ("created_at", "started_at", "finished_at", "worker", "requested_count")
+    ordering = ("-created_at",)
@@ -0,0 +1,192 @@
+# automation_queue.py - database-backed job queue for tournament automation
+
+import logging
+import socket
+import os
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction, IntegrityError
+from django.db.models import F, Exists, OuterRef
+from django.utils import timezone
+from .models import Tournament, AutomationJob
+
+logger = logging.getLogger("tournaments")
+
+CHECK_ROUND_COMPLETION = "check_round_completion"
+
+# Base delay for retries; doubles with every failed attempt
+RETRY_BASE_DELAY = timedelta(seconds=10)
+
+# Running jobs older than this are assumed to belong to a dead worker
+STALE_JOB_TIMEOUT = timedelta(minutes=10)
+
+
+def default_worker_name():
+    """Identify this worker process in AutomationJob.worker."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_round_check(tournament_id):
+    """
+    Queue a round completion check for a tournament.
+
+    If a check is already pending it is reused (its requested_count is bumped),
+    so many completions in the same round produce a single job. Runs inside
+    the caller's transaction, so the job only becomes visible to the worker
+    once the match save that triggered it has committed.
+
+    Returns:
+        AutomationJob: the pending job, or None when automation runs inline
+    """
+    if getattr(settings, "TOURNAMENT_AUTOMATION_INLINE", False):
+        from .tasks import check_round_completion
+        check_round_completion(tournament_id)
+        return None
+
+    pending = AutomationJob.objects.filter(
+        tournament_id=tournament_id, job_type=CHECK_ROUND_COMPLETION, status="pending"
+    )
+    with transaction.atomic():
+        if not pending.update(requested_count=F("requested_count") + 1):
+            try:
+                with transaction.atomic():
+                    AutomationJob.objects.create(tournament_id=tournament_id, job_type=CHECK_ROUND_COMPLETION)
+            except IntegrityError:
+                # Another request queued the check between our update and insert
+                pending.update(requested_count=F("requested_count") + 1)
+
+        # Surface the queued check without touching an in-progress/error/completed status
+        Tournament.objects.filter(id=tournament_id, automation_status="idle").update(automation_status="queued")
+
+    return pending.first()
+
+
+def claim_next_job(worker_name=None):
+    """
+    Atomically claim the next due job.
+
+    Claiming is a conditional UPDATE (pending -> running), so concurrent
+    workers never run the same job. Tournaments that already have a running
+    job are skipped so their checks stay serialised.
+
+    Returns:
+        AutomationJob or None
+    """
+    worker_name = worker_name or default_worker_name()
+    now = timezone.now()
+    running_for_tournament = AutomationJob.objects.filter(tournament_id=OuterRef("tournament_id"), status="running")
+    candidates = AutomationJob.objects.filter(
+        status="pending", run_after__lte=now
+    ).exclude(Exists(running_for_tournament)).order_by("run_after", "id").values_list("id", flat=True)[:10]
+
+    for job_id in candidates:
+        claimed = AutomationJob.objects.filter(id=job_id, status="pending").update(
+            status="running",
+            worker=worker_name,
+            started_at=now,
+            attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return AutomationJob.objects.select_related("tournament").get(id=job_id)
+    return None
+
+
+def run_job(job):
+    """
+    Execute a claimed job and record the outcome.
+
+    Failures are retried with exponential backoff until max_attempts is
+    reached; the final failure leaves the tournament in the "error" status.
+
+    Returns:
+        bool: True if the job succeeded
+    """
+    from .tasks import check_round_completion
+
+    logger.info(f"Running automation job {job.id} ({job.job_type}) for tournament {job.tournament_id}, attempt {job.attempts}")
+    try:
+        if job.job_type == CHECK_ROUND_COMPLETION:
+            check_round_completion(job.tournament_id, raise_errors=True)
+        else:
+            raise ValueError(f"Unknown automation job type {job.job_type}")
+    except Exception as e:
+        logger.exception(f"Automation job {job.id} for tournament {job.tournament_id} failed: {e}")
+        _record_failure(job, e)
+        return False
+
+    AutomationJob.objects.filter(id=job.id).update(status="succeeded", finished_at=timezone.now(), last_error="")
+    _settle_tournament_status(job.tournament_id)
+    return True
+
+
+def _record_failure(job, error):
+    """Schedule a retry for a failed job, or mark it failed when out of attempts."""
+    now = timezone.now()
+    if job.attempts < job.max_attempts:
+        try:
+            with transaction.atomic():
+                AutomationJob.objects.filter(id=job.id).update(
+                    status="pending",
+                    run_after=now + RETRY_BASE_DELAY * (2 ** (job.attempts - 1)),
+                    last_error=str(error),
+                )
+                # check_round_completion marked the tournament as errored; let the retry run
+                Tournament.objects.filter(id=job.tournament_id, automation_status="error").update(automation_status="queued")
+            logger.info(f"Automation job {job.id} will be retried ({job.attempts}/{job.max_attempts} attempts used)")
+            return
+        except IntegrityError:
+            # A newer check is already pending for this tournament and will cover the retry
+            Tournament.objects.filter(id=job.tournament_id, automation_status="error").update(automation_status="queued")
+
+    AutomationJob.objects.filter(id=job.id).update(status="failed", finished_at=now, last_error=str(error))
+    if job.attempts >= job.max_attempts:
+        Tournament.objects.filter(id=job.tournament_id).exclude(automation_status="completed").update(automation_status="error")
+
+
+def _settle_tournament_status(tournament_id):
+    """Return a queued tournament to idle once no further checks are pending."""
+    if AutomationJob.objects.filter(tournament_id=tournament_id, status="pending").exists():
+        return
+    Tournament.objects.filter(id=tournament_id, automation_status="queued").update(automation_status="idle")
+
+
+def requeue_stale_jobs(timeout=STALE_JOB_TIMEOUT):
+    """
+    Recover jobs left "running" by a worker that died mid-job.
+
+    Returns:
+        int: number of jobs recovered
+    """
+    cutoff = timezone.now() - timeout
+    recovered = 0
+    for job in AutomationJob.objects.filter(status="running", started_at__lt=cutoff):
+        try:
+            with transaction.atomic():
+                recovered += AutomationJob.objects.filter(id=job.id, status="running").update(
+                    status="pending", last_error=f"Recovered from stale worker {job.worker}"
+                )
+        except IntegrityError:
+            # A pending check already exists; this one is redundant
+            AutomationJob.objects.filter(id=job.id).update(
+                status="failed", finished_at=timezone.now(), last_error=f"Abandoned by worker {job.worker}"
+            )
+    if recovered:
+        logger.warning(f"Requeued {recovered} stale automation jobs")
+    return recovered
+
+
+def process_jobs(max_jobs=None, worker_name=None):
+    """
+    Run due jobs until the queue is empty or max_jobs have been processed.
+
+    Returns:
+        int: number of jobs processed
+    """
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        job = claim_next_job(worker_name)
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
@@ -0,0 +1,196 @@
+# knockout_bracket.py - knockout bracket engine
+
+"""
+Knockout tournaments played on a precomputed bracket tree.
+
+The whole seeded tree (every round, with byes) is built when matches are
+generated. Each Bracket knows its parent, and its position decides which
+parent slot the winner takes (odd positions feed team1, even positions
+team2). When a match completes, its winner is written into the parent slot
+and the parent's match is created as soon as both feeders are decided, so
+advancing never scans a round and early finishers start their next match
+while the rest of the round is still playing.
+"""
+
+import logging
+import math
+import random
+from django.db import transaction
+from django.db.models import F
+from matches.models import Match
+from .models import Tournament, Bracket
+from .match_generation import new_match, bulk_create_matches, ensure_rounds, ensure_brackets
+from pfc_core.cache_registry import invalidate_models
+
+logger = logging.getLogger("tournaments")
+
+
+def seed_order(size):
+    """
+    Seeds in bracket order for a draw of ``size`` (a power of two).
+
+    Adjacent pairs meet in the first round, so seed 1 meets the lowest seed
+    and the top two seeds can only meet in the final.
+    """
+    order = [1]
+    while len(order) < size:
+        mirror = len(order) * 2 + 1
+        order = [seed for top in order for seed in (top, mirror - top)]
+    return order
+
+
+def bracket_name(round_number, num_rounds):
+    """Display name for a bracket in ``round_number`` of a ``num_rounds`` draw."""
+    remaining = num_rounds - round_number
+    if remaining == 0:
+        return "Final"
+    if remaining == 1:
+        return "Semi-final"
+    if remaining == 2:
+        return "Quarter-final"
+    return f"Round of {2 ** (remaining + 1)}"
+
+
+def parent_slot(bracket):
+    """Name of the parent bracket slot this bracket's winner goes into."""
+    return "team1" if bracket.position % 2 else "team2"
+
+
+def build_bracket(tournament, tournament_teams, stage=None):
+    """
+    Build the full knockout tree and create every match whose teams are known.
+
+    Teams with a seeding_position are seeded in that order, the rest are drawn
+    at random behind them. Byes go to the top seeds and are resolved at once,
+    so a second round bracket fed by two byes gets its match immediately.
+
+    Args:
+        tournament: Tournament being drawn
+        tournament_teams: TournamentTeam rows taking part
+        stage: optional Stage the rounds belong to
+
+    Returns:
+        list: the created matches
+    """
+    entrants = list(tournament_teams)
+    random.shuffle(entrants)
+    entrants.sort(key=lambda tt: (tt.seeding_position is None, tt.seeding_position or 0))
+    teams = [tt.team for tt in entrants]
+    if len(teams) < 2:
+        return []
+
+    num_rounds = math.ceil(math.log2(len(teams)))
+    size = 2 ** num_rounds
+    seeded = [teams[seed - 1] if seed <= len(teams) else None for seed in seed_order(size)]
+
+    with transaction.atomic():
+        rounds = ensure_rounds(tournament, range(1, num_rounds + 1), stage=stage)
+        brackets = ensure_brackets(tournament, rounds, [
+            (round_number, position)
+            for round_number in range(1, num_rounds + 1)
+            for position in range(1, (size >> round_number) + 1)
+        ])
+
+        for (round_number, position), bracket in brackets.items():
+            bracket.stage = stage
+            bracket.name = bracket_name(round_number, num_rounds)
+            bracket.parent_bracket = brackets.get((round_number + 1, (position + 1) // 2))
+            bracket.team1 = bracket.team2 = bracket.winner = None
+        for position in range(1, size // 2 + 1):
+            bracket = brackets[(1, position)]
+            bracket.team1, bracket.team2 = seeded[2 * position - 2], seeded[2 * position - 1]
+
+        # Walk the tree bottom-up, pushing bye winners into their parents
+        matches = []
+        for (round_number, position) in sorted(brackets):
+            bracket = brackets[(round_number, position)]
+            if bracket.team1 and bracket.team2:
+                matches.append(new_match(tournament, bracket.team1, bracket.team2, round_obj=rounds[round_number], stage=stage, bracket=bracket))
+            elif round_number == 1 and (bracket.team1 or bracket.team2):
+                bracket.winner = bracket.team1 or bracket.team2
+                setattr(bracket.parent_bracket, parent_slot(bracket), bracket.winner)
+
+        Bracket.objects.bulk_update(brackets.values(), ["stage", "name", "parent_bracket", "team1", "team2", "winner"])
+        created = bulk_create_matches(matches)
+        _advance_current_round(tournament, min((match.round.number for match in created), default=1))
+
+    logger.info(f"Built {size}-slot knockout bracket for tournament {tournament.id}: {len(created)} matches ready")
+    return created
+
+
+def uses_bracket_engine(tournament):
+    """True if the tournament's knockout draw was built by build_bracket."""
+    return Bracket.objects.filter(tournament=tournament, team1__isnull=False).exists()
+
+
+def advance_winner(match):
+    """
+    Move a completed match's winner into the next bracket slot.
+
+    Creates the parent bracket's match once both of its teams are known.
+    Safe to call more than once for the same match.
+
+    Returns:
+        (advanced, matches_created, tournament_complete)
+    """
+    if not match.bracket_id or match.status != "completed":
+        return False, 0, False
+    if match.winner_id is None:
+        logger.warning(f"Knockout match {match.id} has no winner; a draw must be resolved before the bracket can advance")
+        return False, 0, False
+
+    with transaction.atomic():
+        Bracket.objects.filter(id=match.bracket_id).update(winner_id=match.winner_id)
+        bracket = Bracket.objects.only("id", "position", "parent_bracket_id").get(id=match.bracket_id)
+
+        if bracket.parent_bracket_id is None:
+            Tournament.objects.filter(id=match.tournament_id).update(automation_status="completed", current_round_number=None)
+            invalidate_models(Tournament)
+            logger.info(f"Knockout tournament {match.tournament_id} completed. Champion: team {match.winner_id}")
+            return True, 0, True
+
+        # The slot is only written once; both feeders update the same parent row,
+        # so the second one to commit is the one that sees both teams
+        slot = parent_slot(bracket)
+        filled = Bracket.objects.filter(id=bracket.parent_bracket_id, **{f"{slot}__isnull": True}).update(**{f"{slot}_id": match.winner_id})
+        parent = Bracket.objects.select_related("round", "stage", "team1", "team2", "tournament").get(id=bracket.parent_bracket_id)
+        if not filled and getattr(parent, f"{slot}_id") != match.winner_id:
+            logger.warning(f"Bracket {parent.id} already holds a different team from match {match.id}; not overwriting")
+            return False, 0, False
+
+        if not (parent.team1_id and parent.team2_id) or parent.matches.exists():
+            return filled == 1, 0, False
+
+        bulk_create_matches([new_match(parent.tournament, parent.team1, parent.team2, round_obj=parent.round, stage=parent.stage, bracket=parent)])
+        _advance_current_round(parent.tournament, parent.round.number)
+    logger.info(f"Created {parent.name or 'bracket'} match {parent.team1} vs {parent.team2} in tournament {parent.tournament_id}")
+    return True, 1, False
+
+
+def sync_bracket(tournament):
+    """
+    Advance every completed bracket match whose winner has not moved on yet.
+
+    Catch-up for results recorded without going through advance_winner
+    (admin edits, failed requests); normally there is nothing to do.
+
+    Returns:
+        (advanced, matches_created, tournament_complete)
+    """
+    pending = Match.objects.filter(
+        tournament=tournament, status="completed", bracket__isnull=False, winner__isnull=False,
+    ).exclude(bracket__winner_id=F("winner_id")).order_by("round__number", "id")
+
+    advanced, matches_created, complete = False, 0, False
+    for match in pending:
+        match_advanced, created, match_complete = advance_winner(match)
+        advanced = advanced or match_advanced
+        matches_created += created
+        complete = complete or match_complete
+    return advanced, matches_created, complete
+
+
+def _advance_current_round(tournament, round_number):
+    """Keep current_round_number at the latest round with matches in play."""
+    if Tournament.objects.filter(id=tournament.id, current_round_number__lt=round_number).update(current_round_number=round_number):
+        invalidate_models(Tournament)
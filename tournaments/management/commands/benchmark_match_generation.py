@@ -0,0 +1,110 @@
+import contextlib
+import io
+import random
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from courts.models import Court
+from matches.models import Match
+from teams.models import Team
+from tournaments.models import Tournament, TournamentTeam, TournamentCourt, Round
+
+
+class Command(BaseCommand):
+    help = 'Compare per-row and bulk round-robin match generation on synthetic tournaments (all data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[16, 64, 128],
+            help='Team counts to benchmark',
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for team PINs')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        rows = []
+
+        with transaction.atomic():
+            used_pins = set(Team.objects.values_list('pin', flat=True))
+            court = Court.objects.order_by('id').first() or Court.objects.create(number=9999)
+            for size in options['sizes']:
+                legacy = self.create_tournament(size, rng, used_pins, court, 'per-row')
+                legacy_queries, legacy_time, legacy_count = self.measure(lambda: self.legacy_round_robin(legacy))
+
+                bulk = self.create_tournament(size, rng, used_pins, court, 'bulk')
+                bulk_queries, bulk_time, bulk_count = self.measure(bulk.generate_matches)
+
+                rows.append((size, legacy_count, legacy_queries, legacy_time, bulk_count, bulk_queries, bulk_time))
+
+            # Never keep the synthetic data
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{'teams':>6} {'matches':>8} {'old queries':>12} {'old ms':>9} {'new queries':>12} {'new ms':>9}")
+        for size, legacy_count, legacy_queries, legacy_time, bulk_count, bulk_queries, bulk_time in rows:
+            if legacy_count != bulk_count:
+                self.stdout.write(self.style.ERROR(f'{size} teams: old path created {legacy_count} matches, new path {bulk_count}'))
+            self.stdout.write(
+                f"{size:>6} {bulk_count:>8} {legacy_queries:>12} {legacy_time * 1000:>9.1f} {bulk_queries:>12} {bulk_time * 1000:>9.1f}"
+            )
+
+    def measure(self, generate):
+        """Run a generator with its print output suppressed; return (queries, seconds, result)."""
+        # The query log is a bounded deque; start empty so large runs are counted correctly
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as queries, contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = generate()
+            elapsed = time.perf_counter() - start
+        return len(queries), elapsed, result
+
+    def legacy_round_robin(self, tournament):
+        """The previous generation path: one Match.objects.create (and print) per pairing."""
+        teams = list(tournament.tournamentteam_set.filter(is_active=True).select_related('team'))
+        round_obj, created = Round.objects.get_or_create(
+            tournament=tournament,
+            number=1,
+            defaults={'name': 'Round 1', 'stage': None, 'number_in_stage': 1},
+        )
+        matches_created = 0
+        for i in range(len(teams)):
+            for j in range(i + 1, len(teams)):
+                Match.objects.create(
+                    tournament=tournament,
+                    round=round_obj,
+                    team1=teams[i].team,
+                    team2=teams[j].team,
+                    status='pending',
+                )
+                matches_created += 1
+                print(f"  Created match: {teams[i].team} vs {teams[j].team}")
+        return matches_created
+
+    def create_tournament(self, size, rng, used_pins, court, label):
+        """Create a round-robin tournament with `size` active teams and one court."""
+        now = timezone.now()
+        tournament = Tournament.objects.create(
+            name=f'Benchmark {label} {size} teams',
+            format='round_robin',
+            play_format='triplets',
+            has_triplets=True,
+            start_date=now,
+            end_date=now + timedelta(days=1),
+        )
+
+        teams = []
+        for i in range(size):
+            pin = f'{rng.randrange(1000000):06d}'
+            while pin in used_pins:
+                pin = f'{rng.randrange(1000000):06d}'
+            used_pins.add(pin)
+            teams.append(Team(name=f'Benchmark {label} {size}-{i + 1}', pin=pin))
+        teams = Team.objects.bulk_create(teams)
+        TournamentTeam.objects.bulk_create([TournamentTeam(tournament=tournament, team=team) for team in teams])
+        TournamentCourt.objects.create(tournament=tournament, court=court)
+        return tournament
@@ -0,0 +1,89 @@
+import random
+import time
+from collections import defaultdict
+from django.core.management.base import BaseCommand
+from tournaments.swiss_pairing import pair_round, BYE_POINTS
+
+
+class Command(BaseCommand):
+    help = 'Simulate Swiss tournaments and compare the pairing engine with the old greedy pairing (no database access)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[32, 64, 128, 256, 512],
+            help='Team counts to benchmark',
+        )
+        parser.add_argument('--rounds', type=int, default=7, help='Rounds per simulated tournament')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for results')
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'teams':>6} {'rounds':>7} {'engine ms/round':>16} {'rematches':>10} "
+            f"{'greedy dead ends':>17} {'greedy queries':>15}"
+        )
+        for size in options['sizes']:
+            rng = random.Random(options['seed'])
+            strength = {team_id: rng.random() for team_id in range(1, size + 1)}
+            points = dict.fromkeys(strength, 0)
+            history = defaultdict(set)
+            had_bye = set()
+            elapsed = 0.0
+            rematches = dead_ends = greedy_queries = 0
+
+            for round_number in range(options['rounds']):
+                standings = sorted(points.items(), key=lambda item: (-item[1], item[0]))
+
+                # The old generator checked opponents_played once per candidate pair
+                paired, checks = self.greedy_pairing(standings, history, had_bye)
+                greedy_queries += checks
+                dead_ends += not paired
+
+                started = time.perf_counter()
+                pairs, bye, round_rematches = pair_round(standings, history, had_bye)
+                elapsed += time.perf_counter() - started
+                rematches += round_rematches
+
+                if bye is not None:
+                    had_bye.add(bye)
+                    points[bye] += BYE_POINTS
+                for team1_id, team2_id in pairs:
+                    history[team1_id].add(team2_id)
+                    history[team2_id].add(team1_id)
+                    # Stronger teams usually win
+                    chance = strength[team1_id] / (strength[team1_id] + strength[team2_id])
+                    points[team1_id if rng.random() < chance else team2_id] += 3
+
+            self.stdout.write(
+                f"{size:>6} {options['rounds']:>7} {elapsed * 1000 / options['rounds']:>16.2f} {rematches:>10} "
+                f"{dead_ends:>17} {greedy_queries:>15}"
+            )
+
+        self.stdout.write(self.style.SUCCESS('Done. Dead ends are rounds the old greedy pairing would have aborted.'))
+
+    def greedy_pairing(self, standings, history, had_bye):
+        """The pre-engine algorithm: first unplayed opponent down the standings, abort on a dead end."""
+        teams = [team_id for team_id, points in standings]
+        if len(teams) % 2:
+            candidates = [team_id for team_id in reversed(teams) if team_id not in had_bye]
+            if not candidates:
+                return False, 0
+            teams.remove(candidates[0])
+
+        checks = 0
+        paired = set()
+        for i, team in enumerate(teams):
+            if team in paired:
+                continue
+            for opponent in teams[i + 1:]:
+                if opponent in paired:
+                    continue
+                checks += 1
+                if opponent not in history[team]:
+                    paired.update((team, opponent))
+                    break
+            else:
+                return False, checks
+        return True, checks
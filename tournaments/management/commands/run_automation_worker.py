@@ -0,0 +1,57 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from tournaments.automation_queue import (
+    claim_next_job, run_job, requeue_stale_jobs, default_worker_name,
+)
+
+
+class Command(BaseCommand):
+    help = 'Process queued tournament automation jobs (round completion checks and round generation)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process all due jobs and exit instead of polling',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between polls when the queue is empty (default: 2)',
+        )
+        parser.add_argument(
+            '--max-jobs',
+            type=int,
+            help='Exit after processing this many jobs',
+        )
+
+    def handle(self, *args, **options):
+        worker_name = default_worker_name()
+        processed = 0
+        failed = 0
+        self.stdout.write(f'Automation worker {worker_name} started')
+
+        try:
+            while options['max_jobs'] is None or processed < options['max_jobs']:
+                close_old_connections()
+                requeue_stale_jobs()
+
+                job = claim_next_job(worker_name)
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                if run_job(job):
+                    self.stdout.write(f'Job {job.id}: checked tournament {job.tournament.name}')
+                else:
+                    failed += 1
+                    self.stdout.write(self.style.WARNING(f'Job {job.id}: failed for tournament {job.tournament.name} (attempt {job.attempts}/{job.max_attempts})'))
+                processed += 1
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping automation worker')
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} automation jobs ({failed} failed).'))
@@ -0,0 +1,87 @@
+# match_generation.py - bulk creation helpers for tournament match generation
+
+import logging
+from django.db import transaction
+from matches.models import Match
+from matches.signals import matches_bulk_created
+from .models import Round, Bracket
+
+logger = logging.getLogger("tournaments")
+
+BULK_BATCH_SIZE = 500
+
+
+def new_match(tournament, team1, team2, round_obj=None, stage=None, bracket=None):
+    """Build an unsaved pending Match for bulk_create_matches."""
+    return Match(
+        tournament=tournament,
+        stage=stage,
+        round=round_obj,
+        bracket=bracket,
+        team1=team1,
+        team2=team2,
+        status="pending",
+    )
+
+
+def bulk_create_matches(matches):
+    """
+    Insert matches with one bulk_create inside a transaction.
+
+    bulk_create does not send post_save, so matches_bulk_created is sent once
+    for the whole batch; receivers that act on completed matches (leaderboards,
+    player statistics, round checks) handle it there.
+
+    Returns:
+        list: the created matches
+    """
+    if not matches:
+        return []
+    with transaction.atomic():
+        created = Match.objects.bulk_create(matches, batch_size=BULK_BATCH_SIZE)
+        matches_bulk_created.send(sender=Match, matches=created)
+    logger.info(f"Bulk created {len(created)} matches")
+    return created
+
+
+def ensure_rounds(tournament, numbers, stage=None):
+    """
+    Return {number: Round} for the given round numbers, creating missing rounds in bulk.
+
+    Round.save() is bypassed by bulk_create, so the default name is set here.
+    """
+    numbers = sorted(set(numbers))
+    existing = set(Round.objects.filter(tournament=tournament, number__in=numbers).values_list("number", flat=True))
+    missing = [
+        Round(tournament=tournament, stage=stage, number=number, number_in_stage=number, name=f"Round {number}")
+        for number in numbers if number not in existing
+    ]
+    if missing:
+        Round.objects.bulk_create(missing)
+    # Re-read so primary keys are available on every backend
+    return {round_obj.number: round_obj for round_obj in Round.objects.filter(tournament=tournament, number__in=numbers)}
+
+
+def ensure_brackets(tournament, rounds_by_number, keys):
+    """
+    Return {(round_number, position): Bracket}, creating missing brackets in bulk.
+
+    Args:
+        rounds_by_number: {number: Round} as returned by ensure_rounds
+        keys: iterable of (round_number, position)
+    """
+    keys = set(keys)
+    round_ids = {rounds_by_number[number].id: number for number, position in keys}
+    brackets = Bracket.objects.filter(tournament=tournament, round_id__in=round_ids)
+    existing = {(round_ids[b.round_id], b.position) for b in brackets}
+    missing = [
+        Bracket(tournament=tournament, round=rounds_by_number[number], position=position)
+        for number, position in sorted(keys - existing)
+    ]
+    if missing:
+        Bracket.objects.bulk_create(missing)
+    return {
+        (round_ids[b.round_id], b.position): b
+        for b in Bracket.objects.filter(tournament=tournament, round_id__in=round_ids)
+        if (round_ids[b.round_id], b.position) in keys
+    }
@@ -0,0 +1,43 @@
+# Generated by Django 5.2 on 2026-10-17 02:31
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0006_alter_bracket_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tournament',
+            name='automation_status',
+            field=models.CharField(choices=[('idle', 'Idle'), ('queued', 'Queued'), ('processing', 'Processing'), ('error', 'Error'), ('completed', 'Completed')], default='idle', help_text='Status of the automated round generation', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='AutomationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_type', models.CharField(choices=[('check_round_completion', 'Check Round Completion')], default='check_round_completion', max_length=50)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('max_attempts', models.PositiveIntegerField(default=3)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, help_text='Earliest time the job may run (used for retry backoff)')),
+                ('requested_count', models.PositiveIntegerField(default=1, help_text='Number of triggers collapsed into this job')),
+                ('last_error', models.TextField(blank=True)),
+                ('worker', models.CharField(blank=True, help_text='Identifier of the worker running the job', max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('tournament', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='automation_jobs', to='tournaments.tournament')),
+            ],
+            options={
+                'ordering': ['run_after', 'id'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='tournaments_job_queue_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('tournament', 'job_type'), name='tournaments_unique_pending_job')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-17 02:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0007_automationjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournamentteam',
+            name='median_buchholz',
+            field=models.FloatField(default=0.0, help_text='Buchholz without the best and worst opponent (Median-Buchholz tie-breaker)'),
+        ),
+        migrations.AddField(
+            model_name='tournamentteam',
+            name='sonneborn_berger',
+            field=models.FloatField(default=0.0, help_text='Points of beaten opponents plus half of drawn opponents (Sonneborn-Berger tie-breaker)'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-17 02:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0007_playerstatistics'),
+        ('tournaments', '0008_tournamentteam_swiss_tiebreaks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bracket',
+            name='team1',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='brackets_as_team1', to='teams.team'),
+        ),
+        migrations.AddField(
+            model_name='bracket',
+            name='team2',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='brackets_as_team2', to='teams.team'),
+        ),
+        migrations.AddField(
+            model_name='bracket',
+            name='winner',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='won_brackets', to='teams.team'),
+        ),
+    ]
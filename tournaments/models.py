@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from teams.models import Team
 from courts.models import Court
 import math
@@ -23,10 +24,14 @@ class Tournament(models.Model):
 
     AUTOMATION_STATUS_CHOICES = [
         ("idle", "Idle"),
+        ("queued", "Queued"),
         ("processing", "Processing"),
         ("error", "Error"),
         ("completed", "Completed"),
     ]
+
+    # Statuses in which automation may start (a queued check is not running yet)
+    AUTOMATION_READY_STATUSES = ("idle", "queued")
     
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True, null=True)
@@ -88,6 +93,7 @@ class Tournament(models.Model):
     def generate_matches(self):
         """Generate matches for the tournament (first stage or single stage)."""
         from matches.models import Match # Import locally
+        from .match_generation import new_match, bulk_create_matches
         import random
         import math
         
@@ -114,87 +120,62 @@ class Tournament(models.Model):
         
         print(f"Generating matches for single-stage tournament {self.name} (Format: {self.format})")
         
-        # Create or get the round for single-stage tournaments
-        round_obj, created = Round.objects.get_or_create(
-            tournament=self,
-            number=1,
-            defaults={
-                'name': 'Round 1',
-                'stage': None,  # Single-stage tournaments don't have stages
-                'number_in_stage': 1
-            }
-        )
-        
-        if created:
-            print(f"Created round: {round_obj}")
-        else:
-            print(f"Using existing round: {round_obj}")
-            # Clear existing matches for this round if regenerating
-            Match.objects.filter(tournament=self, round=round_obj).delete()
-
-        matches_created = 0
-        
-        if self.format == "round_robin":
-            # Round-robin: each team plays against every other team once
-            for i in range(len(teams)):
-                for j in range(i + 1, len(teams)):
-                    match = Match.objects.create(
-                        tournament=self,
-                        round=round_obj,
-                        team1=teams[i].team,
-                        team2=teams[j].team,
-                        status="pending"
-                    )
-                    matches_created += 1
-                    print(f"  Created match: {teams[i].team} vs {teams[j].team}")
-                    
-        elif self.format == "knockout":
-            # Knockout: create brackets and matches for first round
-            random.shuffle(teams)
-            num_teams = len(teams)
+        # Build every match in memory and write them with one bulk insert
+        with transaction.atomic():
+            # Create or get the round for single-stage tournaments
+            round_obj, created = Round.objects.get_or_create(
+                tournament=self,
+                number=1,
+                defaults={
+                    'name': 'Round 1',
+                    'stage': None,  # Single-stage tournaments don't have stages
+                    'number_in_stage': 1
+                }
+            )
             
-            # Pair teams for first round
-            for i in range(0, len(teams) - 1, 2):
-                match = Match.objects.create(
-                    tournament=self,
-                    round=round_obj,
-                    team1=teams[i].team,
-                    team2=teams[i + 1].team,
-                    status="pending"
-                )
-                matches_created += 1
-                print(f"  Created match: {teams[i].team} vs {teams[i + 1].team}")
-                
-            # Handle odd number of teams (bye to next round)
-            if len(teams) % 2 == 1:
-                bye_team = teams[-1]
-                print(f"  {bye_team.team} advances with a bye")
-                
-        elif self.format == "swiss":
-            # Swiss system: pair teams randomly for first round
-            teams_copy = teams.copy()
-            random.shuffle(teams_copy)
+            if created:
+                print(f"Created round: {round_obj}")
+            else:
+                print(f"Using existing round: {round_obj}")
+                # Clear existing matches for this round if regenerating
+                Match.objects.filter(tournament=self, round=round_obj).delete()
+
+            matches = []
+            matches_created = 0
             
-            for i in range(0, len(teams_copy) - 1, 2):
-                match = Match.objects.create(
-                    tournament=self,
-                    round=round_obj,
-                    team1=teams_copy[i].team,
-                    team2=teams_copy[i + 1].team,
-                    status="pending"
-                )
-                matches_created += 1
-                print(f"  Created match: {teams_copy[i].team} vs {teams_copy[i + 1].team}")
+            if self.format == "round_robin":
+                # Round-robin: each team plays against every other team once
+                for i in range(len(teams)):
+                    for j in range(i + 1, len(teams)):
+                        matches.append(new_match(self, teams[i].team, teams[j].team, round_obj=round_obj))
+                        
+            elif self.format == "knockout":
+                # Knockout: build the whole seeded bracket tree; byes are resolved up front
+                from .knockout_bracket import build_bracket
+                matches_created = len(build_bracket(self, teams))
+                self.refresh_from_db(fields=["current_round_number"])
+                    
+            elif self.format == "swiss":
+                # Swiss system: pair teams randomly for first round
+                teams_copy = teams.copy()
+                random.shuffle(teams_copy)
                 
-            # Handle odd number of teams (bye)
-            if len(teams_copy) % 2 == 1:
-                bye_team = teams_copy[-1]
-                bye_team.received_bye_in_round = 1
-                bye_team.save()
-                print(f"  {bye_team.team} receives a bye")
-        else:
-            print(f"Error: Unknown tournament format '{self.format}'")
-            return 0
+                for i in range(0, len(teams_copy) - 1, 2):
+                    matches.append(new_match(self, teams_copy[i].team, teams_copy[i + 1].team, round_obj=round_obj))
+                    
+                # Handle odd number of teams (bye)
+                if len(teams_copy) % 2 == 1:
+                    bye_team = teams_copy[-1]
+                    bye_team.received_bye_in_round = 1
+                    bye_team.save()
+                    print(f"  {bye_team.team} receives a bye")
+                # Later rounds are paired by the automation worker, which tracks the round by number
+                self.current_round_number = 1
+            else:
+                print(f"Error: Unknown tournament format '{self.format}'")
+                return 0
+
+            matches_created += len(bulk_create_matches(matches))
             
         print(f"Created {matches_created} matches for {self.name}")
         
@@ -213,7 +194,7 @@ class Tournament(models.Model):
         if self.format != "multi_stage":
             return False, 0, False
             
-        if self.automation_status != "idle":
+        if self.automation_status not in self.AUTOMATION_READY_STATUSES:
             print(f"Tournament {self.name} automation is not idle (status: {self.automation_status})")
             return False, 0, False
             
@@ -308,36 +289,36 @@ class Tournament(models.Model):
         )
         
         # Create matches between winners
-        matches_created = 0
+        from .match_generation import new_match, bulk_create_matches
+        matches = []
         for i in range(0, len(winners), 2):
             if i + 1 < len(winners):
-                team1 = winners[i]
-                team2 = winners[i + 1]
-                
-                from matches.models import Match
-                match = Match.objects.create(
-                    tournament=self,
-                    stage=new_stage,
-                    team1=team1,
-                    team2=team2,
-                    status="pending"
-                )
-                matches_created += 1
+                matches.append(new_match(self, winners[i], winners[i + 1], stage=new_stage))
                 
-        return matches_created
+        return len(bulk_create_matches(matches))
 
     # === KNOCKOUT TOURNAMENT AUTOMATION ===
     
-    def check_and_advance_knockout_round(self):
+    def check_and_advance_knockout_round(self, match=None):
         """
         Check if current knockout round is complete and advance to next round.
         This method is safe to call multiple times - it only acts when needed.
+
+        Tournaments drawn on a bracket tree advance per match instead: the
+        winner of ``match`` moves straight into the next bracket (without a
+        match, any completed bracket match that has not advanced yet is caught up).
         Returns: (advanced: bool, matches_created: int, tournament_complete: bool)
         """
         if self.format != "knockout":
             return False, 0, False
+
+        from .knockout_bracket import uses_bracket_engine, advance_winner, sync_bracket
+        if uses_bracket_engine(self):
+            if match is not None and match.bracket_id:
+                return advance_winner(match)
+            return sync_bracket(self)
             
-        if self.automation_status != "idle":
+        if self.automation_status not in self.AUTOMATION_READY_STATUSES:
             print(f"Tournament {self.name} automation is not idle (status: {self.automation_status})")
             return False, 0, False
             
@@ -421,7 +402,7 @@ class Tournament(models.Model):
     
     def _create_next_knockout_round(self, winners):
         """Create the next knockout round with the given winners."""
-        from matches.models import Match
+        from .match_generation import new_match, bulk_create_matches
         
         current_round = self._get_current_knockout_round()
         next_round_number = current_round.number + 1
@@ -443,20 +424,14 @@ class Tournament(models.Model):
             )
         
         # Create matches for next round
-        matches_created = 0
         random.shuffle(winners)  # Randomize pairings
         
-        for i in range(0, len(winners) - 1, 2):
-            match = Match.objects.create(
-                tournament=self,
-                stage=next_round.stage if next_round.stage else None,
-                round=next_round,
-                team1=winners[i],
-                team2=winners[i + 1],
-                status="pending"
-            )
-            matches_created += 1
-            print(f"  Created next round match: {winners[i].name} vs {winners[i + 1].name}")
+        matches = [
+            new_match(self, winners[i], winners[i + 1], round_obj=next_round, stage=next_round.stage)
+            for i in range(0, len(winners) - 1, 2)
+        ]
+        matches_created = len(bulk_create_matches(matches))
+        print(f"  Created {matches_created} next round matches")
         
         # Handle odd number of winners (bye)
         if len(winners) % 2 == 1:
@@ -476,7 +451,7 @@ class Tournament(models.Model):
         print(f"Tournament {self.name} completed! Champion: {champion.name}")
         # You could add a champion field to Tournament model if needed
         # self.champion = champion
-        self.current_round_number = -1  # Special value indicating completion
+        self.current_round_number = None  # No round left to play
         # Could also set is_active = False if desired
 
 
@@ -491,6 +466,8 @@ class TournamentTeam(models.Model):
     # Swiss System specific fields
     swiss_points = models.IntegerField(default=0, help_text="Points accumulated in Swiss format")
     buchholz_score = models.FloatField(default=0.0, help_text="Sum of opponents scores (Buchholz tie-breaker)")
+    median_buchholz = models.FloatField(default=0.0, help_text="Buchholz without the best and worst opponent (Median-Buchholz tie-breaker)")
+    sonneborn_berger = models.FloatField(default=0.0, help_text="Points of beaten opponents plus half of drawn opponents (Sonneborn-Berger tie-breaker)")
     opponents_played = models.ManyToManyField(Team, related_name="played_against_in_tournament", blank=True)
     received_bye_in_round = models.PositiveIntegerField(null=True, blank=True, help_text="Round number in which the team received a bye")
     # Add other format-specific fields as needed (e.g., group_id for poules)
@@ -505,52 +482,10 @@ class TournamentTeam(models.Model):
         return f"{self.team.name} in {self.tournament.name}"
 
     def update_swiss_stats(self):
-        """Recalculates Swiss points and Buchholz score based on completed matches."""
-        from matches.models import Match # Import locally
-        
-        points = 0
-        opp_scores_sum = 0
-        opponents = self.opponents_played.all()
-
-        # Points from matches
-        matches_as_team1 = Match.objects.filter(tournament=self.tournament, team1=self.team, status="completed")
-        matches_as_team2 = Match.objects.filter(tournament=self.tournament, team2=self.team, status="completed")
-        
-        for match in matches_as_team1:
-            if match.winner == self.team:
-                points += 3
-            elif match.is_draw:
-                points += 1
-            # Add opponent's score for Buchholz
-            if match.team2:
-                 opponent_tt = TournamentTeam.objects.filter(tournament=self.tournament, team=match.team2).first()
-                 if opponent_tt: opp_scores_sum += opponent_tt.swiss_points
-
-        for match in matches_as_team2:
-            if match.winner == self.team:
-                points += 3
-            elif match.is_draw:
-                points += 1
-            # Add opponent's score for Buchholz
-            if match.team1:
-                 opponent_tt = TournamentTeam.objects.filter(tournament=self.tournament, team=match.team1).first()
-                 if opponent_tt: opp_scores_sum += opponent_tt.swiss_points
-
-        # Points from byes
-        if self.received_bye_in_round is not None:
-            points += 3 # Add points for the bye received
-            # How to handle Buchholz for a bye? Often counts as playing against oneself or a fixed value.
-            # Simple approach: Add own score to Buchholz sum if bye received.
-            # opp_scores_sum += points # Or maybe self.swiss_points before recalculation?
-            # Let's refine Buchholz later if needed.
-
-        self.swiss_points = points
-        # Buchholz needs careful calculation - requires opponent scores *after* they are updated.
-        # It's better calculated globally after all points are updated for the round.
-        # self.buchholz_score = opp_scores_sum # Temporarily store sum, recalculate globally later.
-        self.save()
-
-    # We might need a separate task/function to calculate Buchholz globally after all points are updated.
+        """Recalculates Swiss points and tie-breakers; done for the whole tournament at once."""
+        from .swiss_standings import update_swiss_standings
+        update_swiss_standings(self.tournament)
+        self.refresh_from_db(fields=["swiss_points", "buchholz_score", "median_buchholz", "sonneborn_berger"])
 
 # --- Tournament Court Model --- 
 class TournamentCourt(models.Model):
@@ -623,37 +558,39 @@ class Stage(models.Model):
             print(f"Error: No courts assigned to tournament {self.tournament.name}")
             return 0
             
-        # Get or create the round for this stage
-        round_obj, created = Round.objects.get_or_create(
-            tournament=self.tournament,
-            stage=self,
-            number_in_stage=1,
-            defaults={
-                'number': self._get_next_round_number(),
-                'name': f"Round 1"
-            }
-        )
+        # Round, cleanup and match inserts succeed or fail together
+        with transaction.atomic():
+            # Get or create the round for this stage
+            round_obj, created = Round.objects.get_or_create(
+                tournament=self.tournament,
+                stage=self,
+                number_in_stage=1,
+                defaults={
+                    'number': self._get_next_round_number(),
+                    'name': f"Round 1"
+                }
+            )
         
-        if created:
-            print(f"Created round: {round_obj}")
-        else:
-            print(f"Using existing round: {round_obj}")
-            # Clear existing matches for this round if regenerating
-            Match.objects.filter(tournament=self.tournament, round=round_obj).delete()
-        
-        # Generate matches based on stage format and return match count
-        matches_created = 0
-        if self.format == "round_robin":
-            matches_created = self._generate_round_robin_matches(teams, round_obj)
-        elif self.format == "swiss":
-            matches_created = self._generate_swiss_matches(teams, round_obj)
-        elif self.format == "knockout":
-            matches_created = self._generate_knockout_matches(teams, round_obj)
-        elif self.format == "poule":
-            matches_created = self._generate_poule_matches(teams, round_obj)
-        else:
-            print(f"Error: Unknown stage format '{self.format}'")
-            return 0
+            if created:
+                print(f"Created round: {round_obj}")
+            else:
+                print(f"Using existing round: {round_obj}")
+                # Clear existing matches for this round if regenerating
+                Match.objects.filter(tournament=self.tournament, round=round_obj).delete()
+        
+            # Generate matches based on stage format and return match count
+            matches_created = 0
+            if self.format == "round_robin":
+                matches_created = self._generate_round_robin_matches(teams, round_obj)
+            elif self.format == "swiss":
+                matches_created = self._generate_swiss_matches(teams, round_obj)
+            elif self.format == "knockout":
+                matches_created = self._generate_knockout_matches(teams, round_obj)
+            elif self.format == "poule":
+                matches_created = self._generate_poule_matches(teams, round_obj)
+            else:
+                print(f"Error: Unknown stage format '{self.format}'")
+                return 0
             
         print(f"Created {matches_created} matches for {self}")
         return matches_created
@@ -665,29 +602,22 @@ class Stage(models.Model):
         
     def _generate_round_robin_matches(self, teams, round_obj):
         """Generate round-robin matches where each team plays every other team."""
-        from matches.models import Match
+        from .match_generation import new_match, bulk_create_matches
         
         print(f"Generating round-robin matches for {len(teams)} teams")
-        matches_created = 0
-        
-        for i in range(len(teams)):
-            for j in range(i + 1, len(teams)):
-                match = Match.objects.create(
-                    tournament=self.tournament,
-                    round=round_obj,
-                    team1=teams[i].team,
-                    team2=teams[j].team,
-                    status="pending"
-                )
-                matches_created += 1
-                print(f"  Created match: {teams[i].team} vs {teams[j].team}")
+        matches = [
+            new_match(self.tournament, teams[i].team, teams[j].team, round_obj=round_obj)
+            for i in range(len(teams))
+            for j in range(i + 1, len(teams))
+        ]
+        matches_created = len(bulk_create_matches(matches))
                 
         print(f"Created {matches_created} round-robin matches")
         return matches_created
         
     def _generate_swiss_matches(self, teams, round_obj):
         """Generate Swiss system matches for the first round."""
-        from matches.models import Match
+        from .match_generation import new_match, bulk_create_matches
         
         print(f"Generating Swiss matches for {len(teams)} teams")
         
@@ -695,17 +625,11 @@ class Stage(models.Model):
         teams_copy = teams.copy()
         random.shuffle(teams_copy)  # Random pairing for first round
         
-        matches_created = 0
-        for i in range(0, len(teams_copy) - 1, 2):
-            match = Match.objects.create(
-                tournament=self.tournament,
-                round=round_obj,
-                team1=teams_copy[i].team,
-                team2=teams_copy[i + 1].team,
-                status="pending"
-            )
-            matches_created += 1
-            print(f"  Created match: {teams_copy[i].team} vs {teams_copy[i + 1].team}")
+        matches = [
+            new_match(self.tournament, teams_copy[i].team, teams_copy[i + 1].team, round_obj=round_obj)
+            for i in range(0, len(teams_copy) - 1, 2)
+        ]
+        matches_created = len(bulk_create_matches(matches))
             
         # Handle odd number of teams (bye)
         if len(teams_copy) % 2 == 1:
@@ -719,7 +643,7 @@ class Stage(models.Model):
         
     def _generate_knockout_matches(self, teams, round_obj):
         """Generate knockout matches with proper bracket structure."""
-        from matches.models import Match
+        from .match_generation import new_match, bulk_create_matches
         
         print(f"Generating knockout matches for {len(teams)} teams")
         
@@ -727,18 +651,12 @@ class Stage(models.Model):
         teams_copy = teams.copy()
         random.shuffle(teams_copy)
         
-        matches_created = 0
         # Pair teams for first round
-        for i in range(0, len(teams_copy) - 1, 2):
-            match = Match.objects.create(
-                tournament=self.tournament,
-                round=round_obj,
-                team1=teams_copy[i].team,
-                team2=teams_copy[i + 1].team,
-                status="pending"
-            )
-            matches_created += 1
-            print(f"  Created match: {teams_copy[i].team} vs {teams_copy[i + 1].team}")
+        matches = [
+            new_match(self.tournament, teams_copy[i].team, teams_copy[i + 1].team, round_obj=round_obj)
+            for i in range(0, len(teams_copy) - 1, 2)
+        ]
+        matches_created = len(bulk_create_matches(matches))
             
         # Handle odd number of teams (bye to next round)
         if len(teams_copy) % 2 == 1:
@@ -785,6 +703,10 @@ class Bracket(models.Model):
     position = models.PositiveIntegerField(help_text="Position in the bracket (e.g., 1, 2, 3...)")
     name = models.CharField(max_length=100, blank=True)
     parent_bracket = models.ForeignKey("self", related_name="child_brackets", on_delete=models.SET_NULL, null=True, blank=True)
+    # Teams that have reached this bracket (seeded, advanced from a child bracket or through a bye)
+    team1 = models.ForeignKey(Team, related_name="brackets_as_team1", on_delete=models.SET_NULL, null=True, blank=True)
+    team2 = models.ForeignKey(Team, related_name="brackets_as_team2", on_delete=models.SET_NULL, null=True, blank=True)
+    winner = models.ForeignKey(Team, related_name="won_brackets", on_delete=models.SET_NULL, null=True, blank=True)
     
     class Meta:
         unique_together = ("tournament", "round", "position")
@@ -792,3 +714,53 @@ class Bracket(models.Model):
         
     def __str__(self):
         return f"Bracket {self.position} - Round {self.round.number} ({self.tournament.name})"
+
+
+class AutomationJob(models.Model):
+    """
+    Database-backed queue entry for tournament automation.
+
+    Match completions enqueue a job instead of generating rounds inside the
+    request; the run_automation_worker command processes them. At most one
+    pending job exists per tournament and job type, so a burst of completions
+    in the same round collapses into a single check.
+    """
+    JOB_TYPES = [
+        ("check_round_completion", "Check Round Completion"),
+    ]
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("succeeded", "Succeeded"),
+        ("failed", "Failed"),
+    ]
+
+    tournament = models.ForeignKey(Tournament, related_name="automation_jobs", on_delete=models.CASCADE)
+    job_type = models.CharField(max_length=50, choices=JOB_TYPES, default="check_round_completion")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now, help_text="Earliest time the job may run (used for retry backoff)")
+    requested_count = models.PositiveIntegerField(default=1, help_text="Number of triggers collapsed into this job")
+    last_error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True, help_text="Identifier of the worker running the job")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["run_after", "id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tournament", "job_type"],
+                condition=models.Q(status="pending"),
+                name="tournaments_unique_pending_job",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="tournaments_job_queue_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_job_type_display()} for {self.tournament.name} ({self.status})"
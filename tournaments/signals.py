@@ -4,7 +4,8 @@ import logging
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from matches.models import Match
-from .tasks import check_round_completion
+from matches.signals import matches_bulk_created
+from .automation_queue import enqueue_round_check
 
 logger = logging.getLogger("tournaments")
 
@@ -16,12 +17,22 @@ def handle_match_completion(sender, instance, created, update_fields=None, **kwa
     status_updated = update_fields is None or "status" in update_fields
     
     if status_updated and instance.status == "completed":
-        logger.info(f"Match {instance.id} completed for tournament {instance.tournament_id}. Triggering round completion check.")
+        logger.info(f"Match {instance.id} completed for tournament {instance.tournament_id}. Queueing round completion check.")
         try:
-            # Ideally, run this asynchronously in a real-world scenario (e.g., using Celery)
-            # For simplicity here, we call it directly.
-            check_round_completion(instance.tournament_id)
+            # Round generation runs in the automation worker, not in this request
+            enqueue_round_check(instance.tournament_id)
         except Exception as e:
             # Log error but don't crash the save operation
-            logger.exception(f"Error triggering check_round_completion for tournament {instance.tournament_id} after match {instance.id} completion: {e}")
+            logger.exception(f"Error queueing round completion check for tournament {instance.tournament_id} after match {instance.id} completion: {e}")
+
+
+@receiver(matches_bulk_created, sender=Match)
+def handle_bulk_match_creation(sender, matches, **kwargs):
+    """Queue one round check per tournament when a bulk insert contains completed matches."""
+    tournament_ids = {match.tournament_id for match in matches if match.status == "completed"}
+    for tournament_id in tournament_ids:
+        try:
+            enqueue_round_check(tournament_id)
+        except Exception as e:
+            logger.exception(f"Error queueing round completion check for tournament {tournament_id} after bulk match creation: {e}")
 
@@ -0,0 +1,160 @@
+# swiss_pairing.py - Swiss system pairing engine
+
+"""
+Pairs a Swiss round in memory.
+
+Opponent history for the whole tournament is loaded with one query and kept as
+one bitset (a Python int) per team, so "have these two met?" is a bit test
+instead of a query. Teams are paired inside their score group, top half
+against bottom half; an odd team floats down to the next group. When a choice
+leaves some team without a legal opponent the search backtracks. If no
+rematch-free round is found (none exists, or the search used up
+SEARCH_BUDGET steps), the round is paired in one greedy pass that allows
+rematches but still takes an unmet opponent whenever one is left; it does not
+search for the fewest rematches.
+"""
+
+import logging
+from collections import defaultdict
+from matches.models import Match
+
+logger = logging.getLogger("tournaments")
+
+# Search steps tried for a rematch-free round before allowing rematches
+SEARCH_BUDGET = 50000
+
+BYE_POINTS = 3
+
+
+def load_opponent_history(tournament):
+    """
+    Opponents every team has already been drawn against in the tournament.
+
+    Returns:
+        dict: team_id -> set of opponent team ids
+    """
+    history = defaultdict(set)
+    pairs = Match.objects.filter(tournament=tournament).exclude(status="cancelled").values_list("team1_id", "team2_id")
+    for team1_id, team2_id in pairs:
+        history[team1_id].add(team2_id)
+        history[team2_id].add(team1_id)
+    return history
+
+
+def pair_round(standings, history, had_bye=()):
+    """
+    Pair one Swiss round.
+
+    Args:
+        standings: list of (team_id, points), best ranked first
+        history: dict team_id -> set of opponents already met
+        had_bye: team ids that already sat out a round
+
+    Returns:
+        (pairs, bye_team_id, rematches): (team1_id, team2_id) tuples in board
+        order with the better ranked team first, the team that sits out (None
+        for an even field) and the number of pairs that are rematches
+    """
+    team_ids = [team_id for team_id, points in standings]
+    n = len(team_ids)
+    if n < 2:
+        return [], team_ids[0] if team_ids else None, 0
+
+    rank = {team_id: i for i, team_id in enumerate(team_ids)}
+    played = [0] * n
+    for i, team_id in enumerate(team_ids):
+        for opponent_id in history.get(team_id, ()):
+            j = rank.get(opponent_id)
+            if j is not None:
+                played[i] |= 1 << j
+
+    # Score groups are contiguous in the standings; group_end[i] is one past i's group
+    group_end = [n] * n
+    for i in range(n - 2, -1, -1):
+        group_end[i] = i + 1 if standings[i][1] != standings[i + 1][1] else group_end[i + 1]
+
+    # The bye goes to the lowest ranked team that has not had one yet
+    everyone = (1 << n) - 1
+    if n % 2 == 0:
+        bye_choices = [None]
+    else:
+        bye_choices = [i for i in range(n - 1, -1, -1) if team_ids[i] not in had_bye] or [n - 1]
+
+    pairing, bye = None, bye_choices[0]
+    budget = [SEARCH_BUDGET]
+    for choice in bye_choices:
+        mask = everyone if choice is None else everyone & ~(1 << choice)
+        pairing = _pair_remaining(mask, played, group_end, False, budget)
+        if pairing is not None:
+            bye = choice
+            break
+        if budget[0] <= 0:
+            break
+
+    if pairing is None:
+        mask = everyone if bye is None else everyone & ~(1 << bye)
+        pairing = _pair_remaining(mask, played, group_end, True, [n])
+
+    rematches = sum(1 for a, b in pairing if played[a] >> b & 1)
+    if rematches and budget[0] <= 0:
+        # The search gave up; a rematch-free round may still exist
+        logger.warning(
+            f"Swiss pairing search budget exhausted for {n} teams; paired with {rematches} rematch(es)"
+        )
+    elif rematches:
+        logger.warning(f"No rematch-free Swiss pairing exists for {n} teams; paired with {rematches} rematch(es)")
+    return (
+        [(team_ids[a], team_ids[b]) for a, b in pairing],
+        team_ids[bye] if bye is not None else None,
+        rematches,
+    )
+
+
+def _pair_remaining(mask, played, group_end, allow_rematches, budget):
+    """Depth-first pairing of the teams in ``mask``; None if impossible within budget."""
+    if not mask:
+        return []
+    budget[0] -= 1
+    if budget[0] < 0:
+        return None
+
+    head = (mask & -mask).bit_length() - 1
+    rest = mask & ~(1 << head)
+    for opponent in _candidates(head, rest, played, group_end, allow_rematches):
+        remaining = rest & ~(1 << opponent)
+        if not allow_rematches and not _all_pairable(remaining, played):
+            continue
+        tail = _pair_remaining(remaining, played, group_end, allow_rematches, budget)
+        if tail is not None:
+            return [(head, opponent), *tail]
+        if budget[0] < 0:
+            return None
+    return None
+
+
+def _candidates(head, rest, played, group_end, allow_rematches):
+    """Opponents for the best ranked unpaired team, most preferred first."""
+    n = len(played)
+    group = [j for j in range(head + 1, group_end[head]) if rest >> j & 1]
+    # Top half meets bottom half: the ideal opponent opens the group's lower half
+    half = (len(group) + 1) // 2
+    ordered = group[half - 1:] + group[:half - 1][::-1] if group else []
+    # Then float down into the following score groups
+    ordered += [j for j in range(group_end[head], n) if rest >> j & 1]
+
+    fresh = [j for j in ordered if not played[head] >> j & 1]
+    if allow_rematches:
+        return fresh + [j for j in ordered if played[head] >> j & 1]
+    return fresh
+
+
+def _all_pairable(mask, played):
+    """True if every team in ``mask`` still has someone in ``mask`` it has not met."""
+    remaining = mask
+    while remaining:
+        low = remaining & -remaining
+        team = low.bit_length() - 1
+        if not mask & ~played[team] & ~low:
+            return False
+        remaining ^= low
+    return True
@@ -0,0 +1,110 @@
+# swiss_standings.py - tournament-wide Swiss points and tie-breakers
+
+"""
+Swiss standings for every team of a tournament in one pass.
+
+Completed matches are loaded once and turned into per-team arrays (points and
+the opponents each team met with its result), from which points, Buchholz,
+Median-Buchholz and Sonneborn-Berger are computed together. Only rows whose
+values changed are written back, with a single bulk_update.
+"""
+
+import logging
+from matches.models import Match
+from .models import TournamentTeam
+from pfc_core.cache_registry import invalidate_models
+from .swiss_pairing import BYE_POINTS
+
+logger = logging.getLogger("tournaments")
+
+WIN_POINTS = 3
+DRAW_POINTS = 1
+
+STANDINGS_FIELDS = ["swiss_points", "buchholz_score", "median_buchholz", "sonneborn_berger"]
+
+# Ranking order: points, then the tie-breakers
+STANDINGS_ORDER = ("-swiss_points", "-buchholz_score", "-median_buchholz", "-sonneborn_berger", "id")
+
+
+def calculate_swiss_standings(team_ids, results, bye_team_ids=()):
+    """
+    Compute points and tie-breakers.
+
+    Args:
+        team_ids: ids of the tournament's teams
+        results: iterable of (team1_id, team2_id, winner_id) for completed
+            matches; winner_id None is a draw
+        bye_team_ids: teams that received a bye (worth a win, no opponent)
+
+    Returns:
+        dict: team_id -> {swiss_points, buchholz_score, median_buchholz, sonneborn_berger}
+    """
+    index = {team_id: i for i, team_id in enumerate(team_ids)}
+    points = [0] * len(team_ids)
+    # Per team: (opponent index, share of the opponent's points earned: 1 win, 0.5 draw, 0 loss)
+    games = [[] for _ in team_ids]
+
+    for team1_id, team2_id, winner_id in results:
+        a, b = index.get(team1_id), index.get(team2_id)
+        if a is None or b is None:
+            continue
+        if winner_id is None:
+            points[a] += DRAW_POINTS
+            points[b] += DRAW_POINTS
+            games[a].append((b, 0.5))
+            games[b].append((a, 0.5))
+        else:
+            winner, loser = (a, b) if winner_id == team1_id else (b, a)
+            points[winner] += WIN_POINTS
+            games[winner].append((loser, 1.0))
+            games[loser].append((winner, 0.0))
+
+    for team_id in bye_team_ids:
+        if team_id in index:
+            points[index[team_id]] += BYE_POINTS
+
+    standings = {}
+    for i, team_id in enumerate(team_ids):
+        opponent_points = sorted(points[opponent] for opponent, share in games[i])
+        buchholz = sum(opponent_points)
+        # Median-Buchholz drops the best and worst opponent once there are enough to trim
+        median = sum(opponent_points[1:-1]) if len(opponent_points) > 2 else buchholz
+        standings[team_id] = {
+            "swiss_points": points[i],
+            "buchholz_score": float(buchholz),
+            "median_buchholz": float(median),
+            "sonneborn_berger": float(sum(points[opponent] * share for opponent, share in games[i])),
+        }
+    return standings
+
+
+def update_swiss_standings(tournament):
+    """
+    Recalculate and store Swiss standings for every team in the tournament.
+
+    Returns:
+        list: the tournament's TournamentTeam rows in standings order
+    """
+    tournament_teams = list(TournamentTeam.objects.filter(tournament=tournament).select_related("team"))
+    results = Match.objects.filter(tournament=tournament, status="completed").values_list("team1_id", "team2_id", "winner_id")
+    standings = calculate_swiss_standings(
+        [tt.team_id for tt in tournament_teams],
+        results,
+        bye_team_ids=[tt.team_id for tt in tournament_teams if tt.received_bye_in_round is not None],
+    )
+
+    changed = []
+    for tt in tournament_teams:
+        values = standings[tt.team_id]
+        if any(getattr(tt, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(tt, field, value)
+            changed.append(tt)
+    if changed:
+        TournamentTeam.objects.bulk_update(changed, STANDINGS_FIELDS)
+        invalidate_models(TournamentTeam)
+        logger.info(f"Updated Swiss standings for {len(changed)} teams in tournament {tournament.id}")
+
+    return sorted(tournament_teams, key=lambda tt: (
+        -tt.swiss_points, -tt.buchholz_score, -tt.median_buchholz, -tt.sonneborn_berger, tt.id
+    ))
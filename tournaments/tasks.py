@@ -1,8 +1,13 @@
 # tasks.py for tournament automation
 
 import logging
+import random
 from django.db import transaction
 from .models import Tournament, TournamentTeam, Round, Stage # Import Round and Stage
+from .match_generation import new_match, bulk_create_matches, ensure_rounds
+from .swiss_pairing import load_opponent_history, pair_round, BYE_POINTS
+from .swiss_standings import update_swiss_standings
+from .knockout_bracket import uses_bracket_engine, sync_bracket
 from matches.models import Match
 from django.db.models import Q # Import Q for complex queries
 
@@ -58,19 +63,11 @@ def generate_next_swiss_round(tournament):
             next_round_num = current_round + 1
             logger.info(f"Current round: {current_round}, generating for round: {next_round_num}")
 
-            # --- 1. Update Swiss Points and Buchholz (if necessary) ---
-            # Note: Buchholz calculation is complex and often done after all points are updated.
-            # We might need a separate step or recalculate it here based on *current* opponent points.
-            active_teams_tt = list(TournamentTeam.objects.filter(tournament=tournament, is_active=True).select_related("team"))
-            for tt in active_teams_tt:
-                tt.update_swiss_stats() # Recalculate points based on completed matches
-            
-            # Optional: Recalculate Buchholz globally here if needed
-            # calculate_buchholz_scores(tournament)
+            # --- 1. Update Swiss Points and Tie-breakers (whole tournament, one pass) ---
+            standings = update_swiss_standings(tournament)
 
             # --- 2. Get Sorted Active Teams --- 
-            # Re-fetch with updated points, ordered for pairing
-            teams_to_pair = list(TournamentTeam.objects.filter(tournament=tournament, is_active=True).order_by("-swiss_points", "-buchholz_score", "id"))
+            teams_to_pair = [tt for tt in standings if tt.is_active]
             num_teams = len(teams_to_pair)
             logger.debug(f"Teams to pair ({num_teams}): {[t.team.name for t in teams_to_pair]}")
 
@@ -80,77 +77,37 @@ def generate_next_swiss_round(tournament):
                 tournament.save()
                 return
 
-            # --- 3. Handle Bye --- 
-            bye_team_tt = None
-            if num_teams % 2 != 0:
-                # Find the lowest-ranked team that hasn't received a bye yet
-                for i in range(num_teams - 1, -1, -1):
-                    candidate = teams_to_pair[i]
-                    if candidate.received_bye_in_round is None:
-                        bye_team_tt = teams_to_pair.pop(i) # Remove from pairing list
-                        break
-                
-                if bye_team_tt:
-                    logger.info(f"Assigning Bye to {bye_team_tt.team.name} in Swiss Round {next_round_num}")
-                    bye_team_tt.received_bye_in_round = next_round_num
-                    bye_team_tt.swiss_points += 3 # Assuming 3 points for a bye win
-                    bye_team_tt.save()
-                else:
-                    # This should ideally not happen if byes are managed correctly across rounds
-                    logger.error(f"Odd number of teams ({num_teams}) but could not assign a bye (all remaining teams may have had one). Manual intervention needed.")
-                    tournament.automation_status = "error"
-                    tournament.save()
-                    return
-
-            # --- 4. Perform Pairing --- 
-            paired_indices = set()
-            matches_created = []
-            
-            for i in range(num_teams):
-                if i in paired_indices:
-                    continue
-                
-                team1_tt = teams_to_pair[i]
-                found_opponent = False
-                for j in range(i + 1, num_teams):
-                    if j in paired_indices:
-                        continue
-                        
-                    team2_tt = teams_to_pair[j]
-                    
-                    # Check if they have played before
-                    if team2_tt.team not in team1_tt.opponents_played.all():
-                        # Pair found!
-                        logger.info(f"Pairing {team1_tt.team.name} ({team1_tt.swiss_points} pts) vs {team2_tt.team.name} ({team2_tt.swiss_points} pts) for round {next_round_num}")
-                        match = Match.objects.create(
-                            tournament=tournament,
-                            round_number=next_round_num,
-                            team1=team1_tt.team,
-                            team2=team2_tt.team,
-                            status="pending"
-                        )
-                        matches_created.append(match)
-                        
-                        # Mark as paired for this round
-                        paired_indices.add(i)
-                        paired_indices.add(j)
-                        
-                        # Update opponents played
-                        team1_tt.opponents_played.add(team2_tt.team)
-                        team2_tt.opponents_played.add(team1_tt.team)
-                        
-                        found_opponent = True
-                        break # Move to the next unpaired team
-                
-                if not found_opponent and i not in paired_indices:
-                    # If we reach here, team i could not be paired with anyone they haven't played
-                    # This requires more complex handling (e.g., allow rematches, pair across score groups)
-                    # For now, log an error and stop generation
-                    logger.error(f"Could not find suitable opponent for {team1_tt.team.name} in round {next_round_num}. All potential opponents may have been played. Manual intervention needed.")
-                    tournament.automation_status = "error"
-                    tournament.save()
-                    # Rollback transaction implicitly via exception or explicit raise
-                    raise Exception(f"Pairing failed for tournament {tournament.id}, round {next_round_num}")
+            # --- 3. Pair the Round (score groups, floaters, no rematches unless unavoidable) --- 
+            teams_by_id = {tt.team_id: tt for tt in teams_to_pair}
+            pairs, bye_team_id, rematches = pair_round(
+                [(tt.team_id, tt.swiss_points) for tt in teams_to_pair],
+                load_opponent_history(tournament),
+                had_bye={tt.team_id for tt in teams_to_pair if tt.received_bye_in_round is not None},
+            )
+            if rematches:
+                logger.warning(f"Swiss round {next_round_num} of tournament {tournament.id} needs {rematches} rematch(es)")
+
+            # --- 4. Handle Bye and Create Matches --- 
+            bye_team_tt = teams_by_id.get(bye_team_id)
+            if bye_team_tt:
+                logger.info(f"Assigning Bye to {bye_team_tt.team.name} in Swiss Round {next_round_num}")
+                bye_team_tt.received_bye_in_round = next_round_num
+                bye_team_tt.swiss_points += BYE_POINTS
+                bye_team_tt.save()
+
+            round_obj = ensure_rounds(tournament, [next_round_num])[next_round_num]
+            matches_created = bulk_create_matches([
+                new_match(tournament, teams_by_id[team1_id].team, teams_by_id[team2_id].team, round_obj=round_obj)
+                for team1_id, team2_id in pairs
+            ])
+
+            # Keep opponents_played in step with the new pairings
+            OpponentsPlayed = TournamentTeam.opponents_played.through
+            OpponentsPlayed.objects.bulk_create([
+                OpponentsPlayed(tournamentteam_id=teams_by_id[a].id, team_id=b)
+                for team1_id, team2_id in pairs
+                for a, b in ((team1_id, team2_id), (team2_id, team1_id))
+            ], ignore_conflicts=True)
 
             # --- 5. Finalize Round --- 
             if len(matches_created) > 0 or bye_team_tt:
@@ -199,7 +156,7 @@ def generate_next_knockout_round(tournament):
                         advancing_teams_tt.append(winner_tt)
                     else:
                          logger.warning(f"Winner team {match.winner.name} not found or inactive in TournamentTeam for match {match.id}. Skipping.")
-                elif match.is_draw:
+                elif match.winner_id is None:  # Draw
                      logger.warning(f"Match {match.id} in knockout tournament {tournament.id} ended in a draw. Cannot determine winner. Manual intervention needed.")
                      # Set tournament to error? Requires admin to resolve draw.
                      tournament.automation_status = "error"
@@ -277,14 +234,7 @@ def generate_next_knockout_round(tournament):
                     team1_tt = teams_to_pair[i]
                     team2_tt = teams_to_pair[i+1]
                     logger.info(f"Pairing {team1_tt.team.name} vs {team2_tt.team.name} for knockout round {next_round_num}")
-                    match = Match.objects.create(
-                        tournament=tournament,
-                        round_number=next_round_num,
-                        team1=team1_tt.team,
-                        team2=team2_tt.team,
-                        status="pending"
-                    )
-                    matches_created.append(match)
+                    matches_created.append(new_match(tournament, team1_tt.team, team2_tt.team))
                     # Update opponents played if needed (less critical in knockout)
                     # team1_tt.opponents_played.add(team2_tt.team)
                     # team2_tt.opponents_played.add(team1_tt.team)
@@ -293,6 +243,11 @@ def generate_next_knockout_round(tournament):
                     logger.error(f"Error during knockout pairing: Odd number of teams ({len(teams_to_pair)}) remaining after bye assignment. Team {teams_to_pair[i].team.name} left over.")
                     raise Exception(f"Pairing failed for knockout tournament {tournament.id}, round {next_round_num}")
 
+            round_obj = ensure_rounds(tournament, [next_round_num])[next_round_num]
+            for match in matches_created:
+                match.round = round_obj
+            matches_created = bulk_create_matches(matches_created)
+
             # --- 5. Finalize Round --- 
             if len(matches_created) > 0 or bye_team_tt_next_round:
                 tournament.current_round_number = next_round_num
@@ -410,14 +365,19 @@ def generate_next_combo_round(tournament):
         raise
 
 
-def check_round_completion(tournament_id):
-    """Checks if all matches in the current round are completed and triggers next round generation."""
+def check_round_completion(tournament_id, raise_errors=False):
+    """
+    Checks if all matches in the current round are completed and triggers next round generation.
+
+    Normally run by the automation worker (see automation_queue); raise_errors lets
+    the worker see failures so it can retry the job.
+    """
     try:
         with transaction.atomic():
             tournament = Tournament.objects.select_for_update().get(id=tournament_id)
 
             # Avoid race conditions or redundant checks
-            if tournament.automation_status != "idle":
+            if tournament.automation_status not in Tournament.AUTOMATION_READY_STATUSES:
                 logger.warning(f"Automation for tournament {tournament.id} is already running or completed. Skipping check.")
                 return
 
@@ -448,7 +408,12 @@ def check_round_completion(tournament_id):
                 elif tournament.format == "swiss":
                     generate_next_swiss_round(tournament)
                 elif tournament.format == "knockout":
-                    generate_next_knockout_round(tournament)
+                    if uses_bracket_engine(tournament):
+                        # Bracket trees advance per match; just catch up anything that was missed
+                        sync_bracket(tournament)
+                        tournament.refresh_from_db()
+                    else:
+                        generate_next_knockout_round(tournament)
                 elif tournament.format == "combo":
                     generate_next_combo_round(tournament)
                 else:
@@ -481,4 +446,6 @@ def check_round_completion(tournament_id):
         except Tournament.DoesNotExist:
             pass # Tournament doesn't exist, nothing to mark
         # TODO: Add admin notification here
+        if raise_errors:
+            raise
 
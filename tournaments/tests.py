@@ -1,3 +1,49 @@
-from django.test import TestCase
+from unittest import mock
+from django.test import SimpleTestCase
+from .swiss_pairing import pair_round
 
-# Create your tests here.
+
+def meetings(*pairs):
+    """Opponent history from (team, team) pairs that already met."""
+    history = {}
+    for a, b in pairs:
+        history.setdefault(a, set()).add(b)
+        history.setdefault(b, set()).add(a)
+    return history
+
+
+class SwissPairingTests(SimpleTestCase):
+
+    def test_even_field_pairs_within_score_groups(self):
+        standings = [(1, 3), (2, 3), (3, 0), (4, 0)]
+        self.assertEqual(pair_round(standings, {}), ([(1, 2), (3, 4)], None, 0))
+
+    def test_odd_field_gives_the_bye_to_the_lowest_ranked_team_without_one(self):
+        standings = [(1, 0), (2, 0), (3, 0), (4, 0), (5, 0)]
+        pairs, bye, rematches = pair_round(standings, {}, had_bye={5})
+        self.assertEqual(bye, 4)
+        self.assertEqual(sorted(team for pair in pairs for team in pair), [1, 2, 3, 5])
+        self.assertEqual(rematches, 0)
+
+    def test_search_backtracks_to_avoid_a_rematch(self):
+        # Top against bottom half would give 1-3 and leave 2-4, who already met
+        standings = [(1, 0), (2, 0), (3, 0), (4, 0)]
+        self.assertEqual(pair_round(standings, meetings((2, 4))), ([(1, 4), (2, 3)], None, 0))
+
+    def test_rematches_are_allowed_when_no_rematch_free_round_exists(self):
+        standings = [(1, 0), (2, 0), (3, 0), (4, 0)]
+        history = meetings((1, 2), (1, 3), (1, 4), (2, 3), (2, 4), (3, 4))
+        with self.assertLogs('tournaments', 'WARNING') as logs:
+            pairs, bye, rematches = pair_round(standings, history)
+        self.assertEqual(len(pairs), 2)
+        self.assertEqual(rematches, 2)
+        self.assertIn('No rematch-free Swiss pairing exists', logs.output[0])
+
+    def test_exhausted_search_budget_falls_back_to_a_greedy_pass(self):
+        standings = [(1, 0), (2, 0), (3, 0), (4, 0)]
+        with mock.patch('tournaments.swiss_pairing.SEARCH_BUDGET', 1), \
+                self.assertLogs('tournaments', 'WARNING') as logs:
+            pairs, bye, rematches = pair_round(standings, meetings((2, 4)))
+        # The rematch-free 1-4, 2-3 exists but was not found within the budget
+        self.assertEqual((pairs, rematches), ([(1, 3), (2, 4)], 1))
+        self.assertIn('search budget exhausted', logs.output[0])
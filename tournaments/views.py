@@ -1,12 +1,14 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from .models import Tournament, TournamentTeam, Round, Bracket
+from django.db import transaction
+from django.db.models import Count
+from .models import Tournament, TournamentTeam, Round
+from .match_generation import new_match, bulk_create_matches, ensure_rounds
+from .knockout_bracket import build_bracket
 from .forms import TournamentForm, TeamAssignmentForm
-from matches.models import Match
 from teams.models import Team
 import random
-import math
 
 def is_staff(user):
     return user.is_staff
@@ -14,8 +16,10 @@ def is_staff(user):
 # Removed login_required decorator
 def tournament_list(request):
     """View for listing all tournaments"""
-    active_tournaments = Tournament.objects.filter(is_active=True, is_archived=False)
-    archived_tournaments = Tournament.objects.filter(is_archived=True)
+    # Team counts annotated instead of one COUNT per card; evaluated only when the cached region is rendered
+    tournaments = Tournament.objects.annotate(team_count=Count('teams'))
+    active_tournaments = tournaments.filter(is_active=True, is_archived=False)
+    archived_tournaments = tournaments.filter(is_archived=True)
     
     context = {
         'active_tournaments': active_tournaments,
@@ -30,11 +34,9 @@ def tournament_detail(request, tournament_id):
     rounds = tournament.rounds.all().order_by('number')
     teams = tournament.teams.all()
     
-    # Import the update_tournament_leaderboard function
-    from leaderboards.views import update_tournament_leaderboard
-    
-    # Ensure leaderboard is created and updated
-    update_tournament_leaderboard(tournament)
+    # Ensure leaderboard exists (standings are kept current on match completion)
+    from leaderboards.services import get_or_build_leaderboard
+    get_or_build_leaderboard(tournament)
     
     context = {
         'tournament': tournament,
@@ -179,120 +181,54 @@ def _generate_round_robin_matches(tournament):
     n = len(teams)
     matches_per_round = n // 2
     
-    # Create rounds
-    for round_num in range(1, n):
-        round_obj, created = Round.objects.get_or_create(
-            tournament=tournament,
-            number=round_num
-        )
+    with transaction.atomic():
+        # Create rounds
+        rounds = ensure_rounds(tournament, range(1, n))
         
-        # Generate matches for this round
-        for i in range(matches_per_round):
-            team1 = teams[i]
-            team2 = teams[n - 1 - i]
-            
-            # Skip if one team is the "bye" team
-            if team1 is None or team2 is None:
-                continue
+        matches = []
+        for round_num in range(1, n):
+            # Generate matches for this round
+            for i in range(matches_per_round):
+                team1 = teams[i]
+                team2 = teams[n - 1 - i]
+                
+                # Skip if one team is the "bye" team
+                if team1 is None or team2 is None:
+                    continue
+                
+                matches.append(new_match(tournament, team1, team2, round_obj=rounds[round_num]))
             
-            Match.objects.create(
-                tournament=tournament,
-                round=round_obj,
-                team1=team1,
-                team2=team2,
-                status='pending'
-            )
+            # Rotate teams for next round (first team stays fixed)
+            teams = [teams[0]] + [teams[-1]] + teams[1:-1]
         
-        # Rotate teams for next round (first team stays fixed)
-        teams = [teams[0]] + [teams[-1]] + teams[1:-1]
+        bulk_create_matches(matches)
 
 def _generate_knockout_matches(tournament):
     """Generate matches for a knockout tournament"""
-    teams = list(tournament.teams.all())
-    random.shuffle(teams)  # Random seeding
-    
-    # Calculate number of rounds needed
-    num_teams = len(teams)
-    num_rounds = math.ceil(math.log2(num_teams))
-    
-    # Create rounds
-    for round_num in range(1, num_rounds + 1):
-        round_obj, created = Round.objects.get_or_create(
-            tournament=tournament,
-            number=round_num
-        )
-    
-    # First round matches
-    first_round = Round.objects.get(tournament=tournament, number=1)
-    matches_in_first_round = 2 ** (num_rounds - 1)
-    byes = matches_in_first_round * 2 - num_teams
-    
-    for i in range(matches_in_first_round):
-        position = i + 1
-        bracket, created = Bracket.objects.get_or_create(
-            tournament=tournament,
-            round=first_round,
-            position=position
-        )
-        
-        # If we have enough teams for this match
-        if i < (num_teams - byes) // 2:
-            team1 = teams[i * 2]
-            team2 = teams[i * 2 + 1]
-            
-            Match.objects.create(
-                tournament=tournament,
-                round=first_round,
-                bracket=bracket,
-                team1=team1,
-                team2=team2,
-                status='pending'
-            )
-        # If one team gets a bye
-        elif i < num_teams - byes:
-            team1 = teams[i + (num_teams - byes) // 2]
-            
-            # Create brackets for subsequent rounds
-            current_bracket = bracket
-            for round_num in range(2, num_rounds + 1):
-                next_round = Round.objects.get(tournament=tournament, number=round_num)
-                next_position = math.ceil(current_bracket.position / 2)
-                
-                next_bracket, created = Bracket.objects.get_or_create(
-                    tournament=tournament,
-                    round=next_round,
-                    position=next_position
-                )
-                
-                current_bracket = next_bracket
+    # The full seeded bracket tree is built up front; later matches are created as winners advance
+    teams = tournament.tournamentteam_set.filter(is_active=True).select_related("team")
+    build_bracket(tournament, teams)
 
 def _generate_swiss_matches(tournament):
     """Generate matches for a Swiss system tournament"""
     teams = list(tournament.teams.all())
     random.shuffle(teams)  # Random initial pairing
     
-    # Create first round
-    round_obj, created = Round.objects.get_or_create(
-        tournament=tournament,
-        number=1
-    )
-    
-    # Generate matches for first round
-    for i in range(0, len(teams), 2):
-        # If we have an odd number of teams, the last team gets a bye
-        if i + 1 >= len(teams):
-            break
-            
-        team1 = teams[i]
-        team2 = teams[i + 1]
-        
-        Match.objects.create(
+    with transaction.atomic():
+        # Create first round
+        round_obj, created = Round.objects.get_or_create(
             tournament=tournament,
-            round=round_obj,
-            team1=team1,
-            team2=team2,
-            status='pending'
+            number=1
         )
+        
+        # Generate matches for first round; with an odd number of teams the last team gets a bye
+        matches = [
+            new_match(tournament, teams[i], teams[i + 1], round_obj=round_obj)
+            for i in range(0, len(teams) - 1, 2)
+        ]
+        bulk_create_matches(matches)
+        tournament.current_round_number = 1
+        tournament.save(update_fields=["current_round_number"])
     
     # For subsequent rounds, matches will be generated after previous round results are in
 